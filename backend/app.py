@@ -1,20 +1,25 @@
+import asyncio
+import copy
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from dotenv import load_dotenv
-from pymongo import MongoClient
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Dict, Any, List
 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
-from langchain_community.embeddings import HuggingFaceEmbeddings
 
-from pinecone import Pinecone, ServerlessSpec
+from db.mongodb import get_async_db, get_db
+from services.resources import get_resource
 
 from templates.resolve_time_range_to_mongo import resolve_time_range_to_mongo
 from templates.safe_time import extract_time_range_semantic, safe_time_range
 from templates.query_templates import QUERY_TEMPLATES
 from templates.time_resolver import resolve_time_range
 from templates.time_range import TimeRange, DatePart
+from templates.time_repair import repair_time_range
 
 # -------------------------------------------------------------------
 # ENV
@@ -38,30 +43,22 @@ from pydantic import BaseModel
 # Mongo
 # -------------------------------------------------------------------
 
-mongo = MongoClient(MONGO_URI)
-db = mongo[MONGO_DB_NAME]
+# Clients are shared process resources (services/resources.py); creating
+# one does no network I/O, so the handles below are cheap at import.
+db = get_db()
 bills_col = db.bills
 
+# Async driver for the /query path; binds to the serving event loop
+async_db = get_async_db()
+async_bills_col = async_db.bills
+
 # -------------------------------------------------------------------
 # Pinecone
 # -------------------------------------------------------------------
 
-INDEX_NAME = "bills-rag"
-
-pinecone_client = Pinecone(api_key=PINECONE_API_KEY)
-
-if INDEX_NAME not in pinecone_client.list_indexes().names():
-    pinecone_client.create_index(
-        name=INDEX_NAME,
-        dimension=384,
-        metric="dotproduct",
-        spec=ServerlessSpec(
-            cloud="aws",
-            region=PINECONE_REGION,
-        ),
-    )
-
-pc_index = pinecone_client.Index(INDEX_NAME)
+# Only used with VECTOR_BACKEND=pinecone: the index (PINECONE_INDEX_NAME)
+# is connected, and created if missing, on first use rather than at
+# import; see services/resources.py
 
 # -------------------------------------------------------------------
 # LLM
@@ -69,15 +66,32 @@ pc_index = pinecone_client.Index(INDEX_NAME)
 from helper import groqllm
 groq_llm = groqllm
 
+# -------------------------------------------------------------------
+# Plan Cache
+# -------------------------------------------------------------------
+from services.plan_cache import normalize_query, plan_cache
+from services.rule_planner import rule_plan
+from services.answer_cache import answer_cache
+from services.data_version import aget_data_version, get_data_version
+from utils import metrics
+from utils.query_log import log_plan
+from services.context_builder import build_context, record_prompt_tokens
+from services.item_search import bill_items_stages, item_search_stages
+from services.rollup_service import rollup_pipeline
+from services.group_by import group_limit, group_stages, normalize_group_by
+from services.result_cache import result_cache
+from utils.text_utils import FILTER_KEYS
+from utils.single_flight import SingleFlight
+
 # -------------------------------------------------------------------
 # Embeddings
 # -------------------------------------------------------------------
 
-embeddings_model = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-MiniLM-L6-v2",
-    model_kwargs={"device": "cpu"},
-    encode_kwargs={"normalize_embeddings": True},
-)
+# MiniLM is loaded once per process, on first use, and shared with
+# ingestion (services/vector_service.py). Calls go through the
+# micro-batching service, so concurrent queries share forward passes.
+def embeddings_model():
+    return get_resource("embedding_service")
 
 # -------------------------------------------------------------------
 # Query Plan Schema
@@ -111,6 +125,26 @@ class QueryPlan(BaseModel):
     time_range: Optional[Dict[str, Any]] = None
     needs_rag: bool = False
 
+    # Breakdowns: one total per category / vendor / month / payment method
+    group_by: Optional[str] = Field(
+        default=None,
+        description="category, vendor, month, or payment_method"
+    )
+    limit: Optional[int] = Field(default=None, description="Top-N groups")
+
+    @field_validator("group_by", mode="before")
+    @classmethod
+    def _group_by(cls, value):
+        return normalize_group_by(value)
+
+    @field_validator("limit", mode="before")
+    @classmethod
+    def _limit(cls, value):
+        try:
+            return group_limit(int(value)) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
 
 # -------------------------------------------------------------------
 # Classifier Chain
@@ -184,7 +218,18 @@ You MUST output ONLY valid JSON.
    - "category": Broad types (e.g., "Grocery", "Medical", "Travel")
    - "payment_method": Method used (e.g., "CASH", "UPI", "CARD")
    - "bill_no": Specific bill IDs
-5. **time_range**: Extract the time intent.
+5. **time_range**: The time intent, or null when the query has none. It MUST match:
+   {{"type": "ABSOLUTE" | "RELATIVE" | "NONE",
+     "from": DatePart | null, "to": DatePart | null,
+     "granularity": "day" | "month" | "year"}}
+   DatePart is {{"year": int, "month": int, "day": int}} (absolute, year required)
+   or {{"relative": {{"unit": "day" | "month" | "year", "offset": int}}}}.
+   - Do NOT calculate real dates; "last month" is relative offset -1.
+   - "last N months": from offset -N to offset -1 (current month excluded).
+   - A single day or month: set "from" and leave "to" null.
+6. **group_by**: For breakdowns ("by category", "per vendor", "month-wise"), one of
+   [category, vendor, month, payment_method]; otherwise null. Use operation "sum".
+7. **limit**: N for "top N" breakdowns; otherwise null.
 
 ### CRITICAL MAPPING RULES
 - "Rice", "Milk", "Chicken" are **ENTITIES** (item), NOT filters.
@@ -205,6 +250,16 @@ Output: {{
   "needs_rag": false
 }}
 
+Query: "total spent on medicines in the last 3 months"
+Output: {{
+  "type": "AGGREGATION",
+  "operation": "sum",
+  "entities": null,
+  "filters": {{"category": "Medical"}},
+  "time_range": {{ "type": "RELATIVE", "granularity": "month", "from": {{ "relative": {{ "unit": "month", "offset": -3 }} }}, "to": {{ "relative": {{ "unit": "month", "offset": -1 }} }} }},
+  "needs_rag": false
+}}
+
 Query: "How much did I spend on groceries via UPI?"
 Output: {{
   "type": "AGGREGATION",
@@ -214,6 +269,18 @@ Output: {{
   "time_range": null,
   "needs_rag": false
 }}
+
+Query: "top 5 vendors I spent the most at last month"
+Output: {{
+  "type": "AGGREGATION",
+  "operation": "sum",
+  "entities": null,
+  "filters": null,
+  "time_range": {{ "type": "RELATIVE", "granularity": "month", "from": {{ "relative": {{ "unit": "month", "offset": -1 }} }} }},
+  "needs_rag": false,
+  "group_by": "vendor",
+  "limit": 5
+}}
 """
         ),
         ("human", "{query}"),
@@ -271,15 +338,23 @@ classifier_chain = (
 def run_mongo_pipeline(pipeline: List[dict]):
     return list(bills_col.aggregate(pipeline))
 
-def execute_mongo(plan: QueryPlan, user_id: str):
+def build_mongo_pipeline(plan: QueryPlan, user_id: str) -> tuple[str, List[dict]]:
+    """Returns (collection name, aggregation pipeline)."""
     match = {"user_id": user_id}
     print(f"[entities] {plan.entities} ({type(plan.entities)})")
     print(f"[FILTERS] {plan.filters} ({type(plan.filters)})")
     # 1️⃣ Bill-level filters (date, category, bill_no, vendor)
     if plan.filters:
         for key, value in plan.filters.items():
-            if isinstance(value, str):
-                # Use case-insensitive regex for vendor, payment_method, etc.
+            if key in FILTER_KEYS and isinstance(value, (str, list)):
+                # Exact match on the indexed canonical key
+                key_field, to_key = FILTER_KEYS[key]
+                if isinstance(value, list):
+                    match[key_field] = {"$in": [to_key(v) for v in value]}
+                else:
+                    match[key_field] = to_key(value)
+            elif isinstance(value, str):
+                # Use case-insensitive regex for other string fields
                 match[key] = {"$regex": re.escape(value), "$options": "i"}
             else:
                 match[key] = value
@@ -287,25 +362,59 @@ def execute_mongo(plan: QueryPlan, user_id: str):
     entities = plan.entities or {}
     operation = plan.operation.lower()
 
-    pipeline = [{"$match": match}]
-
     has_item = "item" in entities and entities["item"]
 
-    # 2️⃣ ITEM-level queries
-    if has_item:
-        pipeline += [
-            {"$unwind": "$items"},
-            {
-                "$match": {
-                    "items.description": {
-                        "$regex": entities["item"],
-                        "$options": "i"
+    collection = "bills"
+
+    # 2️⃣ ITEM-level queries, straight from the bill_items rows
+    group_by = plan.group_by
+    rows_stages = bill_items_stages(match, entities["item"]) if has_item else None
+    rollup_stages = None if has_item else rollup_pipeline(match, operation, group_by, plan.limit)
+
+    if rows_stages is not None:
+        collection = "bill_items"
+        pipeline = rows_stages
+
+        if group_by:
+            pipeline += group_stages(group_by, plan.limit, amount="$amount")
+
+        elif operation == "sum":
+            pipeline.append({
+                "$group": {
+                    "_id": None,
+                    "total": {"$sum": "$amount"}
+                }
+            })
+
+        elif operation == "count":
+            pipeline.append({"$count": "total"})
+
+        elif operation == "list":
+            pipeline.append({
+                "$project": {
+                    "_id": 0,
+                    "vendor": 1,
+                    "bill_no": 1,
+                    "bill_date": 1,
+                    "category": 1,
+                    "payment_method": 1,
+                    "item": {
+                        "description": "$description",
+                        "quantity": "$quantity",
+                        "amount": "$amount"
                     }
                 }
-            }
-        ]
+            })
+
+    # Item queries bill_items cannot answer: narrow bills on the indexed
+    # item_terms before unwinding, then keep only the matching lines
+    elif has_item:
+        pipeline = item_search_stages(match, entities["item"])
+
+        if group_by:
+            pipeline += group_stages(group_by, plan.limit, amount="$items.amount")
 
-        if operation == "sum":
+        elif operation == "sum":
             pipeline.append({
                 "$group": {
                     "_id": None,
@@ -325,14 +434,24 @@ def execute_mongo(plan: QueryPlan, user_id: str):
                     "bill_date": 1,
                     "category": 1,
                     "payment_method": 1,
-                    "items": 1,
                     "item": "$items"
                 }
             })
 
-    # 3️⃣ BILL-level queries
+    # 3️⃣ BILL-level sum/count/breakdown over whole months: monthly rollups
+    # (partial-month edges are read from raw bills inside the pipeline)
+    elif rollup_stages is not None:
+        collection = "bill_rollups"
+        pipeline = rollup_stages
+
+    # 4️⃣ BILL-level queries
     else:
-        if operation == "sum":
+        pipeline = [{"$match": match}]
+
+        if group_by:
+            pipeline += group_stages(group_by, plan.limit)
+
+        elif operation == "sum":
             pipeline.append({
                 "$group": {
                     "_id": None,
@@ -352,17 +471,51 @@ def execute_mongo(plan: QueryPlan, user_id: str):
                     "bill_date": 1,
                     "category": 1,
                     "payment_method": 1,
-                    "items": 1,
+                    # Slim items: only what answers and tables show
+                    "items.description": 1,
+                    "items.quantity": 1,
+                    "items.amount": 1,
                     "total_amount": 1
                 }
             })
 
     # 🔍 Debug
-    print("\n[MONGO PIPELINE]")
+    print(f"\n[MONGO PIPELINE] {collection}")
     for p in pipeline:
         print(p)
 
-    return list(bills_col.aggregate(pipeline))
+    return collection, pipeline
+
+
+def execute_mongo(plan: QueryPlan, user_id: str):
+    collection, pipeline = build_mongo_pipeline(plan, user_id)
+
+    # Version is read first, so a write racing this query retires the entry
+    key = result_cache.key(user_id, collection, pipeline, get_data_version(db, user_id))
+    result = result_cache.get(key)
+    if result is not None:
+        return result
+
+    start = time.perf_counter()
+    result = list(db[collection].aggregate(pipeline))
+    result_cache.set(key, result, (time.perf_counter() - start) * 1000)
+    return result
+
+
+async def aexecute_mongo(plan: QueryPlan, user_id: str):
+    collection, pipeline = build_mongo_pipeline(plan, user_id)
+
+    version = await aget_data_version(async_db, user_id)
+    key = result_cache.key(user_id, collection, pipeline, version)
+    result = result_cache.get(key)
+    if result is not None:
+        return result
+
+    start = time.perf_counter()
+    cursor = await async_db[collection].aggregate(pipeline)
+    result = await cursor.to_list()
+    result_cache.set(key, result, (time.perf_counter() - start) * 1000)
+    return result
 
 def execute_mongo_(plan: QueryPlan, user_id: str):
     match = {"user_id": user_id}
@@ -396,72 +549,141 @@ def vector_search(
     user_id: str,
     category: Optional[str] = None,
     top_k: int = 5,
+    date_range: Optional[dict] = None,
 ):
-    vector = embeddings_model.embed_query(query)
+    vector = embeddings_model().embed_query(query)
+    return query_vector_index(vector, user_id, category, top_k, date_range)
 
-    index_filter = {"user_id": user_id}
-    if category:
-        index_filter["category"] = category
 
-    results = pc_index.query(
-        vector=vector,
-        top_k=top_k,
-        filter=index_filter,
-        include_metadata=True,
-    )
+def query_vector_index(
+    vector,
+    user_id: str,
+    category: Optional[str],
+    top_k: int,
+    date_range: Optional[dict] = None,
+):
+    # Same store ingestion writes to (VECTOR_BACKEND, services/vector_index.py)
+    filters = {k: v for k, v in (("category", category), ("bill_date", date_range)) if v}
+    matches = get_resource("vector_store").query(user_id, vector, top_k=top_k, filters=filters)
+    return [m["metadata"].get("text", "") for m in matches]
+
+
+def vector_filters(plan: QueryPlan) -> dict:
+    """vector_search filters for a plan: category and resolved bill_date."""
+    filters = plan.filters or {}
+    return {
+        # The rule planner puts category in filters, the classifier
+        # often in entities
+        "category": filters.get("category") or (plan.entities or {}).get("category"),
+        "date_range": filters.get("bill_date"),
+    }
+
+
+VECTOR_SEARCH_WORKERS = int(os.getenv("VECTOR_SEARCH_WORKERS", "8"))
+vector_executor = ThreadPoolExecutor(
+    max_workers=VECTOR_SEARCH_WORKERS,
+    thread_name_prefix="vector-search",
+)
 
-    return [
-        match["metadata"].get("text", "")
-        for match in results.get("matches", [])
-    ]
+
+async def avector_search(
+    query: str,
+    user_id: str,
+    category: Optional[str] = None,
+    top_k: int = 5,
+    date_range: Optional[dict] = None,
+):
+    # The embedding is awaited on the batching queue (no thread held while
+    # it waits); the vector store query (CPU, or I/O for Pinecone) runs
+    # off the event loop
+    vector = await embeddings_model().aembed_query(query)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        vector_executor,
+        partial(query_vector_index, vector, user_id, category, top_k, date_range),
+    )
 
 # -------------------------------------------------------------------
 # Semantic Chain
 # -------------------------------------------------------------------
 
+def semantic_prompt(chunks, user_query: str) -> str:
+    prompt = f"""
+Answer the question using the following bill context:
+
+{build_context(chunks=chunks)}
+
+Question: {user_query}
+"""
+    record_prompt_tokens("semantic", prompt)
+    return prompt
+
+
 def semantic_chain(plan: QueryPlan, user_query: str, user_id: str):
     context = vector_search(
         query=user_query,
         user_id=user_id,
-        category=plan.entities.get("category"),
+        **vector_filters(plan),
     )
 
-    prompt = f"""
-Answer the question using the following bill context:
+    metrics.count_llm_call("answer")
+    return groq_llm.invoke(semantic_prompt(context, user_query)).content
 
-{context}
 
-Question: {user_query}
-"""
+async def asemantic_chain(plan: QueryPlan, user_query: str, user_id: str):
+    context = await avector_search(
+        query=user_query,
+        user_id=user_id,
+        **vector_filters(plan),
+    )
 
-    return groq_llm.invoke(prompt).content
+    metrics.count_llm_call("answer")
+    response = await groq_llm.ainvoke(semantic_prompt(context, user_query))
+    return response.content
 
 # -------------------------------------------------------------------
 # Mixed Chain
 # -------------------------------------------------------------------
 
-def mixed_chain(plan: QueryPlan, user_query: str, user_id: str):
-    mongo_result = execute_mongo(plan, user_id)
+def mixed_prompt(facts, chunks, user_query: str) -> str:
+    prompt = f"""
+Answer the question using these bill facts and details:
 
-    facts = mongo_result[0] if mongo_result else {}
+{build_context(facts=facts, chunks=chunks)}
+
+Question: {user_query}
+"""
+    record_prompt_tokens("mixed", prompt)
+    return prompt
+
+
+def mixed_chain(plan: QueryPlan, user_query: str, user_id: str):
+    facts = execute_mongo(plan, user_id)
 
     context = vector_search(
         query=user_query,
         user_id=user_id,
-        category=plan.entities.get("category"),
+        **vector_filters(plan),
     )
 
-    prompt = f"""
-Facts:
-{facts}
+    metrics.count_llm_call("answer")
+    return groq_llm.invoke(mixed_prompt(facts, context, user_query)).content
 
-Bill Details:
-{context}
 
-Answer the user question clearly.
-"""
+async def amixed_chain(plan: QueryPlan, user_query: str, user_id: str):
+    # Mongo facts and vector context are independent; fetch them together
+    facts, context = await asyncio.gather(
+        aexecute_mongo(plan, user_id),
+        avector_search(
+            query=user_query,
+            user_id=user_id,
+            **vector_filters(plan),
+        ),
+    )
 
-    return groq_llm.invoke(prompt).content
+    metrics.count_llm_call("answer")
+    response = await groq_llm.ainvoke(mixed_prompt(facts, context, user_query))
+    return response.content
 
 def normalize_time_range1(plan_dict: dict, user_query: str) -> dict:
     tr = plan_dict.get("time_range")
@@ -485,15 +707,15 @@ import re
 RANGE_WORDS = r"\b(to|till|until|upto|between|from)\b"
 
 def normalize_time_range(plan_dict: dict, user_query: str) -> dict:
-    tr = plan_dict.get("time_range")
-
-    if tr is None:
+    # Local repair (deterministic parser first, then schema coercion of
+    # the classifier output) instead of a second LLM round trip
+    tr_obj = repair_time_range(plan_dict.get("time_range"), user_query)
+    if tr_obj is None:
+        plan_dict["time_range"] = None
         return plan_dict
 
-    # already valid semantic shape
-    if not isinstance(tr, dict) or "type" not in tr:
-        plan_dict["time_range"] = extract_time_range_semantic(user_query)
-        return plan_dict
+    tr = tr_obj.model_dump(by_alias=True, exclude_none=True)
+    plan_dict["time_range"] = tr
 
     # 🔥 SINGLE DAY COLLAPSE RULE
     if (
@@ -538,9 +760,7 @@ def normalize_time_range11(plan_dict: dict, user_query: str) -> dict:
 # -------------------------------------------------------------------
 # Router
 # -------------------------------------------------------------------
-def query_router(user_query: str, user_id: str):
-    plan_dict = classifier_chain.invoke({"query": user_query})
-
+def finalize_plan_dict(plan_dict: dict, user_query: str) -> dict:
     # 🔒 Enforce semantic contract
     plan_dict = normalize_time_range(plan_dict, user_query)
 
@@ -556,6 +776,102 @@ def query_router(user_query: str, user_id: str):
         assert "type" in tr, "time_range missing type"
         assert "granularity" in tr, "time_range missing granularity"
 
+    # Validate before the plan is allowed into the cache
+    QueryPlan(**plan_dict)
+
+    return plan_dict
+
+
+classifier_flight = SingleFlight("classifier")
+answer_flight = SingleFlight("answer")
+
+
+def _classify(payload: dict) -> dict:
+    metrics.count_llm_call("classifier")
+    return classifier_chain.invoke(payload)
+
+
+async def _aclassify(payload: dict) -> dict:
+    metrics.count_llm_call("classifier")
+    return await classifier_chain.ainvoke(payload)
+
+
+def classify_query(user_query: str) -> dict:
+    plan_dict = classifier_flight.do(
+        normalize_query(user_query), _classify, {"query": user_query}
+    )
+    # Coalesced callers share the dict; finalize mutates it
+    plan_dict = copy.deepcopy(plan_dict)
+    return finalize_plan_dict(plan_dict, user_query)
+
+
+async def aclassify_query(user_query: str) -> dict:
+    plan_dict = await classifier_flight.ado(
+        normalize_query(user_query), _aclassify, {"query": user_query}
+    )
+    plan_dict = copy.deepcopy(plan_dict)
+    # Time range repair is local, so finalizing never blocks on the LLM
+    return finalize_plan_dict(plan_dict, user_query)
+
+
+def lookup_plan(user_query: str, fast_path: bool) -> tuple[dict | None, str]:
+    """Plan sources that need no LLM call: rules, then the plan cache."""
+    plan_dict = rule_plan(user_query) if fast_path else None
+    if plan_dict is not None:
+        return plan_dict, "rules"
+
+    return plan_cache.get(user_query), "cache"
+
+
+async def alookup_plan(user_query: str, fast_path: bool) -> tuple[dict | None, str]:
+    plan_dict = rule_plan(user_query) if fast_path else None
+    if plan_dict is not None:
+        return plan_dict, "rules"
+
+    return await plan_cache.aget(user_query), "cache"
+
+
+def record_plan_source(user_query: str, source: str, start: float, plan_dict: dict):
+    metrics.incr(f"plan_source.{source}")
+    metrics.observe(f"plan_ms.{source}", (time.perf_counter() - start) * 1000)
+    print(f"[PLAN SOURCE] {source}: {user_query}")
+    log_plan(user_query, source, plan_dict)
+
+
+def plan_query(user_query: str, fast_path: bool = True) -> tuple[dict, str]:
+    """
+    Returns the semantic plan dict for a query and the path that
+    produced it ("rules", "cache" or "llm"). time_range stays
+    unresolved here so cached plans never carry concrete dates.
+    """
+    start = time.perf_counter()
+
+    plan_dict, source = lookup_plan(user_query, fast_path)
+
+    if plan_dict is None:
+        plan_dict = classify_query(user_query)
+        plan_cache.set(user_query, plan_dict)
+        source = "llm"
+
+    record_plan_source(user_query, source, start, plan_dict)
+    return plan_dict, source
+
+
+async def aplan_query(user_query: str, fast_path: bool = True) -> tuple[dict, str]:
+    start = time.perf_counter()
+
+    plan_dict, source = await alookup_plan(user_query, fast_path)
+
+    if plan_dict is None:
+        plan_dict = await aclassify_query(user_query)
+        plan_cache.aset(user_query, plan_dict)
+        source = "llm"
+
+    record_plan_source(user_query, source, start, plan_dict)
+    return plan_dict, source
+
+
+def resolve_plan(plan_dict: dict) -> QueryPlan:
     # ✅ Now safe to construct QueryPlan
     plan = QueryPlan(**plan_dict)
 
@@ -568,16 +884,114 @@ def query_router(user_query: str, user_id: str):
             plan.filters = plan.filters or {}
             plan.filters["bill_date"] = mongo_range
 
+    return plan
+
+
+def execute_plan(plan_dict: dict, user_query: str, user_id: str):
+    plan = resolve_plan(plan_dict)
+
     if plan.type in ("FILTER", "AGGREGATION"):
         return execute_mongo(plan, user_id)
 
+    if plan.type not in ("SEMANTIC", "MIXED"):
+        raise ValueError(f"Unsupported query type: {plan.type}")
+
+    # Version is read before generating, so a bill written meanwhile
+    # moves the user to a key this answer is never stored under
+    key = answer_cache.key(user_id, user_query, plan, get_data_version(db, user_id))
+    answer = answer_cache.get(key)
+    if answer is not None:
+        return answer
+
+    chain = semantic_chain if plan.type == "SEMANTIC" else mixed_chain
+    answer = answer_flight.do(key, chain, plan, user_query, user_id)
+
+    answer_cache.set(key, answer)
+    return answer
+
+
+async def aexecute_plan(plan_dict: dict, user_query: str, user_id: str):
+    plan = resolve_plan(plan_dict)
+
+    if plan.type in ("FILTER", "AGGREGATION"):
+        return await aexecute_mongo(plan, user_id)
+
+    if plan.type not in ("SEMANTIC", "MIXED"):
+        raise ValueError(f"Unsupported query type: {plan.type}")
+
+    version = await aget_data_version(async_db, user_id)
+    key = answer_cache.key(user_id, user_query, plan, version)
+    answer = answer_cache.get(key)
+    if answer is not None:
+        return answer
+
+    chain = asemantic_chain if plan.type == "SEMANTIC" else amixed_chain
+    answer = await answer_flight.ado(key, chain, plan, user_query, user_id)
+
+    answer_cache.set(key, answer)
+    return answer
+
+
+async def astream_plan(plan_dict: dict, user_query: str, user_id: str):
+    """
+    Yields response events as soon as each piece is ready: structured
+    Mongo facts first, then LLM tokens as Groq generates them.
+    """
+    plan = resolve_plan(plan_dict)
+
+    if plan.type in ("FILTER", "AGGREGATION"):
+        yield {"event": "facts", "data": await aexecute_mongo(plan, user_id)}
+        return
+
+    if plan.type not in ("SEMANTIC", "MIXED"):
+        raise ValueError(f"Unsupported query type: {plan.type}")
+
+    version = await aget_data_version(async_db, user_id)
+    key = answer_cache.key(user_id, user_query, plan, version)
+    answer = answer_cache.get(key)
+    if answer is not None:
+        yield {"event": "token", "text": answer, "cached": True}
+        return
+
+    filters = vector_filters(plan)
+
     if plan.type == "SEMANTIC":
-        return semantic_chain(plan, user_query, user_id)
+        context = await avector_search(query=user_query, user_id=user_id, **filters)
+        prompt = semantic_prompt(context, user_query)
 
-    if plan.type == "MIXED":
-        return mixed_chain(plan, user_query, user_id)
+    elif plan.type == "MIXED":
+        # Vector search runs while the Mongo facts are fetched and sent
+        context_task = asyncio.create_task(
+            avector_search(query=user_query, user_id=user_id, **filters)
+        )
+        try:
+            mongo_result = await aexecute_mongo(plan, user_id)
+        except BaseException:
+            context_task.cancel()
+            raise
 
-    raise ValueError(f"Unsupported query type: {plan.type}")
+        yield {"event": "facts", "data": mongo_result}
+
+        prompt = mixed_prompt(mongo_result, await context_task, user_query)
+
+    tokens = []
+    metrics.count_llm_call("answer")
+    async for chunk in groq_llm.astream(prompt):
+        if chunk.content:
+            tokens.append(chunk.content)
+            yield {"event": "token", "text": chunk.content}
+
+    answer_cache.set(key, "".join(tokens))
+
+
+def query_router(user_query: str, user_id: str, fast_path: bool = True):
+    plan_dict, _ = plan_query(user_query, fast_path=fast_path)
+    return execute_plan(plan_dict, user_query, user_id)
+
+
+async def aquery_router(user_query: str, user_id: str, fast_path: bool = True):
+    plan_dict, _ = await aplan_query(user_query, fast_path=fast_path)
+    return await aexecute_plan(plan_dict, user_query, user_id)
 
 def query_router1(user_query: str, user_id: str):
     plan_dict = classifier_chain.invoke({"query": user_query})
@@ -0,0 +1,116 @@
+"""
+Response size and serialization time of a /bills page per view.
+
+Builds a page of synthetic bills shaped like real ingested ones (full
+OCR text, raw LLM output, extra_data), applies each view's projection
+the way Mongo would, and serializes the page the way FastAPI does
+(jsonable_encoder + json.dumps). Needs no database.
+
+Run from backend/:
+    python -m benchmarks.bench_bills_payload --page-size 100
+"""
+import argparse
+import copy
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+
+from services.bill_views import VIEWS
+from utils.text_utils import filter_keys, item_terms
+
+WORDS = "rice dal oil milk bread sugar salt tea coffee atta paneer butter soap chips".split()
+
+
+def fake_bill(rng: random.Random, i: int) -> dict:
+    items = [
+        {
+            "description": f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()}",
+            "quantity": float(rng.randint(1, 4)),
+            "rate": float(rng.randint(10, 300)),
+            "amount": float(rng.randint(10, 900)),
+            "gst": "5%",
+            "tax": 4.5,
+            "extra_data": {"hsn": str(rng.randint(1000, 9999)), "mrp": rng.randint(10, 999)},
+        }
+        for _ in range(rng.randint(3, 25))
+    ]
+    bill = {
+        "_id": f"bill-{i}",
+        "user_id": "u1",
+        "vendor": f"Store {i % 40}",
+        "bill_no": f"INV-{i:06d}",
+        "bill_date": datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(days=i),
+        "bill_time": "18:42",
+        "category": "Grocery",
+        "customer": "Walk-in",
+        "address": "12, Market Road, Pune 411001",
+        "phone": "+91 98765 43210",
+        "gst": "27ABCDE1234F1Z5",
+        "currency": "INR",
+        "subtotal": 1000.0,
+        "tax_amount": 50.0,
+        "total_amount": 1050.0,
+        "payment_method": "UPI",
+        "items": items,
+        "item_terms": item_terms(items),
+        "extra_data": {"cashier": "A1", "terminal": "T3", "notes": "x" * 200},
+        "raw_text": " ".join(rng.choice(WORDS) for _ in range(600)),
+        "source_file": f"uploads/u1/bill-{i}.pdf",
+        "file_path": f"uploads/u1/bill-{i}.pdf",
+    }
+    bill["raw"] = copy.deepcopy({k: bill[k] for k in ("vendor", "bill_no", "items", "total_amount")})
+    bill.update(filter_keys(bill))
+    return bill
+
+
+def apply_projection(doc: dict, projection: dict | None) -> dict:
+    """Top-level and one-level dotted include/exclude, as Mongo applies them."""
+    if not projection:
+        return doc
+
+    if 1 in projection.values():
+        out = {"_id": doc["_id"]}
+        for field in projection:
+            if field in doc:
+                out[field] = doc[field]
+        return out
+
+    out = copy.deepcopy(doc)
+    for field in projection:
+        head, _, tail = field.partition(".")
+        if not tail:
+            out.pop(head, None)
+        elif isinstance(out.get(head), list):
+            for sub in out[head]:
+                sub.pop(tail, None)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    page = [fake_bill(rng, i) for i in range(args.page_size)]
+
+    print(f"{'view':<8} {'bytes':>10} {'serialize ms':>13}")
+    for view, projection in VIEWS.items():
+        docs = [apply_projection(d, projection) for d in page]
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            body = json.dumps(jsonable_encoder({"data": docs}))
+            timings.append((time.perf_counter() - start) * 1000)
+
+        print(f"{view:<8} {len(body.encode('utf-8')):>10} {statistics.median(timings):>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
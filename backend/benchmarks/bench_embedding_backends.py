@@ -0,0 +1,85 @@
+"""
+Embedding backends side by side: load time, peak RSS and throughput of
+the PyTorch (sentence-transformers) model versus the int8 ONNX export.
+
+Each backend runs in its own interpreter so RSS is not shared. The ONNX
+model must be exported first (python export_onnx_embeddings.py).
+
+Run from backend/:
+    python -m benchmarks.bench_embedding_backends
+    python -m benchmarks.bench_embedding_backends --backend onnx --batch-size 1 8 64
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROBE = """
+import json, resource, sys, time
+from dotenv import load_dotenv
+load_dotenv()  # EMBEDDING_BACKEND from the parent still wins
+from services.resources import get_resource
+
+batch_sizes = [int(b) for b in sys.argv[1].split(",")]
+texts_per_run = int(sys.argv[2])
+corpus = [
+    f"Fresh Mart Grocery {i}.50 UPI basmati rice toor dal sunflower oil atta bill {i}"
+    for i in range(texts_per_run)
+]
+
+start = time.perf_counter()
+model = get_resource("embeddings")
+model.embed_documents(corpus[:8])  # first call pays one-time setup
+load_ms = (time.perf_counter() - start) * 1000
+
+throughput = {}
+for size in batch_sizes:
+    start = time.perf_counter()
+    for i in range(0, texts_per_run, size):
+        model.embed_documents(corpus[i:i + size])
+    throughput[size] = texts_per_run / (time.perf_counter() - start)
+
+# ru_maxrss is KiB on Linux
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({"load_ms": load_ms, "rss_mb": rss_mb, "throughput": throughput}))
+"""
+
+
+def run_backend(backend: str, batch_sizes, texts: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, ",".join(map(str, batch_sizes)), str(texts)],
+        env={**os.environ, "EMBEDDING_BACKEND": backend},
+        capture_output=True, text=True, check=False,
+    )
+    lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+    if out.returncode != 0 or not lines:
+        return {"error": (out.stderr.strip().splitlines() or ["no output"])[-1]}
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", action="append", choices=["torch", "onnx"])
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--texts", type=int, default=256, help="texts embedded per batch size")
+    args = parser.parse_args()
+
+    header = f"{'backend':<8} {'load ms':>9} {'peak RSS MB':>12}" + "".join(
+        f" {f'b={b} txt/s':>11}" for b in args.batch_size
+    )
+    print(header)
+
+    for backend in args.backend or ["torch", "onnx"]:
+        r = run_backend(backend, args.batch_size, args.texts)
+        if "error" in r:
+            print(f"{backend:<8} error: {r['error']}")
+            continue
+        print(
+            f"{backend:<8} {r['load_ms']:>9.0f} {r['rss_mb']:>12.0f}"
+            + "".join(f" {r['throughput'][str(b)]:>11.1f}" for b in args.batch_size)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Embedding throughput under concurrent callers: each caller embedding
+its own text directly on the model (batch size 1 per call) versus
+going through the micro-batching EmbeddingService.
+
+Loads the configured embedding model (EMBEDDING_MODEL); needs no
+database.
+
+Run from backend/:
+    python -m benchmarks.bench_embedding_batching --concurrency 1 8 32
+    EMBED_BATCH_MAX_WAIT_MS=2 python -m benchmarks.bench_embedding_batching
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.resources import get_resource
+from utils import metrics
+
+TEXTS = [
+    "total spent on groceries last month",
+    "what did I buy at the pharmacy recently",
+    "Fresh Mart Grocery 1450.00 UPI basmati rice toor dal sunflower oil",
+    "City Medicals Medical 320.50 CASH paracetamol cough syrup",
+    "Indian Oil Fuel 2000.00 CARD petrol",
+    "why was my electricity bill higher in march",
+]
+
+
+def run(embed, concurrency: int, total: int) -> dict:
+    latencies = []
+
+    def one(i: int):
+        start = time.perf_counter()
+        embed(f"{TEXTS[i % len(TEXTS)]} #{i}")
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=256, help="texts embedded per run")
+    args = parser.parse_args()
+
+    model = get_resource("embeddings")
+    service = get_resource("embedding_service")
+    # Load weights and warm both paths before timing
+    model.embed_query("warm up")
+    service.embed_query("warm up")
+
+    print(f"{'mode':<8} {'conc':>5} {'texts/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for concurrency in args.concurrency:
+        for mode, embed in (("direct", model.embed_query), ("batched", service.embed_query)):
+            r = run(embed, concurrency, args.requests)
+            print(f"{mode:<8} {concurrency:>5} {r['rps']:>9.1f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f}")
+
+    h = metrics.snapshot()["histograms"].get("embedding.batch_size")
+    if h:
+        print(f"\nbatch sizes (all runs): avg {h['sum'] / h['count']:.1f}, buckets {h['buckets']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Item search: legacy $unwind + unanchored $regex vs the indexed
+item_terms pipeline, at growing line-item counts.
+
+Seeds a throwaway collection (bench_item_search) in MONGO_DB_NAME with
+one user's history of ~10 items per bill, then times a "sum spent on X"
+query for a common and a rare item through both pipelines.
+
+Run from backend/:
+    python -m benchmarks.bench_item_search --items 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from services.item_search import item_search_stages, legacy_item_search_stages
+from utils.text_utils import item_terms
+
+load_dotenv()
+
+COLLECTION = "bench_item_search"
+USER_ID = "bench-user"
+ITEMS_PER_BILL = 10
+
+PRODUCTS = [
+    "Basmati Rice", "Toor Dal", "Sunflower Oil", "Amul Milk", "Brown Bread",
+    "Eggs", "Sugar", "Salt", "Tea Powder", "Coffee", "Wheat Atta", "Paneer",
+    "Curd", "Butter", "Onions", "Tomatoes", "Potatoes", "Bananas", "Apples",
+    "Detergent", "Toothpaste", "Shampoo", "Soap", "Biscuits", "Chips",
+    "Paracetamol", "Cough Syrup", "Petrol", "Diesel", "Notebook",
+]
+SIZES = ["", "500g", "1kg", "2kg", "5kg", "1L", "Pack of 6"]
+RARE = "Saffron"
+
+QUERIES = ["rice", RARE.lower()]
+
+
+def seed(col, n_items: int):
+    col.drop()
+    rng = random.Random(42)
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+    batch = []
+    for i in range(n_items // ITEMS_PER_BILL):
+        items = [
+            {
+                "description": f"{rng.choice(PRODUCTS)} {rng.choice(SIZES)}".strip(),
+                "quantity": float(rng.randint(1, 4)),
+                "amount": float(rng.randint(10, 800)),
+            }
+            for _ in range(ITEMS_PER_BILL)
+        ]
+        if i % 1000 == 0:
+            items[0]["description"] = f"{RARE} 1g"
+
+        batch.append({
+            "user_id": USER_ID,
+            "vendor": f"Store {i % 50}",
+            "bill_date": start + timedelta(hours=i),
+            "items": items,
+            "item_terms": item_terms(items),
+        })
+        if len(batch) >= 5000:
+            col.insert_many(batch, ordered=False)
+            batch = []
+
+    if batch:
+        col.insert_many(batch, ordered=False)
+
+    col.create_index([("user_id", 1), ("bill_date", 1)])
+    col.create_index([("user_id", 1), ("item_terms", 1)])
+
+
+def sum_pipeline(stages) -> list:
+    return stages + [{"$group": {"_id": None, "total": {"$sum": "$items.amount"}}}]
+
+
+def docs_examined(explain) -> int:
+    """Sums totalDocsExamined wherever it appears in an explain document."""
+    if isinstance(explain, dict):
+        return explain.get("totalDocsExamined", 0) + sum(
+            docs_examined(v) for k, v in explain.items() if k != "totalDocsExamined"
+        )
+    if isinstance(explain, list):
+        return sum(docs_examined(v) for v in explain)
+    return 0
+
+
+def measure(db, pipeline, repeat: int):
+    col = db[COLLECTION]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = list(col.aggregate(pipeline))
+        timings.append((time.perf_counter() - start) * 1000)
+
+    explain = db.command(
+        "explain",
+        {"aggregate": COLLECTION, "pipeline": pipeline, "cursor": {}},
+        verbosity="executionStats",
+    )
+    total = result[0]["total"] if result else 0
+    return statistics.median(timings), docs_examined(explain), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="leave the bench collection behind")
+    args = parser.parse_args()
+
+    db = MongoClient(os.getenv("MONGO_URI"))[os.getenv("MONGO_DB_NAME")]
+    match = {"user_id": USER_ID}
+
+    print(f"{'items':>9} {'query':<8} {'pipeline':<8} {'median ms':>10} {'docs examined':>14} {'total':>12}")
+    for n_items in args.items:
+        seed(db[COLLECTION], n_items)
+
+        for item in QUERIES:
+            for name, stages in (
+                ("legacy", legacy_item_search_stages(match, item)),
+                ("indexed", item_search_stages(match, item)),
+            ):
+                ms, examined, total = measure(db, sum_pipeline(stages), args.repeat)
+                print(f"{n_items:>9} {item:<8} {name:<8} {ms:>10.1f} {examined:>14} {total:>12.0f}")
+
+    if not args.keep:
+        db[COLLECTION].drop()
+
+
+if __name__ == "__main__":
+    main()
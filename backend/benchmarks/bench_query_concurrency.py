@@ -0,0 +1,94 @@
+"""
+Throughput of the /query pipeline under concurrent chat users.
+
+Runs the same query mix through the sync path (query_router on a
+bounded thread pool, like a sync FastAPI endpoint) and the async path
+(aquery_router on the event loop), in one process, against the Mongo,
+Pinecone and Groq configured in .env.
+
+Run from backend/:
+    python -m benchmarks.bench_query_concurrency --concurrency 1 8 32
+
+To take Groq out of the measurement, record once and then replay:
+    LLM_PROVIDER=record python -m benchmarks.bench_query_concurrency --concurrency 1
+    LLM_PROVIDER=replay LLM_REPLAY_LATENCY_MS=300 python -m benchmarks.bench_query_concurrency
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import aquery_router, plan_cache, query_router
+
+DEFAULT_QUERIES = [
+    "total spent on groceries last month",
+    "what did I buy at the pharmacy recently and why was it expensive",
+    "how much did I spend on rice in the last 3 months and on what brands",
+    "list bills paid by UPI last 2 months",
+]
+
+
+async def run_mode(mode: str, concurrency: int, total: int, queries, user_id, threads):
+    latencies = []
+    pool = ThreadPoolExecutor(max_workers=threads)
+    loop = asyncio.get_running_loop()
+    counter = iter(range(total))
+
+    async def one(query: str):
+        start = time.perf_counter()
+        if mode == "sync":
+            await loop.run_in_executor(pool, query_router, query, user_id)
+        else:
+            await aquery_router(query, user_id)
+        latencies.append(time.perf_counter() - start)
+
+    async def user():
+        for i in counter:
+            try:
+                await one(queries[i % len(queries)])
+            except Exception as e:
+                print(f"[BENCH] {mode} request failed: {e}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    pool.shutdown()
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "rps": len(latencies) / wall if wall else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=64, help="requests per run")
+    parser.add_argument("--threads", type=int, default=1,
+                        help="thread pool size for the sync path (one worker thread by default)")
+    parser.add_argument("--user-id", default="u1")
+    parser.add_argument("--query", action="append", help="override the query mix")
+    args = parser.parse_args()
+
+    queries = args.query or DEFAULT_QUERIES
+
+    print(f"{'mode':<6} {'conc':>5} {'reqs':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9}")
+    for concurrency in args.concurrency:
+        for mode in ("sync", "async"):
+            # Each run starts cold so both paths pay the same planning cost
+            plan_cache.local.clear()
+            r = await run_mode(mode, concurrency, args.requests, queries, args.user_id, args.threads)
+            print(
+                f"{r['mode']:<6} {r['concurrency']:>5} {r['requests']:>5} "
+                f"{r['rps']:>8.2f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Worker startup time: how long `import main` takes in a fresh
+interpreter, and what each shared resource costs on first use.
+
+Every sample runs in its own subprocess so nothing is warm (module
+cache aside). Resources are built against the services configured in
+.env; the ones that fail (e.g. Pinecone unreachable) are reported as
+errors, not fatal.
+
+Run from backend/:
+    python -m benchmarks.bench_startup --repeat 5
+    python -m benchmarks.bench_startup --out startup_history.jsonl   # track per release
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+DEFAULT_RESOURCES = ["mongo", "embeddings", "vector_store", "llm"]
+
+IMPORT_PROBE = """
+import json, time
+start = time.perf_counter()
+import main
+print(json.dumps({"import_ms": (time.perf_counter() - start) * 1000}))
+"""
+
+RESOURCE_PROBE = """
+import json, sys, time
+import main
+from services.resources import get_resource
+name = sys.argv[1]
+start = time.perf_counter()
+try:
+    get_resource(name)
+    print(json.dumps({"ms": (time.perf_counter() - start) * 1000}))
+except Exception as e:
+    print(json.dumps({"error": repr(e)}))
+"""
+
+
+def probe(code: str, *args) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", code, *args],
+        capture_output=True, text=True, check=False,
+    )
+    # main prints debug lines; the probe's JSON is the last one
+    lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+    if out.returncode != 0 or not lines:
+        return {"error": (out.stderr.strip().splitlines() or ["no output"])[-1]}
+    return json.loads(lines[-1])
+
+
+def git_version() -> str:
+    out = subprocess.run(
+        ["git", "describe", "--always", "--dirty"],
+        capture_output=True, text=True, check=False,
+    )
+    return out.stdout.strip() or "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--resource", action="append", help="resources to time (default: all)")
+    parser.add_argument("--out", help="append the result as one JSON line to this file")
+    args = parser.parse_args()
+
+    imports = [probe(IMPORT_PROBE) for _ in range(args.repeat)]
+    errors = [r["error"] for r in imports if "error" in r]
+    if errors:
+        sys.exit(f"import main failed: {errors[0]}")
+
+    import_ms = statistics.median(r["import_ms"] for r in imports)
+    print(f"{'import main':<16} {import_ms:>10.1f} ms  (median of {args.repeat})")
+
+    resources = {}
+    for name in args.resource or DEFAULT_RESOURCES:
+        samples = [probe(RESOURCE_PROBE, name) for _ in range(args.repeat)]
+        ok = [s["ms"] for s in samples if "ms" in s]
+        if ok:
+            resources[name] = round(statistics.median(ok), 1)
+            print(f"{name:<16} {resources[name]:>10.1f} ms  first use")
+        else:
+            resources[name] = None
+            print(f"{name:<16} {'error':>10}     {samples[0]['error']}")
+
+    if args.out:
+        record = {
+            "version": git_version(),
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "import_ms": round(import_ms, 1),
+            "first_use_ms": resources,
+        }
+        with open(args.out, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
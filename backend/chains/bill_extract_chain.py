@@ -1,7 +1,10 @@
+import hashlib
+
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from schemas.bill_extract import BillExtract
 from helper import groqllm
+from utils.single_flight import SingleFlight
 
 parser = PydanticOutputParser(pydantic_object=BillExtract)
 bill_extract_prompt = ChatPromptTemplate.from_messages([
@@ -43,6 +46,10 @@ Total Amount: Rs. 12,500
 
 
 bill_extract_chain = bill_extract_prompt | groqllm | parser
+
+# Re-uploads / retries of the same document share one Groq call
+extract_flight = SingleFlight("bill_extract")
+
 def extract_bill_structured(text: str) -> dict:
     # 🔴 GUARD CLAUSE: If text is empty/too short, don't hallucinate.
     if not text or len(text.strip()) < 10:
@@ -50,7 +57,8 @@ def extract_bill_structured(text: str) -> dict:
         return {}
 
     try:
-        result = bill_extract_chain.invoke({"bill_text": text})
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        result = extract_flight.do(key, bill_extract_chain.invoke, {"bill_text": text})
         return result.model_dump()
     except Exception as e:
         print("[BILL EXTRACT FAILED]", e)
@@ -0,0 +1,94 @@
+"""
+Checks /bills keyset pagination against a plain sorted listing.
+
+Bills share sort values and mix uuid-string and ObjectId _ids (uploaded
+vs ingested bills). Every sort field, both orders and several page
+sizes are paged through with continuation tokens; a case passes when
+the pages concatenate to exactly the full sorted listing.
+
+Run from backend/:
+    python check_bill_pagination.py           # in-memory (needs mongomock)
+    python check_bill_pagination.py --live    # scratch collection on MONGO_URI
+"""
+import argparse
+import sys
+import uuid
+from datetime import datetime
+
+from bson import ObjectId
+
+from services.bill_pagination import SORT_FIELDS, decode_cursor, encode_cursor, keyset_filter
+
+SCRATCH_COLLECTION = "bills_pagination_check"
+
+
+def sample_bills() -> list[dict]:
+    bills = []
+    for i in range(12):
+        bills.append({
+            # Alternate id types so every sort-value tie mixes them
+            "_id": ObjectId() if i % 2 else str(uuid.uuid4()),
+            "user_id": "check",
+            "bill_date": None if i % 5 == 0 else datetime(2026, 1, 1 + i % 3),
+            "total_amount": [100.0, 250.0][i % 2 == 0 and i % 3 == 0],
+            "vendor": ["Fresh Mart", "DMart"][i % 4 == 0],
+            "category": "Grocery",
+        })
+    return bills
+
+
+def page_through(collection, sort_by: str, order: int, page_size: int) -> list:
+    sort = [(sort_by, order), ("_id", order)]
+    seen, cursor = [], None
+    for _ in range(100):
+        query = {"user_id": "check"}
+        if cursor:
+            after = decode_cursor(cursor, sort_by, order)
+            query = {"$and": [query, keyset_filter(sort_by, order, after)]}
+        docs = list(collection.find(query).sort(sort).limit(page_size + 1))
+        seen += [d["_id"] for d in docs[:page_size]]
+        if len(docs) <= page_size:
+            return seen
+        cursor = encode_cursor(sort_by, order, docs[page_size - 1])
+    raise RuntimeError("pagination did not terminate")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    if args.live:
+        from db.mongodb import get_db
+        collection = get_db()[SCRATCH_COLLECTION]
+    else:
+        import mongomock
+        collection = mongomock.MongoClient().db[SCRATCH_COLLECTION]
+
+    collection.drop()
+    collection.insert_many(sample_bills())
+
+    failures = cases = 0
+    try:
+        for sort_by in sorted(SORT_FIELDS):
+            for order in (1, -1):
+                expected = [
+                    d["_id"] for d in
+                    collection.find({"user_id": "check"}).sort([(sort_by, order), ("_id", order)])
+                ]
+                for page_size in (1, 2, 3, 5):
+                    cases += 1
+                    got = page_through(collection, sort_by, order, page_size)
+                    if got != expected:
+                        failures += 1
+                        print(f"FAIL sort_by={sort_by} order={order} page_size={page_size}: "
+                              f"{len(got)}/{len(expected)} rows")
+    finally:
+        collection.drop()
+
+    print(f"{cases - failures}/{cases} pagings match the full listing")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
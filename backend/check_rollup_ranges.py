@@ -0,0 +1,48 @@
+"""
+Checks which time phrases are answered from bill_rollups.
+
+Each phrase is parsed and resolved exactly as /query does, then split by
+rollup_service. A case passes when the number of partial-month edges
+read from raw bills matches the expectation (0 = rollups only, None =
+no full month in range, raw bills only).
+
+Run from backend/:  python check_rollup_ranges.py
+"""
+import sys
+
+from services.rollup_service import rollup_pipeline
+from templates.time_parser import parse_time_range
+from templates.time_resolver import resolve_time_range
+
+# (phrase, raw-bill edges expected)
+CASES = [
+    ("total spent last month", 0),
+    ("total for jan 2026", 0),
+    ("total for last 3 months", 0),
+    ("grocery bills in 2025", 0),
+    ("bills between sept 2024 and nov 2024", 0),
+    ("q1 2025 spend", 0),
+    ("expenses in fy 2024-25", 0),
+    ("bills before march 2025", 0),
+    ("bills this month", 0),
+    ("spend since 15 jan 2026", 2),
+    ("bills on 19 jan 2026", None),
+]
+
+
+def main():
+    failures = 0
+    for phrase, want_edges in CASES:
+        date_range = resolve_time_range(parse_time_range(phrase))
+        pipeline = rollup_pipeline({"user_id": "u", "bill_date": date_range}, "sum")
+        edges = None if pipeline is None else sum("$unionWith" in stage for stage in pipeline)
+        if edges != want_edges:
+            failures += 1
+            print(f"FAIL {phrase!r}: {date_range}\n  raw-bill edges: {edges}, expected {want_edges}")
+
+    print(f"{len(CASES) - failures}/{len(CASES)} ranges split as expected")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Golden corpus for services/rule_planner.py.
+
+Each phrase is paired with the (type, operation, filters, group_by) the
+fast path must produce, or None when it has to fall back to the LLM
+classifier. Time ranges are covered by check_time_parser.py.
+
+Run from backend/:  python check_rule_planner.py
+"""
+import sys
+
+from services.rule_planner import rule_plan
+
+GOLDEN = [
+    # ---------- list ----------
+    ("show me bills", ("FILTER", "list", None, None)),
+    ("show bills", ("FILTER", "list", None, None)),
+    ("show me all my grocery bills", ("FILTER", "list", {"category": "Grocery"}, None)),
+    ("show me my bills from fresh mart", ("FILTER", "list", {"vendor": "Fresh Mart"}, None)),
+    ("list bills paid by upi last 3 months", ("FILTER", "list", {"payment_method": "UPI"}, None)),
+    ("show bills from jan 2026", ("FILTER", "list", None, None)),
+
+    # ---------- aggregations ----------
+    ("total spent on groceries last month", ("AGGREGATION", "sum", {"category": "Grocery"}, None)),
+    ("how much did i spend at dmart this year", ("AGGREGATION", "sum", {"vendor": "Dmart"}, None)),
+    ("how many bills from fresh mart", ("AGGREGATION", "count", {"vendor": "Fresh Mart"}, None)),
+    ("count grocery bills", ("AGGREGATION", "count", {"category": "Grocery"}, None)),
+
+    # ---------- breakdowns ----------
+    ("spending by category last month", ("AGGREGATION", "sum", None, "category")),
+    ("top 5 vendors", ("AGGREGATION", "sum", None, "vendor")),
+
+    # ---------- LLM fallback ----------
+    ("total spent on rice", None),
+    ("show me bills from last 0 months", None),
+    ("why was my electricity bill so high", None),
+    ("show bills from dmart and reliance", None),
+    ("how much did i spend at dmart or reliance", None),
+    ("total spent at dmart, reliance", None),
+    ("top 0 vendors", None),
+]
+
+
+def summary(plan: dict | None):
+    if plan is None:
+        return None
+    return plan["type"], plan["operation"], plan["filters"], plan.get("group_by")
+
+
+def main():
+    failures = 0
+    for phrase, expected in GOLDEN:
+        got = summary(rule_plan(phrase))
+        if got != expected:
+            failures += 1
+            print(f"FAIL {phrase!r}\n  expected: {expected}\n  got:      {got}")
+
+    print(f"{len(GOLDEN) - failures}/{len(GOLDEN)} phrases match")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
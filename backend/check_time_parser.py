@@ -0,0 +1,190 @@
+"""
+Golden corpus for templates/time_parser.py.
+
+Each phrase is paired with the TimeRange the LLM time_range_chain is
+expected to emit (same conventions as its few-shot examples). A case
+passes when both resolve to the same Mongo range through
+time_resolver.resolve_time_range.
+
+Run from backend/:  python check_time_parser.py
+"""
+import sys
+import time
+
+from templates.time_parser import parse_time_range
+from templates.time_range import TimeRange
+from templates.time_resolver import resolve_time_range
+
+
+def rel(unit, offset, **extra):
+    return {"relative": {"unit": unit, "offset": offset}, **extra}
+
+
+GOLDEN = [
+    # ---------- LLM few-shot examples ----------
+    ("Total bill for last month",
+     {"type": "RELATIVE", "from": rel("month", -1), "to": rel("day", 0), "granularity": "month"}),
+    ("Total bill for last 3 month",
+     {"type": "RELATIVE", "from": rel("month", -3), "to": rel("month", -1), "granularity": "month"}),
+    ("Total bill for last november",
+     {"type": "RELATIVE", "from": rel("year", -1, month=11), "to": rel("year", -1, month=11), "granularity": "month"}),
+    ("Bills between sept 2024 and nov 2024",
+     {"type": "ABSOLUTE", "from": {"year": 2024, "month": 9}, "to": {"year": 2024, "month": 11}, "granularity": "month"}),
+    ("from 9th sept 2024 to 10 oct 2025",
+     {"type": "ABSOLUTE", "from": {"year": 2024, "month": 9, "day": 9}, "to": {"year": 2025, "month": 10, "day": 10}, "granularity": "day"}),
+    ("all time", None),
+
+    # ---------- single days ----------
+    ("total bill amount in 19 jan 2026",
+     {"type": "ABSOLUTE", "from": {"year": 2026, "month": 1, "day": 19}, "to": None, "granularity": "day"}),
+    ("bills on jan 19th, 2026",
+     {"type": "ABSOLUTE", "from": {"year": 2026, "month": 1, "day": 19}, "to": None, "granularity": "day"}),
+    ("bills dated 19/01/2026",
+     {"type": "ABSOLUTE", "from": {"year": 2026, "month": 1, "day": 19}, "to": None, "granularity": "day"}),
+    ("bills dated 2026-01-19",
+     {"type": "ABSOLUTE", "from": {"year": 2026, "month": 1, "day": 19}, "to": None, "granularity": "day"}),
+    ("what did I buy on the 3rd of march 2025",
+     {"type": "ABSOLUTE", "from": {"year": 2025, "month": 3, "day": 3}, "to": None, "granularity": "day"}),
+    ("spend today",
+     {"type": "RELATIVE", "from": rel("day", 0), "to": rel("day", 0), "granularity": "day"}),
+    ("spend yesterday",
+     {"type": "RELATIVE", "from": rel("day", -1), "to": rel("day", -1), "granularity": "day"}),
+
+    # ---------- months and years ----------
+    ("show all the bills of Rice purchase in jan 2026",
+     {"type": "ABSOLUTE", "from": {"year": 2026, "month": 1}, "to": None, "granularity": "month"}),
+    ("total for september 2024",
+     {"type": "ABSOLUTE", "from": {"year": 2024, "month": 9}, "to": None, "granularity": "month"}),
+    ("grocery bills in 2025",
+     {"type": "ABSOLUTE", "from": {"year": 2025}, "to": None, "granularity": "year"}),
+    ("medical bills from jan 2025 to mar 2025",
+     {"type": "ABSOLUTE", "from": {"year": 2025, "month": 1}, "to": {"year": 2025, "month": 3}, "granularity": "month"}),
+    ("bills between sept and nov 2024",
+     {"type": "ABSOLUTE", "from": {"year": 2024, "month": 9}, "to": {"year": 2024, "month": 11}, "granularity": "month"}),
+    ("bills from dec to feb 2025",
+     {"type": "ABSOLUTE", "from": {"year": 2024, "month": 12}, "to": {"year": 2025, "month": 2}, "granularity": "month"}),
+    ("bills in march",
+     {"type": "RELATIVE", "from": rel("year", 0, month=3), "to": rel("year", 0, month=3), "granularity": "month"}),
+
+    # ---------- relative offsets ----------
+    ("total bill for last 5 months",
+     {"type": "RELATIVE", "from": rel("month", -5), "to": rel("month", -1), "granularity": "month"}),
+    ("spend over the past two months",
+     {"type": "RELATIVE", "from": rel("month", -2), "to": rel("month", -1), "granularity": "month"}),
+    ("total of last year",
+     {"type": "RELATIVE", "from": rel("year", -1), "to": rel("year", -1), "granularity": "year"}),
+    ("spend in the past month",
+     {"type": "RELATIVE", "from": rel("month", -1), "to": rel("month", -1), "granularity": "month"}),
+    ("bills from the past year",
+     {"type": "RELATIVE", "from": rel("year", -1), "to": rel("year", -1), "granularity": "year"}),
+    ("bills this month",
+     {"type": "RELATIVE", "from": rel("month", 0), "to": rel("month", 0), "granularity": "month"}),
+    ("bills this year",
+     {"type": "RELATIVE", "from": rel("year", 0), "to": rel("year", 0), "granularity": "year"}),
+    ("last 7 days",
+     {"type": "RELATIVE", "from": rel("day", -7), "to": rel("day", 0), "granularity": "day"}),
+    ("last 2 weeks",
+     {"type": "RELATIVE", "from": rel("day", -14), "to": rel("day", 0), "granularity": "day"}),
+    ("bills from 3 months ago",
+     {"type": "RELATIVE", "from": rel("month", -3), "to": rel("month", -3), "granularity": "month"}),
+    ("last 2 years",
+     {"type": "RELATIVE", "from": rel("year", -2), "to": rel("year", -1), "granularity": "year"}),
+
+    # ---------- since / until ----------
+    ("spend since march 2025",
+     {"type": "ABSOLUTE", "from": {"year": 2025, "month": 3}, "to": rel("day", 0), "granularity": "month"}),
+    ("bills since 1st jan 2026",
+     {"type": "ABSOLUTE", "from": {"year": 2026, "month": 1, "day": 1}, "to": rel("day", 0), "granularity": "day"}),
+    ("bills since last month",
+     {"type": "RELATIVE", "from": rel("month", -1), "to": rel("month", 0), "granularity": "month"}),
+    ("bills until 2024",
+     {"type": "ABSOLUTE", "from": None, "to": {"year": 2024}, "granularity": "year"}),
+    ("bills before march 2025",
+     {"type": "ABSOLUTE", "from": None, "to": {"year": 2025, "month": 3}, "granularity": "month"}),
+    ("bills since yesterday",
+     {"type": "RELATIVE", "from": rel("day", -1), "to": rel("day", 0), "granularity": "day"}),
+    ("spend after last quarter",
+     {"type": "RELATIVE", "from": rel("quarter", -1), "to": rel("day", 0), "granularity": "month"}),
+    ("bills since this month",
+     {"type": "RELATIVE", "from": rel("month", 0), "to": rel("month", 0), "granularity": "month"}),
+    ("spend until today",
+     {"type": "ABSOLUTE", "from": None, "to": rel("day", 0), "granularity": "day"}),
+    ("bills until last month",
+     {"type": "ABSOLUTE", "from": None, "to": rel("month", -1), "granularity": "month"}),
+    ("bills before last year",
+     {"type": "ABSOLUTE", "from": None, "to": rel("year", -1), "granularity": "year"}),
+
+    # ---------- "from X" with no end is the period X ----------
+    ("show bills from jan 2026",
+     {"type": "ABSOLUTE", "from": {"year": 2026, "month": 1}, "to": None, "granularity": "month"}),
+    ("list grocery bills from 2025",
+     {"type": "ABSOLUTE", "from": {"year": 2025}, "to": None, "granularity": "year"}),
+    ("bills from 19/01/2026",
+     {"type": "ABSOLUTE", "from": {"year": 2026, "month": 1, "day": 19}, "to": None, "granularity": "day"}),
+    ("bills from march",
+     {"type": "RELATIVE", "from": rel("year", 0, month=3), "to": rel("year", 0, month=3), "granularity": "month"}),
+    ("spend after march 2025",
+     {"type": "ABSOLUTE", "from": {"year": 2025, "month": 3}, "to": rel("day", 0), "granularity": "month"}),
+
+    # ---------- quarters ----------
+    ("q1 2025 spend",
+     {"type": "ABSOLUTE", "from": {"year": 2025, "month": 1}, "to": {"year": 2025, "month": 3}, "granularity": "month"}),
+    ("third quarter of 2024",
+     {"type": "ABSOLUTE", "from": {"year": 2024, "month": 7}, "to": {"year": 2024, "month": 9}, "granularity": "month"}),
+    ("last quarter",
+     {"type": "RELATIVE", "from": rel("quarter", -1), "to": rel("quarter", -1), "granularity": "month"}),
+    ("this quarter",
+     {"type": "RELATIVE", "from": rel("quarter", 0), "to": rel("quarter", 0), "granularity": "month"}),
+
+    # ---------- fiscal years (April start) ----------
+    ("expenses in fy 2024-25",
+     {"type": "ABSOLUTE", "from": {"year": 2024, "month": 4}, "to": {"year": 2025, "month": 3}, "granularity": "month"}),
+    ("expenses in FY25",
+     {"type": "ABSOLUTE", "from": {"year": 2024, "month": 4}, "to": {"year": 2025, "month": 3}, "granularity": "month"}),
+    ("last financial year",
+     {"type": "RELATIVE", "from": rel("fiscal_year", -1), "to": rel("fiscal_year", -1), "granularity": "month"}),
+
+    # ---------- no time intent ----------
+    ("recent bills", None),
+    ("bills over 2000", None),
+    ("may I see my grocery bills", None),
+
+    # ---------- impossible phrases fall back to the LLM ----------
+    ("bills dated 31/02/2026", None),
+    ("bills dated 2026-13-45", None),
+    ("bills from 30 feb 2025 to 5 mar 2025", None),
+    ("total for last 0 months", None),
+]
+
+
+def resolve(tr: TimeRange | None):
+    if tr is None or tr.type == "NONE":
+        return None
+    return resolve_time_range(tr)
+
+
+def main():
+    failures = 0
+    elapsed = 0.0
+
+    for phrase, expected in GOLDEN:
+        start = time.perf_counter()
+        parsed = parse_time_range(phrase)
+        elapsed += time.perf_counter() - start
+
+        want = resolve(TimeRange(**expected)) if expected else None
+        got = resolve(parsed)
+
+        if want != got:
+            failures += 1
+            print(f"FAIL {phrase!r}\n  parsed:   {parsed}\n  expected: {want}\n  got:      {got}")
+
+    print(
+        f"{len(GOLDEN) - failures}/{len(GOLDEN)} phrases match, "
+        f"avg parse {elapsed / len(GOLDEN) * 1e6:.1f} µs"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
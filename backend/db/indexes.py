@@ -1,5 +1,77 @@
+from pymongo.errors import OperationFailure
+
+from services.plan_cache import PLAN_CACHE_TTL_SECONDS
+
+# (collection, keys, options). Names are Mongo's defaults, so an index
+# created by hand with the same keys is recognized as present.
+INDEXES = [
+    # (user_id, <sort field>, _id): /bills keyset pagination
+    ("bills", [("user_id", 1), ("bill_date", 1), ("_id", 1)], {}),
+    ("bills", [("user_id", 1), ("total_amount", 1), ("_id", 1)], {}),
+    ("bills", [("user_id", 1), ("vendor", 1), ("_id", 1)], {}),
+    ("bills", [("user_id", 1), ("category", 1), ("_id", 1)], {}),
+    # Filters are exact matches on the canonical *_key fields
+    ("bills", [("user_id", 1), ("category_key", 1), ("bill_date", 1)], {}),
+    ("bills", [("user_id", 1), ("vendor_key", 1), ("bill_date", 1)], {}),
+    ("bills", [("user_id", 1), ("payment_method_key", 1), ("bill_date", 1)], {}),
+    # Multikey: narrows item queries before any $unwind
+    ("bills", [("user_id", 1), ("item_terms", 1)], {}),
+
+    # Line items, one row per item (services/bill_items_service.py)
+    ("bill_items", [("bill_id", 1)], {}),
+    ("bill_items", [("user_id", 1), ("terms", 1), ("bill_date", 1)], {}),
+    ("bill_items", [("user_id", 1), ("product", 1), ("bill_date", 1)], {}),
+
+    # Search-as-you-type prefix postings (services/search_index.py)
+    ("bill_search_grams", [("user_id", 1), ("gram", 1), ("bill_date", 1)], {}),
+    ("bill_search_grams", [("bill_id", 1)], {}),
+
+    # Monthly rollups (services/rollup_service.py)
+    ("bill_rollups", [("user_id", 1), ("month", 1)], {}),
+
+    # Shared query-plan cache; Mongo expires entries after the cache TTL
+    ("query_plan_cache", [("created_at", 1)], {"expireAfterSeconds": PLAN_CACHE_TTL_SECONDS}),
+]
+
+
+def index_name(keys) -> str:
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+def reconcile_indexes(db) -> dict:
+    """
+    Creates the declared indexes that are missing (matched on key
+    pattern, not name). Existing indexes are never dropped or changed;
+    ones with the same keys but different options are reported.
+    """
+    report = {"created": [], "present": [], "conflicts": []}
+    existing = {}
+
+    for collection, keys, options in INDEXES:
+        if collection not in existing:
+            existing[collection] = {
+                tuple((f, d if isinstance(d, str) else int(d)) for f, d in info["key"]): info
+                for info in db[collection].index_information().values()
+            }
+
+        label = f"{collection}.{index_name(keys)}"
+        info = existing[collection].get(tuple(keys))
+
+        if info is None:
+            try:
+                db[collection].create_index(keys, **options)
+                report["created"].append(label)
+            except OperationFailure as e:
+                report["conflicts"].append(f"{label}: {e}")
+            continue
+
+        if any(info.get(k) != v for k, v in options.items()):
+            report["conflicts"].append(f"{label}: options differ from {options}")
+        else:
+            report["present"].append(label)
+
+    return report
+
+
 def create_indexes(db):
-    db.bills.create_index([("user_id", 1), ("bill_date", 1)])
-    db.bills.create_index([("user_id", 1), ("category", 1), ("bill_date", 1)])
-    db.bills.create_index([("user_id", 1), ("vendor", 1)])
-    db.bills.create_index([("user_id", 1), ("total_amount", 1)])
+    return reconcile_indexes(db)
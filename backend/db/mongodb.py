@@ -1,12 +1,17 @@
 # backend/db/mongo.py
-from pymongo import MongoClient
 import os
-MONGO_URI = os.getenv("MONGO_URI")
-MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
-_client = MongoClient(MONGO_URI)
+
+from services.resources import get_resource
+
 
 def get_db():
-    return _client[MONGO_DB_NAME]
+    # One MongoClient per process, shared with app.py
+    return get_resource("mongo")[os.getenv("MONGO_DB_NAME")]
+
+
+def get_async_db():
+    return get_resource("async_mongo")[os.getenv("MONGO_DB_NAME")]
+
 
 def close_db():
-    _client.close()
\ No newline at end of file
+    get_resource("mongo").close()
@@ -0,0 +1,140 @@
+"""
+Exports the sentence-transformers embedding model to ONNX, quantizes it
+to int8 (dynamic quantization), and checks the result against the
+PyTorch embeddings.
+
+    python export_onnx_embeddings.py                  # export + quantize + parity check
+    python export_onnx_embeddings.py --check-only     # parity check of an existing export
+    python export_onnx_embeddings.py --min-cosine 0.995
+
+Then serve it with EMBEDDING_BACKEND=onnx (ONNX_MODEL_DIR = --out-dir).
+Needs torch, transformers, sentence-transformers, onnx and onnxruntime
+at export time; only onnxruntime and tokenizers at serving time.
+
+The parity check embeds SAMPLE_CORPUS with both backends and reports
+per-text cosine similarity and whether each query keeps its nearest
+document. Exits 1 when the minimum cosine is below --min-cosine or any
+nearest neighbour changes.
+"""
+import argparse
+import inspect
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from services.onnx_embeddings import MODEL_FILE, OnnxEmbeddings
+from services.resources import DEFAULT_EMBEDDING_MODEL, DEFAULT_ONNX_MODEL_DIR
+
+load_dotenv()
+
+FP32_FILE = "model.onnx"
+
+SAMPLE_QUERIES = [
+    "total spent on groceries last month",
+    "what did I buy at the pharmacy recently",
+    "why was my electricity bill so high",
+    "fuel expenses on my credit card",
+    "restaurant bills from the weekend",
+    "how much rice and dal did I buy",
+]
+
+SAMPLE_DOCUMENTS = [
+    "Fresh Mart Grocery 1450.00 UPI basmati rice toor dal sunflower oil atta",
+    "City Medicals Medical 320.50 CASH paracetamol cough syrup bandages",
+    "MSEB Electricity 2875.00 UPI units consumed 412 previous reading 10234",
+    "Indian Oil Fuel 2000.00 CARD petrol 19.2 litres",
+    "Spice Route Restaurant Food 1860.00 CARD paneer tikka butter naan lassi",
+    "DMart Grocery 3120.75 UPI sugar salt tea biscuits detergent soap",
+    "Apollo Pharmacy Medical 845.00 CARD vitamin d3 antacid",
+    "Uber Travel 412.00 UPI airport drop",
+]
+
+SAMPLE_CORPUS = SAMPLE_QUERIES + SAMPLE_DOCUMENTS
+
+
+def export(model_name: str, out_dir: str, opset: int):
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+    tokenizer.save_pretrained(out_dir)  # writes tokenizer.json
+
+    sample = tokenizer(["a sample bill"], return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    axes = {name: {0: "batch", 1: "sequence"} for name in names}
+    axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        kwargs["dynamo"] = False  # dynamic_axes is the TorchScript exporter's API
+
+    fp32_path = os.path.join(out_dir, FP32_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in names),
+            fp32_path,
+            input_names=names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=axes,
+            opset_version=opset,
+            **kwargs,
+        )
+
+    int8_path = os.path.join(out_dir, MODEL_FILE)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+    print(
+        f"exported {fp32_path} ({os.path.getsize(fp32_path) / 1e6:.1f} MB) → "
+        f"{int8_path} ({os.path.getsize(int8_path) / 1e6:.1f} MB)"
+    )
+
+
+def parity(model_name: str, out_dir: str, min_cosine: float) -> bool:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+
+    reference = SentenceTransformer(model_name, device="cpu").encode(
+        SAMPLE_CORPUS, normalize_embeddings=True
+    )
+    candidate = np.array(OnnxEmbeddings(out_dir).embed_documents(SAMPLE_CORPUS))
+
+    # Both sides are unit vectors, so the row-wise dot is the cosine
+    cosines = (reference * candidate).sum(axis=1)
+    print(f"cosine vs PyTorch over {len(SAMPLE_CORPUS)} texts: "
+          f"min {cosines.min():.4f}, mean {cosines.mean():.4f}")
+
+    n = len(SAMPLE_QUERIES)
+    ref_top = (reference[:n] @ reference[n:].T).argmax(axis=1)
+    cand_top = (candidate[:n] @ candidate[n:].T).argmax(axis=1)
+    changed = [SAMPLE_QUERIES[i] for i in range(n) if ref_top[i] != cand_top[i]]
+    print(f"nearest document unchanged for {n - len(changed)}/{n} queries")
+    for query in changed:
+        print(f"  changed: {query!r}")
+
+    return cosines.min() >= min_cosine and not changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL))
+    parser.add_argument("--out-dir", default=os.getenv("ONNX_MODEL_DIR", DEFAULT_ONNX_MODEL_DIR))
+    parser.add_argument("--opset", type=int, default=14)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument("--check-only", action="store_true")
+    args = parser.parse_args()
+
+    if not args.check_only:
+        export(args.model, args.out_dir, args.opset)
+
+    ok = parity(args.model, args.out_dir, args.min_cosine)
+    print("parity: ok" if ok else f"parity: FAILED (min cosine {args.min_cosine})")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,19 @@
-from langchain_groq import ChatGroq
 from dotenv import load_dotenv
-import os
+from langchain_core.runnables import RunnableLambda
 
 load_dotenv()
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-groqllm = ChatGroq(
-    api_key=GROQ_API_KEY,
-    model_name="llama-3.1-8b-instant",
-    temperature=0,
-)
\ No newline at end of file
+
+# Provider is chosen by LLM_PROVIDER (groq | record | replay); the
+# instance is the process-wide one from services/resources.py
+from services.resources import get_resource
+
+
+def get_groq_llm():
+    """The shared LLM, built on first use."""
+    return get_resource("llm")
+
+
+# Stands in for the LLM in chains composed at import time; the model is
+# resolved when the chain first runs (invoke, ainvoke and streaming all
+# pass through to it)
+groqllm = RunnableLambda(lambda _: get_groq_llm(), name="llm")
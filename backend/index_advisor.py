@@ -0,0 +1,190 @@
+"""
+Index advisor: replays representative QueryPlans (and /bills listing
+queries) through explain("executionStats") and flags plans that scan.
+
+    python index_advisor.py                        # built-in corpus
+    python index_advisor.py --log queries.jsonl    # plans from QUERY_LOG_PATH
+    python index_advisor.py --user-id u42 --max-ratio 5
+
+A plan is flagged when it contains a COLLSCAN, or when it examines more
+than --max-ratio documents per document returned. Flagged plans get an
+index suggestion built from their first $match (equality fields, then
+sort, then range fields). Exits 1 when anything is flagged, so it can
+gate a deploy.
+"""
+import argparse
+import json
+import sys
+
+from app import build_mongo_pipeline, db, resolve_plan
+from db.indexes import INDEXES, index_name
+from services.bill_pagination import SORT_FIELDS
+
+CORPUS = [
+    {"type": "AGGREGATION", "operation": "sum", "filters": {"category": "Medical"},
+     "time_range": {"type": "RELATIVE", "granularity": "month",
+                    "from": {"relative": {"unit": "month", "offset": -6}},
+                    "to": {"relative": {"unit": "month", "offset": -1}}}},
+    {"type": "AGGREGATION", "operation": "sum", "filters": {"category": "Grocery"},
+     "time_range": {"type": "RELATIVE", "granularity": "day",
+                    "from": {"relative": {"unit": "day", "offset": -30}},
+                    "to": {"relative": {"unit": "day", "offset": 0}}}},
+    {"type": "AGGREGATION", "operation": "count", "filters": {"vendor": "DMart"}},
+    {"type": "FILTER", "operation": "list", "filters": {"payment_method": "UPI"},
+     "time_range": {"type": "RELATIVE", "granularity": "month",
+                    "from": {"relative": {"unit": "month", "offset": -2}},
+                    "to": {"relative": {"unit": "month", "offset": -1}}}},
+    {"type": "FILTER", "operation": "list", "filters": {"bill_no": "INV-1001"}},
+    {"type": "AGGREGATION", "operation": "sum", "entities": {"item": "rice"},
+     "time_range": {"type": "RELATIVE", "granularity": "month",
+                    "from": {"relative": {"unit": "month", "offset": -3}},
+                    "to": {"relative": {"unit": "month", "offset": -1}}}},
+    {"type": "FILTER", "operation": "list", "entities": {"item": "milk"},
+     "filters": {"vendor": "Fresh Mart"}},
+    {"type": "AGGREGATION", "operation": "count", "entities": {"item": "paracetamol"}},
+    {"type": "AGGREGATION", "operation": "sum", "group_by": "category",
+     "time_range": {"type": "RELATIVE", "granularity": "month",
+                    "from": {"relative": {"unit": "month", "offset": -3}},
+                    "to": {"relative": {"unit": "month", "offset": -1}}}},
+    {"type": "AGGREGATION", "operation": "sum", "group_by": "vendor", "limit": 5,
+     "filters": {"category": "Grocery"}},
+]
+
+
+def walk(node):
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from walk(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from walk(value)
+
+
+def summarize(explain: dict) -> dict:
+    stages = [n for n in walk(explain) if "stage" in n]
+    stats = [n for n in walk(explain) if "totalDocsExamined" in n]
+    return {
+        "collscan": any(n["stage"] == "COLLSCAN" for n in stages),
+        "indexes": sorted({n["indexName"] for n in stages if n.get("indexName")}),
+        "docs_examined": sum(n["totalDocsExamined"] for n in stats),
+        "keys_examined": sum(n.get("totalKeysExamined", 0) for n in stats),
+        "returned": sum(n.get("nReturned", 0) for n in stats),
+    }
+
+
+def suggest_index(match: dict, sort: list | None = None) -> list:
+    """Equality → sort → range ordering of the first $match fields."""
+    equality, ranges = [], []
+    for field, cond in match.items():
+        if field.startswith("$"):
+            continue
+        is_range = isinstance(cond, dict) and any(
+            op in cond for op in ("$gt", "$gte", "$lt", "$lte", "$regex", "$ne")
+        )
+        (ranges if is_range else equality).append(field)
+
+    keys = [(f, 1) for f in equality]
+    keys += [(f, d) for f, d in sort or [] if f not in equality]
+    keys += [(f, 1) for f in ranges if f not in dict(keys)]
+    return keys
+
+
+def explain_aggregate(collection: str, pipeline: list) -> dict:
+    return db.command(
+        "explain",
+        {"aggregate": collection, "pipeline": pipeline, "cursor": {}},
+        verbosity="executionStats",
+    )
+
+
+def explain_find(query: dict, sort: list) -> dict:
+    return db.command(
+        "explain",
+        {"find": "bills", "filter": query, "sort": dict(sort), "limit": 10},
+        verbosity="executionStats",
+    )
+
+
+def plan_cases(plans, user_id):
+    for plan_dict in plans:
+        plan = resolve_plan(plan_dict)
+        collection, pipeline = build_mongo_pipeline(plan, user_id)
+        match = pipeline[0].get("$match", {}) if pipeline else {}
+        label = f"{plan.type}/{plan.operation} {json.dumps(plan_dict.get('filters') or {})}"
+        if plan.entities:
+            label += f" item={plan.entities.get('item')}"
+        if plan.group_by:
+            label += f" group_by={plan.group_by}"
+        yield label, collection, match, None, explain_aggregate(collection, pipeline)
+
+
+def listing_cases(user_id):
+    # The shapes get_bills produces: every sort field, optionally by category
+    for sort_by in sorted(SORT_FIELDS):
+        sort = [(sort_by, -1), ("_id", -1)]
+        for query in ({"user_id": user_id}, {"user_id": user_id, "category_key": "grocery"}):
+            label = f"/bills sort={sort_by} filter={sorted(query)}"
+            yield label, "bills", query, sort, explain_find(query, sort)
+
+
+def load_log(path: str) -> list:
+    plans, seen = [], set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            plan = json.loads(line)["plan"]
+            if plan.get("type") not in ("FILTER", "AGGREGATION", "MIXED"):
+                continue
+            key = json.dumps(plan, sort_keys=True)
+            if key not in seen:
+                seen.add(key)
+                plans.append(plan)
+    return plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--log", help="JSONL query log written via QUERY_LOG_PATH")
+    parser.add_argument("--user-id", default="u1", help="user whose data the plans run against")
+    parser.add_argument("--max-ratio", type=float, default=10.0,
+                        help="flag plans examining more docs than this per doc returned")
+    parser.add_argument("--min-docs", type=int, default=100,
+                        help="ignore ratios on plans examining fewer docs than this")
+    args = parser.parse_args()
+
+    plans = load_log(args.log) if args.log else CORPUS
+    declared = {(c, tuple(k)) for c, k, _ in INDEXES}
+    flagged = 0
+
+    cases = list(plan_cases(plans, args.user_id)) + list(listing_cases(args.user_id))
+    for label, collection, match, sort, explain in cases:
+        s = summarize(explain)
+        ratio = s["docs_examined"] / max(s["returned"], 1)
+
+        reasons = []
+        if s["collscan"]:
+            reasons.append("COLLSCAN")
+        if s["docs_examined"] >= args.min_docs and ratio > args.max_ratio:
+            reasons.append(f"examined/returned={ratio:.1f}")
+
+        status = "FLAG" if reasons else "ok"
+        print(
+            f"[{status:>4}] {collection:<12} {label}\n"
+            f"       indexes={s['indexes'] or '-'} keys={s['keys_examined']} "
+            f"docs={s['docs_examined']} returned={s['returned']}"
+        )
+
+        if reasons:
+            flagged += 1
+            keys = suggest_index(match, sort)
+            note = "declared in db/indexes.py, not built?" if (collection, tuple(keys)) in declared else "new"
+            print(f"       {', '.join(reasons)} → suggest {collection}.{index_name(keys)} ({note})")
+
+    print(f"\n{len(cases)} plans explained, {flagged} flagged.")
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,138 @@
+import json
+import os
+import time
+
 from pydantic import BaseModel
-from app import query_router
+from app import aplan_query, aexecute_plan, astream_plan, plan_cache, answer_cache, result_cache
+from utils import metrics
 from fastapi import FastAPI, UploadFile, File, Form
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from services.ingest_service import handle_bill_ingestion
 from services.upload_service import handle_bill_upload, save_confirmed_bill
 from db.mongodb import get_db
+from db.indexes import reconcile_indexes
+from services.resources import peek_resource, readiness, resource_status, warm_up
 from schemas.ingest import IngestRequest
 
 app = FastAPI()
 
+ENSURE_INDEXES = os.getenv("ENSURE_INDEXES", "true").lower() in ("1", "true", "yes")
+
+# Resources built in the background after startup (empty = all lazy),
+# and the ones /readyz requires
+WARM_UP_RESOURCES = [r for r in os.getenv("WARM_UP_RESOURCES", "mongo,embeddings").split(",") if r]
+READY_RESOURCES = [r for r in os.getenv("READY_RESOURCES", "mongo").split(",") if r]
+
+STARTED_AT = time.time()
+
+
+@app.on_event("startup")
+def start_warm_up():
+    # Never blocks startup; a failed warm-up is retried on first use
+    if WARM_UP_RESOURCES:
+        warm_up(WARM_UP_RESOURCES)
+
+
+@app.on_event("startup")
+def ensure_indexes():
+    # Idempotent: only indexes missing from Mongo are built
+    if not ENSURE_INDEXES:
+        return
+    try:
+        report = reconcile_indexes(get_db())
+    except Exception as e:
+        print("[INDEXES] reconciliation failed:", e)
+        return
+
+    print(f"[INDEXES] {len(report['present'])} present, created: {report['created'] or 'none'}")
+    for conflict in report["conflicts"]:
+        print("[INDEXES] conflict:", conflict)
+
 
 class QueryRequest(BaseModel):
     user_id: str
     query: str
+    # Set to false to force the LLM planner (skips the rule-based fast path)
+    fast_path: bool = True
 
 @app.post("/query")
-def query_handler(req: QueryRequest):
-    result = query_router(req.query, req.user_id)
-    return {"result": result}
+async def query_handler(req: QueryRequest):
+    llm_calls = metrics.begin_llm_count()
+    try:
+        plan_dict, plan_source = await aplan_query(req.query, fast_path=req.fast_path)
+        result = await aexecute_plan(plan_dict, req.query, req.user_id)
+    finally:
+        metrics.end_llm_count(llm_calls)
+    return {"result": result, "plan_source": plan_source}
+
+@app.post("/query/stream")
+async def query_stream_handler(req: QueryRequest):
+    """
+    Same as /query, streamed as NDJSON events:
+    plan → facts (Mongo results) → token* → done (or error).
+    """
+    async def events():
+        start = time.perf_counter()
+        first = True
+        llm_calls = metrics.begin_llm_count()
+        try:
+            plan_dict, plan_source = await aplan_query(req.query, fast_path=req.fast_path)
+            yield {"event": "plan", "plan": plan_dict, "plan_source": plan_source}
+
+            async for event in astream_plan(plan_dict, req.query, req.user_id):
+                if first:
+                    metrics.observe("query_stream.first_content_ms", (time.perf_counter() - start) * 1000)
+                    first = False
+                yield event
+
+            yield {"event": "done"}
+        except Exception as e:
+            print("[QUERY STREAM FAILED]", e)
+            yield {"event": "error", "message": str(e)}
+        finally:
+            metrics.end_llm_count(llm_calls)
+
+    async def ndjson():
+        async for event in events():
+            yield json.dumps(jsonable_encoder(event)) + "\n"
+
+    return StreamingResponse(
+        ndjson(),
+        media_type="application/x-ndjson",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/healthz")
+def healthz():
+    # Liveness: the process is up and serving
+    return {"status": "ok", "uptime_s": round(time.time() - STARTED_AT, 1)}
+
+
+@app.get("/readyz")
+def readyz():
+    # Readiness: required resources are built and reachable
+    ready, checks = readiness(READY_RESOURCES)
+    body = {"status": "ready" if ready else "not_ready", "checks": checks, "resources": resource_status()}
+    return body if ready else JSONResponse(body, status_code=503)
+
+
+def embedding_cache_stats():
+    service = peek_resource("embedding_service")
+    return service.cache.stats() if service and service.cache else None
+
+
+@app.get("/metrics")
+def metrics_handler():
+    return {
+        "plan_cache": plan_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "result_cache": result_cache.stats(),
+        "resources": resource_status(),
+        "embedding_cache": embedding_cache_stats(),
+        **metrics.snapshot(),
+    }
 
 @app.post("/ingest")
 def ingest_handler(req: IngestRequest):
@@ -68,10 +184,34 @@ async def confirm_handler(req: ConfirmRequest):
         db=db
     )
 
-from fastapi import Query
+from bson import ObjectId
+from fastapi import HTTPException, Query
 from typing import Optional
 import re
 
+from datetime import date, datetime, time as dt_time, timezone
+
+from services.bill_views import VIEWS, projection
+from services.search_index import bills_search_filter, search_bill_ids
+from utils.text_utils import category_key
+from services.bill_pagination import (
+    SORT_FIELDS,
+    InvalidCursor,
+    cached_count,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+)
+
+def bill_date_range(date_from: Optional[date], date_to: Optional[date]) -> Optional[dict]:
+    date_range = {}
+    if date_from:
+        date_range["$gte"] = datetime.combine(date_from, dt_time.min, tzinfo=timezone.utc)
+    if date_to:
+        date_range["$lte"] = datetime.combine(date_to, dt_time.max, tzinfo=timezone.utc)
+    return date_range or None
+
+
 @app.get("/bills")
 def get_bills(
     user_id: str = Query("u1"),
@@ -79,31 +219,80 @@ def get_bills(
     page_size: int = Query(10, ge=1, le=100),
     sort_by: str = Query("bill_date"),
     sort_order: str = Query("desc"),
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    # Continuation token from a previous response; takes precedence over `page`
+    cursor: Optional[str] = None,
+    # summary | detail | full, or an explicit comma-separated field list
+    view: str = Query("detail"),
+    fields: Optional[str] = None,
+    category: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
 ):
+    if sort_by not in SORT_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"sort_by must be one of: {', '.join(sorted(SORT_FIELDS))}"
+        )
+
+    try:
+        fields_projection = projection(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if fields_projection and 1 in fields_projection.values():
+        # The continuation token needs the sort value of the last row
+        fields_projection = {**fields_projection, sort_by: 1}
+
     db = get_db()
     query = {"user_id": user_id}
 
+    date_range = bill_date_range(date_from, date_to)
+    if category:
+        query["category_key"] = category_key(category)
+    if date_range:
+        query["bill_date"] = date_range
+
     if search:
-        # Simple regex search on vendor or item descriptions
-        # Note: This might be slow on large datasets without indexes
-        query["$or"] = [
-            {"vendor": {"$regex": re.escape(search), "$options": "i"}},
-            {"items.description": {"$regex": re.escape(search), "$options": "i"}},
-            {"category": {"$regex": re.escape(search), "$options": "i"}}
-        ]
+        # Prefix search on vendor, category and item descriptions through
+        # the bill_search_grams postings; the page is then read by _id
+        query.update(bills_search_filter(
+            db, user_id, search, category=category, date_range=date_range
+        ))
 
     # Sort direction
     mongo_sort_order = -1 if sort_order.lower() == "desc" else 1
-    
-    # Calculate skip
-    skip = (page - 1) * page_size
 
-    total_count = db.bills.count_documents(query)
-    cursor = db.bills.find(query).sort(sort_by, mongo_sort_order).skip(skip).limit(page_size)
-    
+    total_count = cached_count(db, user_id, query)
+
+    find_query = query
+    if cursor:
+        try:
+            after = decode_cursor(cursor, sort_by, mongo_sort_order)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        find_query = {"$and": [query, keyset_filter(sort_by, mongo_sort_order, after)]}
+
+    mongo_cursor = (
+        db.bills.find(find_query, fields_projection)
+        .sort([(sort_by, mongo_sort_order), ("_id", mongo_sort_order)])
+    )
+    if not cursor:
+        # Page-number mode, kept for existing clients
+        mongo_cursor = mongo_cursor.skip((page - 1) * page_size)
+
+    # One extra row tells whether there is a next page
+    docs = list(mongo_cursor.limit(page_size + 1))
+    has_more = len(docs) > page_size
+    docs = docs[:page_size]
+
+    next_cursor = (
+        encode_cursor(sort_by, mongo_sort_order, docs[-1])
+        if has_more else None
+    )
+
     bills = []
-    for doc in cursor:
+    for doc in docs:
         doc["_id"] = str(doc["_id"])
         bills.append(doc)
 
@@ -113,6 +302,73 @@ def get_bills(
             "page": page,
             "page_size": page_size,
             "total": total_count,
-            "total_pages": (total_count + page_size - 1) // page_size
+            "total_pages": (total_count + page_size - 1) // page_size,
+            "next_cursor": next_cursor
         }
     }
+
+
+@app.get("/bills/search")
+def search_bills(
+    q: str,
+    user_id: str = Query("u1"),
+    limit: int = Query(20, ge=1, le=100),
+    category: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None
+):
+    """
+    Search-as-you-type: bills whose vendor, category or item words start
+    with every word of `q`, best match first, as summary rows.
+    """
+    db = get_db()
+    hits = search_bill_ids(
+        db, user_id, q,
+        category=category,
+        date_range=bill_date_range(date_from, date_to),
+        limit=limit
+    ) or []
+
+    scores = {h["bill_id"]: h["score"] for h in hits}
+    docs = {
+        doc["_id"]: doc
+        for doc in db.bills.find(
+            {"_id": {"$in": list(scores)}, "user_id": user_id},
+            VIEWS["summary"]
+        )
+    }
+
+    results = []
+    for bill_id, score in scores.items():
+        doc = docs.get(bill_id)
+        if doc is not None:
+            results.append({**doc, "_id": str(bill_id), "score": score})
+
+    return {"data": results}
+
+
+@app.get("/bills/{bill_id}")
+def get_bill(
+    bill_id: str,
+    user_id: str = Query("u1"),
+    view: str = Query("full")
+):
+    try:
+        fields_projection = projection(view)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Uploaded bills use string ids, ingested ones ObjectIds
+    ids = [bill_id]
+    if ObjectId.is_valid(bill_id):
+        ids.append(ObjectId(bill_id))
+
+    doc = get_db().bills.find_one(
+        {"_id": {"$in": ids}, "user_id": user_id},
+        fields_projection
+    )
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Bill not found")
+
+    doc["_id"] = str(doc["_id"])
+    return doc
@@ -0,0 +1,37 @@
+from pymongo import MongoClient
+import os
+from dotenv import load_dotenv
+
+from db.indexes import create_indexes
+from services.bill_items_service import sync_bill_items
+from services.data_version import bump_data_version
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGO_URI")
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
+
+client = MongoClient(MONGO_URI)
+db = client[MONGO_DB_NAME]
+
+# Rebuilds bill_items from the embedded items of every bill.
+# Safe to re-run: each bill's rows are replaced as a whole.
+print("Starting migration...")
+create_indexes(db)
+
+cursor = db.bills.find({}, {"raw": 0, "raw_text": 0, "extra_data": 0})
+bills = 0
+rows = 0
+users = set()
+for doc in cursor:
+    users.add(doc["user_id"])
+    rows += sync_bill_items(db, str(doc["_id"]), doc["user_id"], doc)
+    bills += 1
+    if bills % 1000 == 0:
+        print(f"  {bills} bills...")
+
+# Results cached before the backfill may be missing these bills
+for user_id in users:
+    bump_data_version(db, user_id)
+
+print(f"Migrated {bills} bills into {rows} item rows.")
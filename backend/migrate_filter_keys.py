@@ -0,0 +1,43 @@
+from pymongo import MongoClient, UpdateOne
+import os
+from dotenv import load_dotenv
+
+from services.data_version import bump_data_version
+from utils.text_utils import FILTER_KEYS, filter_keys
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGO_URI")
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
+BATCH_SIZE = 1000
+
+client = MongoClient(MONGO_URI)
+db = client[MONGO_DB_NAME]
+
+# Backfills vendor_key / category_key / payment_method_key. Every bill is
+# recomputed, so re-running after a synonym change updates old keys too.
+print("Starting migration...")
+for key_field, _ in FILTER_KEYS.values():
+    db.bills.create_index([("user_id", 1), (key_field, 1), ("bill_date", 1)])
+
+cursor = db.bills.find({}, {"user_id": 1, **{field: 1 for field in FILTER_KEYS}})
+count = 0
+batch = []
+users = set()
+for doc in cursor:
+    users.add(doc.get("user_id"))
+    batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": filter_keys(doc)}))
+
+    if len(batch) >= BATCH_SIZE:
+        count += db.bills.bulk_write(batch, ordered=False).modified_count
+        batch = []
+        print(f"  {count} documents...")
+
+if batch:
+    count += db.bills.bulk_write(batch, ordered=False).modified_count
+
+# Results cached before the backfill may be missing these bills
+for user_id in users - {None}:
+    bump_data_version(db, user_id)
+
+print(f"Migrated {count} documents.")
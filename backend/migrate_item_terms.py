@@ -0,0 +1,45 @@
+from pymongo import MongoClient, UpdateOne
+import os
+from dotenv import load_dotenv
+
+from services.data_version import bump_data_version
+from utils.text_utils import item_terms
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGO_URI")
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
+BATCH_SIZE = 1000
+
+client = MongoClient(MONGO_URI)
+db = client[MONGO_DB_NAME]
+
+# Backfills `item_terms` on bills ingested before the field existed.
+# Safe to re-run: only bills without the field are touched.
+print("Starting migration...")
+db.bills.create_index([("user_id", 1), ("item_terms", 1)])
+
+cursor = db.bills.find({"item_terms": {"$exists": False}}, {"user_id": 1, "items": 1})
+count = 0
+batch = []
+users = set()
+for doc in cursor:
+    users.add(doc.get("user_id"))
+    batch.append(UpdateOne(
+        {"_id": doc["_id"]},
+        {"$set": {"item_terms": item_terms(doc.get("items"))}}
+    ))
+
+    if len(batch) >= BATCH_SIZE:
+        count += db.bills.bulk_write(batch, ordered=False).modified_count
+        batch = []
+        print(f"  {count} documents...")
+
+if batch:
+    count += db.bills.bulk_write(batch, ordered=False).modified_count
+
+# Results cached before the backfill may be missing these bills
+for user_id in users - {None}:
+    bump_data_version(db, user_id)
+
+print(f"Migrated {count} documents.")
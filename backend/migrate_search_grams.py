@@ -0,0 +1,39 @@
+from pymongo import MongoClient
+import os
+from dotenv import load_dotenv
+
+from services.data_version import bump_data_version
+from services.search_index import sync_search_postings
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGO_URI")
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
+
+client = MongoClient(MONGO_URI)
+db = client[MONGO_DB_NAME]
+
+# Builds bill_search_grams postings for every bill.
+# Safe to re-run: each bill's postings are replaced as a whole.
+print("Starting migration...")
+db.bill_search_grams.create_index([("user_id", 1), ("gram", 1), ("bill_date", 1)])
+db.bill_search_grams.create_index("bill_id")
+
+cursor = db.bills.find(
+    {}, {"user_id": 1, "vendor": 1, "category": 1, "bill_date": 1, "items.description": 1}
+)
+bills = 0
+postings = 0
+users = set()
+for doc in cursor:
+    users.add(doc["user_id"])
+    postings += sync_search_postings(db, doc["_id"], doc["user_id"], doc)
+    bills += 1
+    if bills % 1000 == 0:
+        print(f"  {bills} bills...")
+
+# Results cached before the backfill may be missing these bills
+for user_id in users:
+    bump_data_version(db, user_id)
+
+print(f"Indexed {bills} bills into {postings} postings.")
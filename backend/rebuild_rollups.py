@@ -0,0 +1,84 @@
+"""
+Rebuilds bill_rollups from raw bills, or checks them against raw bills.
+
+    python rebuild_rollups.py                 # rebuild all users
+    python rebuild_rollups.py --user-id u1    # rebuild one user
+    python rebuild_rollups.py --check         # report drift, exit 1 if any
+
+Run while no bills are being written for the affected users; a bill
+inserted mid-rebuild may be counted twice or not at all.
+"""
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from services.data_version import bump_data_version
+from services.rollup_service import compute_rollups
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGO_URI")
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
+
+BILL_FIELDS = {
+    "user_id": 1, "bill_date": 1, "total_amount": 1, "tax_amount": 1,
+    "vendor": 1, "category": 1, "payment_method": 1,
+    "vendor_key": 1, "category_key": 1, "payment_method_key": 1,
+}
+TOLERANCE = 0.005
+
+
+def check(db, expected: dict, query: dict) -> int:
+    stored = {doc["_id"]: doc for doc in db.bill_rollups.find(query)}
+    drift = 0
+
+    for _id in sorted(set(expected) | set(stored)):
+        want = expected.get(_id, {"total_amount": 0, "tax_amount": 0, "count": 0})
+        have = stored.get(_id, {"total_amount": 0, "tax_amount": 0, "count": 0})
+
+        if (
+            want["count"] != have["count"]
+            or abs(want["total_amount"] - have["total_amount"]) > TOLERANCE
+            or abs(want["tax_amount"] - have["tax_amount"]) > TOLERANCE
+        ):
+            drift += 1
+            print(
+                f"[DRIFT] {_id}: raw count={want['count']} total={want['total_amount']:.2f} "
+                f"| rollup count={have['count']} total={have['total_amount']:.2f}"
+            )
+
+    return drift
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id")
+    parser.add_argument("--check", action="store_true", help="compare only, do not write")
+    args = parser.parse_args()
+
+    db = MongoClient(MONGO_URI)[MONGO_DB_NAME]
+    query = {"user_id": args.user_id} if args.user_id else {}
+
+    expected = compute_rollups(db.bills.find(query, BILL_FIELDS))
+
+    if args.check:
+        drift = check(db, expected, query)
+        print(f"{len(expected)} rollups checked, {drift} drifted.")
+        sys.exit(1 if drift else 0)
+
+    db.bill_rollups.delete_many(query)
+    if expected:
+        db.bill_rollups.insert_many(list(expected.values()), ordered=False)
+    db.bill_rollups.create_index([("user_id", 1), ("month", 1)])
+
+    # Cached sum/count results may have been read from drifted rollups
+    for user_id in {doc["user_id"] for doc in expected.values()}:
+        bump_data_version(db, user_id)
+    print(f"Rebuilt {len(expected)} rollups.")
+
+
+if __name__ == "__main__":
+    main()
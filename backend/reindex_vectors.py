@@ -0,0 +1,82 @@
+"""
+(Re)builds the vector store (VECTOR_BACKEND) from the bills in Mongo.
+
+    python reindex_vectors.py                 # all users
+    python reindex_vectors.py --user-id u1    # one user
+
+Bills ingested while vectors went to Chroma were never searchable; this
+backfills them. Upserts are keyed on the bill id, so re-running is safe,
+and unchanged texts come straight from the embedding cache.
+
+Required once when VECTOR_BACKEND=pinecone points at an index written
+before the shared vector store: searches filter on category_key and
+bill_date metadata, and older vectors carry neither, so date- or
+category-filtered searches would silently skip them.
+"""
+import argparse
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from db.mongodb import get_db
+from services.resources import get_resource
+from services.vector_index import bill_metadata
+
+BILL_FIELDS = {"user_id": 1, "raw_text": 1, "vendor": 1, "category": 1, "total_amount": 1, "bill_date": 1}
+
+
+def bill_text(bill: dict) -> str:
+    # Same text ingestion embeds: the OCR text, or the manual-entry summary
+    return bill.get("raw_text") or (
+        f"{bill.get('vendor', '')} {bill.get('category', '')} {bill.get('total_amount', '')}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    db = get_db()
+    embedder = get_resource("embedding_service")
+    store = get_resource("vector_store")
+    query = {"user_id": args.user_id} if args.user_id else {}
+
+    start = time.perf_counter()
+    total = 0
+    batch = []
+
+    def flush():
+        vectors = embedder.embed_documents([text for _, _, text in batch])
+        by_user = {}
+        for (bill_id, bill, text), vector in zip(batch, vectors):
+            ids, vecs, metas = by_user.setdefault(bill["user_id"], ([], [], []))
+            ids.append(bill_id)
+            vecs.append(vector)
+            metas.append(bill_metadata(bill_id, bill["user_id"], text, bill))
+        for user_id, (ids, vecs, metas) in by_user.items():
+            store.upsert(user_id, ids, vecs, metas)
+        batch.clear()
+
+    for bill in db.bills.find(query, BILL_FIELDS):
+        if not bill.get("user_id"):
+            continue
+        batch.append((str(bill["_id"]), bill, bill_text(bill)))
+        if len(batch) >= args.batch_size:
+            total += len(batch)
+            flush()
+            print(f"  {total} bills indexed")
+    if batch:
+        total += len(batch)
+        flush()
+
+    cache = embedder.cache.stats() if embedder.cache else None
+    print(f"Indexed {total} bills in {time.perf_counter() - start:.1f}s"
+          + (f" (embedding cache hit rate {cache['hit_rate']:.0%})" if cache else ""))
+
+
+if __name__ == "__main__":
+    main()
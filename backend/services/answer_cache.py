@@ -0,0 +1,53 @@
+import hashlib
+import json
+import os
+
+from services.plan_cache import normalize_query
+from utils.lru_cache import LRUCache
+
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "2048"))
+ANSWER_CACHE_MAX_BYTES = int(os.getenv("ANSWER_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+
+def plan_hash(plan) -> str:
+    """
+    Hash of the *resolved* plan (bill_date already turned into concrete
+    datetimes), so "last month" answers do not outlive the month.
+    """
+    payload = json.dumps(plan.model_dump(), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """
+    LLM answers for SEMANTIC/MIXED queries keyed on
+    (user_id, normalized query, plan hash, user data version).
+    Bounded by entry count and total answer bytes, LRU eviction.
+    """
+
+    def __init__(self, maxsize: int, max_bytes: int):
+        self.local = LRUCache(
+            maxsize=maxsize,
+            max_bytes=max_bytes,
+            sizeof=lambda answer: len(answer.encode("utf-8")),
+        )
+
+    def key(self, user_id: str, user_query: str, plan, version: int) -> str:
+        text = json.dumps([user_id, normalize_query(user_query), plan_hash(plan), version])
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        return self.local.get(key)
+
+    def set(self, key: str, answer: str):
+        if isinstance(answer, str) and answer:
+            self.local.set(key, answer)
+
+    def stats(self) -> dict:
+        return self.local.stats()
+
+
+answer_cache = AnswerCache(
+    maxsize=ANSWER_CACHE_SIZE,
+    max_bytes=ANSWER_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,54 @@
+from utils.text_utils import filter_keys, product_name, tokenize_terms
+
+# -------------------------------------------------------------------
+# bill_items: one row per line item, denormalized with the bill fields
+# item queries filter on, so item analytics never $unwind `bills`.
+#
+# Rows are always rewritten as a whole per bill_id, which keeps them in
+# step with `bills` when a bill is confirmed or re-ingested.
+# -------------------------------------------------------------------
+
+# Bill-level fields copied onto every row
+BILL_FIELDS = ("bill_no", "bill_date", "vendor", "category", "payment_method")
+
+# Filters an item query may carry and still be answered from bill_items
+ROW_FILTER_FIELDS = {"user_id", *BILL_FIELDS, *filter_keys({})}
+
+
+def bill_item_rows(bill_id: str, user_id: str, bill: dict) -> list[dict]:
+    keys = filter_keys(bill)
+    rows = []
+
+    for line_no, item in enumerate(bill.get("items") or []):
+        description = item.get("description")
+        rows.append({
+            "user_id": user_id,
+            "bill_id": bill_id,
+            "line_no": line_no,
+            **{field: bill.get(field) for field in BILL_FIELDS},
+            **keys,
+            "product": product_name(description),
+            "description": description,
+            "terms": tokenize_terms(description),
+            "quantity": item.get("quantity"),
+            "rate": item.get("rate"),
+            "amount": item.get("amount"),
+        })
+
+    return rows
+
+
+def sync_bill_items(db, bill_id: str, user_id: str, bill: dict) -> int:
+    """Replaces the item rows of one bill. Returns the number of rows written."""
+    bill_id = str(bill_id)
+    rows = bill_item_rows(bill_id, user_id, bill)
+
+    db.bill_items.delete_many({"bill_id": bill_id})
+    if rows:
+        db.bill_items.insert_many(rows, ordered=False)
+    return len(rows)
+
+
+def delete_bill_items(db, bill_id: str):
+    db.bill_items.delete_many({"bill_id": str(bill_id)})
+
@@ -0,0 +1,109 @@
+import base64
+import hashlib
+import json
+import os
+
+from bson import ObjectId, json_util
+
+from services.data_version import get_data_version
+from utils.lru_cache import LRUCache
+
+# -------------------------------------------------------------------
+# /bills listing: keyset pagination and cached totals
+#
+# Pages are ordered by (sort field, _id). A continuation token carries
+# the last row's sort value and _id, so the next page is an index seek
+# instead of a skip over everything before it.
+# -------------------------------------------------------------------
+
+# Each has a (user_id, <field>, _id) index in db/indexes.py
+SORT_FIELDS = {"bill_date", "total_amount", "vendor", "category"}
+
+BILL_COUNT_CACHE_SIZE = int(os.getenv("BILL_COUNT_CACHE_SIZE", "4096"))
+
+# Keyed by data version, so any bill write retires the old counts
+count_cache = LRUCache(maxsize=BILL_COUNT_CACHE_SIZE)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort_by: str, order: int, last: dict) -> str:
+    payload = json_util.dumps({
+        "s": sort_by,
+        "o": order,
+        "v": last.get(sort_by),
+        "id": last["_id"],
+    })
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort_by: str, order: int) -> dict:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json_util.loads(base64.urlsafe_b64decode(padded).decode("utf-8"))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+    if data.get("s") != sort_by or data.get("o") != order:
+        raise InvalidCursor("Cursor was issued for a different sort order")
+    return data
+
+
+# Uploaded bills have uuid-string _ids, ingested ones ObjectIds. $gt/$lt
+# only compare values of the same BSON type, while sort orders strings
+# before ObjectIds, so the _id tie-break also needs a $type branch.
+ID_TYPE_ORDER = ("string", "objectId")
+
+
+def _id_type(value) -> str:
+    return "objectId" if isinstance(value, ObjectId) else "string"
+
+
+def _ids_after(last_id, order: int) -> list[dict]:
+    """_id conditions for rows after last_id in _id order, across types."""
+    after = "$gt" if order == 1 else "$lt"
+    conditions = [{after: last_id}]
+
+    pos = ID_TYPE_ORDER.index(_id_type(last_id))
+    later = ID_TYPE_ORDER[pos + 1:] if order == 1 else ID_TYPE_ORDER[:pos]
+    conditions += [{"$type": t} for t in later]
+    return conditions
+
+
+def keyset_filter(sort_by: str, order: int, cursor: dict) -> dict:
+    """
+    Rows strictly after the cursor in (sort_by, _id) order. Mongo sorts
+    null/missing values first, which the null branches account for.
+    """
+    value, last_id = cursor["v"], cursor["id"]
+    after = "$gt" if order == 1 else "$lt"
+
+    if value is None:
+        clauses = [{sort_by: None, "_id": c} for c in _ids_after(last_id, order)]
+        if order == 1:
+            clauses.append({sort_by: {"$ne": None}})
+    else:
+        clauses = [
+            {sort_by: {after: value}},
+            *({sort_by: value, "_id": c} for c in _ids_after(last_id, order)),
+        ]
+        if order == -1:
+            clauses.append({sort_by: None})
+
+    return {"$or": clauses}
+
+
+def cached_count(db, user_id: str, query: dict) -> int:
+    version = get_data_version(db, user_id)
+    query_hash = hashlib.sha256(
+        json.dumps(query, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    key = (user_id, version, query_hash)
+
+    total = count_cache.get(key)
+    if total is None:
+        total = db.bills.count_documents(query)
+        count_cache.set(key, total)
+    return total
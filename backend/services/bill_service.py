@@ -1,5 +1,9 @@
 from datetime import datetime
 
+from services.bill_items_service import sync_bill_items
+from services.rollup_service import replace_bill
+from services.search_index import sync_search_postings
+
 
 def insert_bill(
     bill_id: str,
@@ -19,4 +23,10 @@ def insert_bill(
         "created_at": datetime.utcnow()
     }
 
-    db.bills.insert_one(doc)
+    # Upsert so confirming or re-ingesting the same bill replaces it;
+    # the previous version is taken back out of the rollups
+    old = db.bills.find_one_and_replace({"_id": bill_id}, doc, upsert=True)
+    sync_bill_items(db, bill_id, user_id, doc)
+    sync_search_postings(db, bill_id, user_id, doc)
+    replace_bill(db, old, doc)
+    # The caller bumps the data version once the vector is written too
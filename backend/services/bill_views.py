@@ -0,0 +1,47 @@
+import re
+
+# -------------------------------------------------------------------
+# Response shapes for bill documents
+#
+#   summary → the columns of the bills table, no items
+#   detail  → everything a person reads (items included); the raw LLM
+#             output, OCR text and derived search/filter fields are left out
+#   full    → the stored document as is
+# -------------------------------------------------------------------
+
+SUMMARY_FIELDS = (
+    "vendor", "bill_no", "bill_date", "category", "payment_method",
+    "total_amount", "currency", "source_file", "file_path",
+)
+
+# Heavy or internal fields nobody renders
+HEAVY_FIELDS = (
+    "raw", "raw_text", "extra_data", "items.extra_data",
+    "item_terms", "vendor_key", "category_key", "payment_method_key",
+)
+
+VIEWS = {
+    "summary": {field: 1 for field in SUMMARY_FIELDS},
+    "detail": {field: 0 for field in HEAVY_FIELDS},
+    "full": None,
+}
+
+FIELD_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+def projection(view: str = "detail", fields: str | None = None) -> dict | None:
+    """
+    Mongo projection for a view, or for an explicit comma-separated
+    `fields` list (which takes precedence). Raises ValueError on an
+    unknown view or a malformed field name.
+    """
+    if fields:
+        names = [f.strip() for f in fields.split(",") if f.strip()]
+        bad = [f for f in names if not FIELD_RE.match(f)]
+        if bad:
+            raise ValueError(f"Invalid field name(s): {', '.join(bad)}")
+        return {name: 1 for name in names}
+
+    if view not in VIEWS:
+        raise ValueError(f"view must be one of: {', '.join(VIEWS)}")
+    return VIEWS[view]
@@ -0,0 +1,185 @@
+import os
+import re
+from datetime import datetime
+
+from utils import metrics
+
+# -------------------------------------------------------------------
+# Prompt context for SEMANTIC / MIXED answers
+#
+# Mongo facts are rendered as one compact row per bill, vector chunks
+# (raw OCR text) are whitespace-collapsed and truncated, and the whole
+# context is kept under CONTEXT_TOKEN_BUDGET tokens.
+# -------------------------------------------------------------------
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+CONTEXT_CHUNK_MAX_TOKENS = int(os.getenv("CONTEXT_CHUNK_MAX_TOKENS", "300"))
+CONTEXT_TOP_ITEMS = int(os.getenv("CONTEXT_TOP_ITEMS", "3"))
+
+# Below this many tokens a truncated chunk is not worth including
+MIN_CHUNK_TOKENS = 20
+
+BILL_HEADER = "vendor | date | amount | category | top items"
+SKIP_FIELDS = {"user_id", "raw_text", "source_file", "items"}
+
+try:
+    import tiktoken
+
+    # cl100k is close enough to the Llama 3 vocabulary for budgeting
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    # ~4 characters per token for English/receipt text
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _encoding is not None:
+        ids = _encoding.encode(text, disallowed_special=())[:max_tokens]
+        return _encoding.decode(ids) + " …"
+    return text[: max_tokens * 4] + " …"
+
+
+def _fmt_value(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, float):
+        return f"{value:.2f}".rstrip("0").rstrip(".")
+    return str(value)
+
+
+def _fmt_date(value) -> str:
+    if isinstance(value, str):
+        # ISO strings: keep the date part only
+        return value[:10]
+    return _fmt_value(value)
+
+
+def _top_items(items, n: int = CONTEXT_TOP_ITEMS) -> str:
+    items = [i for i in items or [] if isinstance(i, dict)]
+    items.sort(key=lambda i: i.get("amount") or 0, reverse=True)
+
+    parts = []
+    for item in items[:n]:
+        text = item.get("description") or item.get("name") or "?"
+        if item.get("quantity") not in (None, 1):
+            text += f" x{_fmt_value(item['quantity'])}"
+        if item.get("amount") is not None:
+            text += f" ({_fmt_value(item['amount'])})"
+        parts.append(text)
+
+    if len(items) > n:
+        parts.append(f"+{len(items) - n} more")
+    return "; ".join(parts) or "-"
+
+
+def is_bill(row) -> bool:
+    # Grouped rows ({"vendor", "total", "count"}) are aggregates, not bills
+    if not isinstance(row, dict) or ("total" in row and "count" in row):
+        return False
+    return "vendor" in row or "items" in row
+
+
+def bill_row(bill: dict) -> str:
+    return " | ".join([
+        _fmt_value(bill.get("vendor")),
+        _fmt_date(bill.get("bill_date")),
+        _fmt_value(bill.get("total_amount")),
+        _fmt_value(bill.get("category")),
+        _top_items(bill.get("items")),
+    ])
+
+
+def fact_row(row) -> str:
+    """Bills as table rows; aggregates (totals, counts) as key=value."""
+    if is_bill(row):
+        return bill_row(row)
+    if isinstance(row, dict):
+        return ", ".join(
+            f"{k}={_fmt_value(v)}" for k, v in row.items() if k not in SKIP_FIELDS
+        )
+    return _fmt_value(row)
+
+
+def clean_chunk(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def _render_facts(facts, budget: int) -> tuple[list[str], int]:
+    if facts is None:
+        return [], 0
+    rows = facts if isinstance(facts, list) else [facts]
+    if not rows:
+        return ["Facts: none found"], 4
+
+    lines = ["Facts:"]
+    if any(is_bill(r) for r in rows):
+        lines.append(BILL_HEADER)
+    used = sum(count_tokens(l) for l in lines)
+
+    for i, row in enumerate(rows):
+        line = fact_row(row)
+        cost = count_tokens(line)
+        if used + cost > budget:
+            lines.append(f"(+{len(rows) - i} more rows omitted)")
+            break
+        lines.append(line)
+        used += cost
+
+    return lines, used
+
+
+def _render_chunks(chunks, budget: int) -> tuple[list[str], int]:
+    lines, used, seen = [], 0, set()
+
+    # Chunks arrive best match first; keep that order
+    for chunk in chunks or []:
+        text = clean_chunk(chunk)
+        if not text or text in seen:
+            continue
+        seen.add(text)
+
+        remaining = budget - used
+        if remaining < MIN_CHUNK_TOKENS:
+            break
+
+        text = truncate_to_tokens(text, min(CONTEXT_CHUNK_MAX_TOKENS, remaining - 2))
+        line = f"[{len(lines) + 1}] {text}"
+        lines.append(line)
+        used += count_tokens(line)
+
+    if lines:
+        lines.insert(0, "Bill text excerpts:")
+    return lines, used
+
+
+def build_context(facts=None, chunks=None, budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """
+    Renders Mongo facts and vector chunks into at most `budget` tokens.
+    Facts are exact, so they are placed first; chunks fill what is left.
+    """
+    fact_lines, used = _render_facts(facts, budget)
+    chunk_lines, _ = _render_chunks(chunks, budget - used)
+
+    sections = [s for s in ("\n".join(fact_lines), "\n".join(chunk_lines)) if s]
+    return "\n\n".join(sections) or "No matching bills found."
+
+
+def record_prompt_tokens(kind: str, prompt: str) -> int:
+    tokens = count_tokens(prompt)
+    metrics.observe(f"llm_input_tokens.{kind}", tokens)
+    print(f"[PROMPT TOKENS] {kind}: {tokens}")
+    return tokens
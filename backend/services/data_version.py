@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+
+# -------------------------------------------------------------------
+# Per-user data version
+#
+# A monotonically increasing counter per user, bumped by every bill
+# write path. Caches include it in their keys, so anything cached
+# before a write is simply never looked up again.
+# -------------------------------------------------------------------
+
+
+def get_data_version(db, user_id: str) -> int:
+    doc = db.user_data_versions.find_one({"_id": user_id}, {"version": 1})
+    return doc["version"] if doc else 0
+
+
+async def aget_data_version(db, user_id: str) -> int:
+    doc = await db.user_data_versions.find_one({"_id": user_id}, {"version": 1})
+    return doc["version"] if doc else 0
+
+
+def bump_data_version(db, user_id: str) -> int:
+    doc = db.user_data_versions.find_one_and_update(
+        {"_id": user_id},
+        {
+            "$inc": {"version": 1},
+            "$set": {"updated_at": datetime.now(timezone.utc)},
+        },
+        upsert=True,
+        return_document=True,
+    )
+    return doc["version"]
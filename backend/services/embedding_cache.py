@@ -0,0 +1,161 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+from utils.lru_cache import LRUCache
+
+# -------------------------------------------------------------------
+# Embedding cache keyed on (model id, sha256 of normalized text)
+#
+# Two tiers: an in-process LRU and a SQLite file that survives
+# restarts and is shared by re-indexing runs. Vectors are stored as
+# float16 (768 bytes for MiniLM's 384 dims). Hits and misses both
+# return the float16-rounded vector, so a text embeds identically
+# whether or not it was cached.
+# -------------------------------------------------------------------
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "20000"))
+# Empty disables the persistent tier
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache.sqlite3")
+
+
+def normalize_text(text: str) -> str:
+    # Only changes that cannot change the tokens the model sees
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+def text_key(text: str) -> bytes:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+
+
+class SqliteVectorStore:
+    """(model, key) → float16 vector blob."""
+
+    # COUNT(*) scans the whole table, so stats() keeps a running row
+    # count and only recounts this often (other processes may write too)
+    ROW_COUNT_TTL_SECONDS = 300
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._rows = None
+        self._rows_counted_at = 0.0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, key BLOB NOT NULL, vec BLOB NOT NULL,"
+            " PRIMARY KEY (model, key)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def get_many(self, model: str, keys: list[bytes]) -> dict:
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, vec FROM embeddings WHERE model = ? AND key IN ({marks})",
+                    [model, *chunk],
+                ).fetchall()
+            for key, vec in rows:
+                found[bytes(key)] = np.frombuffer(vec, dtype=np.float16)
+        return found
+
+    def set_many(self, model: str, items: list[tuple[bytes, np.ndarray]]):
+        with self._lock:
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, key, vec) VALUES (?, ?, ?)",
+                [(model, key, vec.tobytes()) for key, vec in items],
+            )
+            self._conn.commit()
+            # rowcount skips ignored duplicates
+            if self._rows is not None:
+                self._rows += cursor.rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            if self._rows is None or now - self._rows_counted_at > self.ROW_COUNT_TTL_SECONDS:
+                self._rows = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                self._rows_counted_at = now
+            rows = self._rows
+        files = [self.path, f"{self.path}-wal"]
+        return {
+            "path": self.path,
+            "rows": rows,
+            "disk_bytes": sum(os.path.getsize(f) for f in files if os.path.exists(f)),
+        }
+
+
+class EmbeddingCache:
+    def __init__(self, model_id: str, maxsize: int, path: str | None):
+        self.model_id = model_id
+        self.local = LRUCache(maxsize=maxsize, sizeof=lambda vec: vec.nbytes)
+        self.store = SqliteVectorStore(path) if path else None
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.disk_misses = 0
+
+    def get_many(self, keys: list[bytes]) -> dict:
+        """key → float16 vector for every cached key, LRU first."""
+        found, missing = {}, []
+        for key in keys:
+            vec = self.local.get(key)
+            if vec is None:
+                missing.append(key)
+            else:
+                found[key] = vec
+
+        if self.store and missing:
+            try:
+                from_disk = self.store.get_many(self.model_id, missing)
+            except sqlite3.Error as e:
+                # Unreadable cache file: embed as if nothing were cached
+                print("[EMBEDDING CACHE] read failed:", e)
+                from_disk = {}
+            for key, vec in from_disk.items():
+                self.local.set(key, vec)
+            found.update(from_disk)
+            with self._lock:
+                self.disk_hits += len(from_disk)
+                self.disk_misses += len(missing) - len(from_disk)
+
+        return found
+
+    def set_many(self, items: list[tuple[bytes, np.ndarray]]):
+        for key, vec in items:
+            self.local.set(key, vec)
+        if self.store and items:
+            self.store.set_many(self.model_id, items)
+
+    def stats(self) -> dict:
+        memory = self.local.stats()
+        lookups = memory["hits"] + memory["misses"]
+        hits = memory["hits"] + self.disk_hits
+        disk_lookups = self.disk_hits + self.disk_misses
+        stats = {
+            "model": self.model_id,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory": memory,
+        }
+        if self.store:
+            stats["disk"] = {
+                **self.store.stats(),
+                "hits": self.disk_hits,
+                "misses": self.disk_misses,
+                "hit_rate": round(self.disk_hits / disk_lookups, 4) if disk_lookups else 0.0,
+            }
+        return stats
+
+
+def to_f16(vector) -> np.ndarray:
+    return np.asarray(vector, dtype=np.float16)
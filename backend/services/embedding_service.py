@@ -0,0 +1,168 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from langchain_core.embeddings import Embeddings
+
+from services.embedding_cache import text_key, to_f16
+from utils import metrics
+
+# -------------------------------------------------------------------
+# Micro-batching embedding service
+#
+# Every embed call (query-time vector_search, insert_bill_vector)
+# enqueues its texts; one worker thread collects whatever is queued into
+# a batch, up to EMBED_BATCH_MAX_SIZE texts or EMBED_BATCH_MAX_WAIT_MS
+# after the first one arrived, and runs it as a single forward pass.
+# Concurrent requests thus share batches instead of each paying for a
+# batch-size-1 pass. With a cache, texts embedded before never reach
+# the queue.
+# -------------------------------------------------------------------
+
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", "32"))
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "5"))
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+LATENCY_MS_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class EmbeddingService(Embeddings):
+    """
+    LangChain Embeddings backed by the batching queue, so it can be
+    passed anywhere an embedding model is expected.
+
+    `embed_batch` is the underlying model call, list[str] → vectors; it
+    only ever runs on the worker thread. `cache` is an optional
+    EmbeddingCache consulted before queueing.
+    """
+
+    def __init__(self, embed_batch, max_batch_size: int, max_wait_ms: float, cache=None):
+        self.embed_batch = embed_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.cache = cache
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, text: str, key: bytes | None = None) -> Future:
+        future = Future()
+        self._queue.put((text, future, time.perf_counter(), key))
+        self._ensure_worker()
+        return future
+
+    def _submit_all(self, texts: list[str]) -> list[Future]:
+        """One future per text; cached texts get an already-resolved one."""
+        if not self.cache:
+            return [self.submit(text) for text in texts]
+
+        keys = [text_key(text) for text in texts]
+        cached = self.cache.get_many(keys)
+        metrics.incr("embedding.cache_hits", len(cached))
+        metrics.incr("embedding.cache_misses", len(texts) - len(cached))
+
+        futures = []
+        for text, key in zip(texts, keys):
+            if key in cached:
+                future = Future()
+                future.set_result(cached[key].astype("float32").tolist())
+                futures.append(future)
+            else:
+                futures.append(self.submit(text, key))
+        return futures
+
+    def _ensure_worker(self):
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # Past the deadline: only take what is already queued
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # Drop requests whose caller has gone away (cancelled awaits)
+            batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                self._flush(batch)
+            except Exception as e:
+                # Whatever failed, the worker must survive it and no
+                # caller may be left waiting on its future
+                metrics.incr("embedding.errors")
+                for _, future, _, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _flush(self, batch: list):
+        start = time.perf_counter()
+        for _, _, enqueued, _ in batch:
+            metrics.histogram("embedding.queue_ms", (start - enqueued) * 1000, LATENCY_MS_BUCKETS)
+        metrics.histogram("embedding.batch_size", len(batch), BATCH_SIZE_BUCKETS)
+
+        vectors = self.embed_batch([text for text, _, _, _ in batch])
+        if len(vectors) != len(batch):
+            raise ValueError(f"embedding model returned {len(vectors)} vectors for {len(batch)} texts")
+
+        metrics.histogram("embedding.batch_ms", (time.perf_counter() - start) * 1000, LATENCY_MS_BUCKETS)
+
+        if not self.cache:
+            for (_, future, _, _), vector in zip(batch, vectors):
+                future.set_result(list(vector))
+            return
+
+        # Callers get the stored (float16) values, same as a later hit
+        stored = []
+        for (_, future, _, key), vector in zip(batch, vectors):
+            vec = to_f16(vector)
+            if key is not None:
+                stored.append((key, vec))
+            future.set_result(vec.astype("float32").tolist())
+        try:
+            self.cache.set_many(stored)
+        except Exception as e:
+            # A full or locked cache file must not fail embedding
+            metrics.incr("embedding.cache_errors")
+            print("[EMBEDDING CACHE] write failed:", e)
+
+    # ---------- Embeddings interface ----------
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [f.result() for f in self._submit_all(texts)]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.cache and self.cache.store:
+            # The disk tier is a blocking SQLite read that can wait on the
+            # worker's commit; keep it off the event loop
+            loop = asyncio.get_running_loop()
+            submitted = await loop.run_in_executor(None, self._submit_all, texts)
+        else:
+            submitted = self._submit_all(texts)
+        futures = [asyncio.wrap_future(f) for f in submitted]
+        return list(await asyncio.gather(*futures))
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return (await self.aembed_documents([text]))[0]
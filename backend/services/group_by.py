@@ -0,0 +1,116 @@
+import os
+
+# -------------------------------------------------------------------
+# Grouped aggregations ("spend by category", "monthly breakdown")
+#
+# A plan with group_by returns one row per group,
+#     {<group_by>: label, "total": ..., "count": ...}
+# computed by $group on the server and cut to the top N, instead of
+# listing every bill and summing on the client.
+# -------------------------------------------------------------------
+
+GROUP_BY_DEFAULT_LIMIT = int(os.getenv("GROUP_BY_DEFAULT_LIMIT", "10"))
+GROUP_BY_MAX_LIMIT = 100
+
+# group_by → (canonical key field, display field). Groups are formed on
+# the canonical key so "DMart" and "D-Mart Pvt Ltd" land together.
+GROUP_DIMENSIONS = {
+    "category": ("category_key", "category"),
+    "vendor": ("vendor_key", "vendor"),
+    "payment_method": ("payment_method_key", "payment_method"),
+    "month": (None, None),
+}
+
+GROUP_BY_SYNONYMS = {
+    "categories": "category",
+    "type": "category",
+    "vendors": "vendor",
+    "store": "vendor",
+    "stores": "vendor",
+    "shop": "vendor",
+    "shops": "vendor",
+    "merchant": "vendor",
+    "months": "month",
+    "monthly": "month",
+    "payment": "payment_method",
+    "payment_mode": "payment_method",
+    "payment_methods": "payment_method",
+    "payment_modes": "payment_method",
+}
+
+
+def normalize_group_by(value) -> str | None:
+    """Classifier output → a known dimension, or None."""
+    if not isinstance(value, str):
+        return None
+    value = value.strip().lower().replace(" ", "_")
+    value = GROUP_BY_SYNONYMS.get(value, value)
+    return value if value in GROUP_DIMENSIONS else None
+
+
+def group_limit(limit) -> int | None:
+    """Top-N for a grouped result; months are returned whole unless asked."""
+    if isinstance(limit, int) and limit > 0:
+        return min(limit, GROUP_BY_MAX_LIMIT)
+    return None
+
+
+def month_expr(date_field: str) -> dict:
+    return {"$dateToString": {"format": "%Y-%m", "date": f"${date_field}"}}
+
+
+def group_key_expr(group_by: str, date_field: str = "bill_date"):
+    if group_by == "month":
+        return month_expr(date_field)
+    return f"${GROUP_DIMENSIONS[group_by][0]}"
+
+
+def group_label_expr(group_by: str, date_field: str = "bill_date"):
+    if group_by == "month":
+        return month_expr(date_field)
+    return f"${GROUP_DIMENSIONS[group_by][1]}"
+
+
+def group_stages(
+    group_by: str,
+    limit: int | None,
+    amount="$total_amount",
+    count=1,
+    key=None,
+    label=None,
+) -> list[dict]:
+    """
+    $group → sort → top N → compact rows. Dimensions sort by total
+    (largest first); months are chronological, and a limit keeps the
+    most recent ones.
+    """
+    stages = [
+        {
+            "$group": {
+                "_id": key if key is not None else group_key_expr(group_by),
+                "label": {"$first": label if label is not None else group_label_expr(group_by)},
+                "total": {"$sum": amount},
+                "count": {"$sum": count},
+            }
+        },
+    ]
+
+    if group_by == "month":
+        if limit:
+            stages += [{"$sort": {"_id": -1}}, {"$limit": limit}]
+        stages.append({"$sort": {"_id": 1}})
+    else:
+        stages += [
+            {"$sort": {"total": -1, "_id": 1}},
+            {"$limit": limit or GROUP_BY_DEFAULT_LIMIT},
+        ]
+
+    stages.append({
+        "$project": {
+            "_id": 0,
+            group_by: {"$ifNull": ["$label", "$_id"]},
+            "total": {"$round": ["$total", 2]},
+            "count": 1,
+        }
+    })
+    return stages
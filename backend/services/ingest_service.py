@@ -4,6 +4,10 @@ from utils.ocr_utils import extract_text, normalize_for_mongo
 from chains.bill_extract_chain import extract_bill_structured
 from services.vector_service import insert_bill_vector
 # from services.vector_store import upsert_bill_vector
+from services.data_version import bump_data_version
+from services.bill_items_service import sync_bill_items
+from services.rollup_service import apply_bill
+from services.search_index import sync_search_postings
 from db.mongodb import get_db
 
 def handle_bill_ingestion(user_id: str,
@@ -64,11 +68,20 @@ def handle_bill_ingestion(user_id: str,
     bills_col = db.bills
 
     result = bills_col.insert_one(bill_doc)
+    sync_bill_items(db, str(result.inserted_id), user_id, bill_doc)
+    sync_search_postings(db, result.inserted_id, user_id, bill_doc)
+    apply_bill(db, bill_doc)
 
-    insert_bill_vector(
-        text=text,
-        user_id=user_id,
-        bill_id=str(result.inserted_id),
-    )
+    try:
+        insert_bill_vector(
+            text=text,
+            user_id=user_id,
+            bill_id=str(result.inserted_id),
+            bill=bill_doc,
+        )
+    finally:
+        # Invalidate this user's cached answers; Mongo already has the
+        # bill even if the vector write failed
+        bump_data_version(db, user_id)
 
     return {"status": "ok", "bill_id": str(result.inserted_id)}
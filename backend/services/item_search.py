@@ -0,0 +1,59 @@
+import re
+
+from services.bill_items_service import ROW_FILTER_FIELDS
+from utils.text_utils import tokenize_terms
+
+
+def item_filters(item: str) -> tuple[dict, dict]:
+    """
+    Match conditions for an item query:
+      - bill-level, on the indexed `item_terms` (goes in the first $match)
+      - item-level, applied after $unwind to keep only the matching lines
+
+    Items without any searchable term (e.g. "500") fall back to a plain
+    substring regex with no index narrowing.
+    """
+    terms = tokenize_terms(item)
+    if not terms:
+        return {}, {"items.description": {"$regex": re.escape(item), "$options": "i"}}
+
+    bill_match = {"item_terms": {"$all": terms}}
+    item_match = {
+        "$and": [
+            # Word-prefix match so the folded term "egg" still hits "Eggs"
+            {"items.description": {"$regex": rf"\b{re.escape(t)}", "$options": "i"}}
+            for t in terms
+        ]
+    }
+    return bill_match, item_match
+
+
+def item_search_stages(match: dict, item: str) -> list[dict]:
+    """$match (indexed) → $unwind → $match for the lines of `item`."""
+    bill_match, item_match = item_filters(item)
+    return [
+        {"$match": {**match, **bill_match}},
+        {"$unwind": "$items"},
+        {"$match": item_match},
+    ]
+
+
+def bill_items_stages(match: dict, item: str) -> list[dict] | None:
+    """
+    $match on the bill_items side collection, or None when the query
+    cannot be answered from it (no searchable term, or a filter on a
+    bill field that rows do not carry).
+    """
+    terms = tokenize_terms(item)
+    if not terms or not set(match) <= ROW_FILTER_FIELDS:
+        return None
+    return [{"$match": {**match, "terms": {"$all": terms}}}]
+
+
+def legacy_item_search_stages(match: dict, item: str) -> list[dict]:
+    """Pre-item_terms pipeline, kept for benchmarks."""
+    return [
+        {"$match": match},
+        {"$unwind": "$items"},
+        {"$match": {"items.description": {"$regex": item, "$options": "i"}}},
+    ]
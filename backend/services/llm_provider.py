@@ -0,0 +1,160 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# -------------------------------------------------------------------
+# LLM provider
+#
+#   groq    → ChatGroq (default)
+#   record  → ChatGroq, every prompt → response pair appended to
+#             LLM_RECORD_PATH
+#   replay  → answers served from LLM_RECORD_PATH, no network, with
+#             LLM_REPLAY_LATENCY_MS of injected latency per call
+# -------------------------------------------------------------------
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq").lower()
+LLM_MODEL = os.getenv("LLM_MODEL", "llama-3.1-8b-instant")
+LLM_RECORD_PATH = os.getenv("LLM_RECORD_PATH", "llm_recordings.jsonl")
+LLM_REPLAY_LATENCY_MS = float(os.getenv("LLM_REPLAY_LATENCY_MS", "0"))
+
+
+class ReplayMissError(LookupError):
+    pass
+
+
+def prompt_key(messages: List[BaseMessage], stop: Optional[List[str]] = None) -> str:
+    payload = {
+        "messages": [[m.type, m.content] for m in messages],
+        "stop": stop or [],
+    }
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class RecordingStore:
+    """
+    Append-only JSONL file of {"key", "prompt", "response"} records.
+    The last record for a key wins.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._responses = {}
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._responses[record["key"]] = record["response"]
+
+    def get(self, key: str) -> str | None:
+        return self._responses.get(key)
+
+    def add(self, key: str, messages: List[BaseMessage], response: str):
+        record = {
+            "key": key,
+            "prompt": [[m.type, m.content] for m in messages],
+            "response": response,
+        }
+        with self._lock:
+            self._responses[key] = response
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def __len__(self):
+        return len(self._responses)
+
+
+def _result(text: str) -> ChatResult:
+    return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+class RecordingChatModel(BaseChatModel):
+    """Wraps a live chat model and records every response."""
+
+    inner: Any
+    store: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        response = self.inner.invoke(messages, stop=stop, **kwargs)
+        self.store.add(prompt_key(messages, stop), messages, response.content)
+        return _result(response.content)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        response = await self.inner.ainvoke(messages, stop=stop, **kwargs)
+        self.store.add(prompt_key(messages, stop), messages, response.content)
+        return _result(response.content)
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Serves recorded responses deterministically. A prompt that was
+    never recorded raises ReplayMissError instead of going to the network.
+    """
+
+    store: Any
+    latency_ms: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _lookup(self, messages, stop) -> str:
+        response = self.store.get(prompt_key(messages, stop))
+        if response is None:
+            raise ReplayMissError(
+                f"No recorded response for prompt in {self.store.path}; "
+                "run once with LLM_PROVIDER=record"
+            )
+        return response
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        response = self._lookup(messages, stop)
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return _result(response)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        response = self._lookup(messages, stop)
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return _result(response)
+
+
+def _groq():
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(
+        api_key=os.getenv("GROQ_API_KEY"),
+        model_name=LLM_MODEL,
+        temperature=0,
+    )
+
+
+def get_llm(provider: str = LLM_PROVIDER) -> BaseChatModel:
+    if provider == "groq":
+        return _groq()
+
+    if provider == "record":
+        return RecordingChatModel(inner=_groq(), store=RecordingStore(LLM_RECORD_PATH))
+
+    if provider == "replay":
+        store = RecordingStore(LLM_RECORD_PATH)
+        print(f"[LLM] replaying {len(store)} recorded responses from {LLM_RECORD_PATH}")
+        return ReplayChatModel(store=store, latency_ms=LLM_REPLAY_LATENCY_MS)
+
+    raise ValueError(f"Unknown LLM_PROVIDER: {provider}")
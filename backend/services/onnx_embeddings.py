@@ -0,0 +1,66 @@
+import os
+
+from langchain_core.embeddings import Embeddings
+
+# -------------------------------------------------------------------
+# ONNX Runtime embedding backend (EMBEDDING_BACKEND=onnx)
+#
+# Runs the sentence-transformers model exported by
+# export_onnx_embeddings.py (int8 dynamic quantization) with the same
+# pooling as the PyTorch model: mean over the attention mask, then L2
+# normalization. Needs onnxruntime and tokenizers, not torch.
+# -------------------------------------------------------------------
+
+MAX_SEQ_LENGTH = 256  # all-MiniLM-L6-v2's max_seq_length
+MODEL_FILE = "model_int8.onnx"
+
+
+class OnnxEmbeddings(Embeddings):
+    def __init__(self, model_dir: str, model_file: str = MODEL_FILE, threads: int = 0):
+        try:
+            import numpy as np
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise RuntimeError(
+                "EMBEDDING_BACKEND=onnx needs onnxruntime and tokenizers installed"
+            ) from e
+
+        path = os.path.join(model_dir, model_file)
+        if not os.path.exists(path):
+            raise RuntimeError(
+                f"{path} not found; run `python export_onnx_embeddings.py` first"
+            )
+
+        self._np = np
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+
+    def _encode(self, texts: list[str]):
+        np = self._np
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {k: v for k, v in inputs.items() if k in self.input_names})[0]
+
+        mask = inputs["attention_mask"][..., None].astype(hidden.dtype)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        return self._encode(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
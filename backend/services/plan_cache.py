@@ -0,0 +1,152 @@
+import asyncio
+import copy
+import hashlib
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+from utils.lru_cache import LRUCache
+
+# Bump whenever the classifier prompt or QueryPlan shape changes so that
+# plans produced by an older planner are never served again.
+PLAN_SCHEMA_VERSION = 3
+
+PLAN_CACHE_SIZE = int(os.getenv("PLAN_CACHE_SIZE", "1024"))
+PLAN_CACHE_TTL_SECONDS = int(os.getenv("PLAN_CACHE_TTL_SECONDS", "86400"))
+PLAN_CACHE_MONGO = os.getenv("PLAN_CACHE_MONGO", "false").lower() in ("1", "true", "yes")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a user query used as the cache key:
+    lower-cased, whitespace collapsed, trailing punctuation dropped.
+    """
+    q = query.strip().lower()
+    q = re.sub(r"\s+", " ", q)
+    return q.rstrip(" ?.!")
+
+
+class PlanCache:
+    """
+    Caches the *semantic* query plan (time_range left unresolved) per
+    normalized query text. Dates are resolved by the caller on every
+    request, so "last month" stays correct across month boundaries.
+
+    Tier 1 is an in-process LRU with TTL, tier 2 an optional Mongo
+    collection shared between workers.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, collection=None):
+        self.ttl = ttl
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.collection = collection
+
+        self.mongo_hits = 0
+        self.mongo_misses = 0
+
+    def key(self, query: str) -> str:
+        text = f"v{PLAN_SCHEMA_VERSION}:{normalize_query(query)}"
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, query: str) -> dict | None:
+        key = self.key(query)
+        plan = self._get_local(key)
+        if plan is None and self.collection is not None:
+            plan = self._get_mongo(key)
+        return plan
+
+    async def aget(self, query: str) -> dict | None:
+        """get() for the async path: the Mongo tier runs in the executor."""
+        key = self.key(query)
+        plan = self._get_local(key)
+        if plan is None and self.collection is not None:
+            loop = asyncio.get_running_loop()
+            plan = await loop.run_in_executor(None, self._get_mongo, key)
+        return plan
+
+    def _get_local(self, key: str) -> dict | None:
+        plan = self.local.get(key)
+        return copy.deepcopy(plan) if plan is not None else None
+
+    def _get_mongo(self, key: str) -> dict | None:
+        try:
+            doc = self.collection.find_one({"_id": key})
+        except Exception as e:
+            print("[PLAN CACHE READ FAILED]", e)
+            return None
+
+        created_at = doc.get("created_at") if doc else None
+        if created_at and created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+
+        # Local copies live only as long as the Mongo entry has left, so a
+        # plan is never served past created_at + ttl
+        remaining = self.ttl
+        if created_at:
+            expires_at = created_at + timedelta(seconds=self.ttl)
+            remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+
+        if not doc or remaining <= 0:
+            self.mongo_misses += 1
+            return None
+
+        self.mongo_hits += 1
+        self.local.set(key, doc["plan"], ttl=remaining)
+        return copy.deepcopy(doc["plan"])
+
+    def set(self, query: str, plan_dict: dict):
+        key, plan = self._set_local(query, plan_dict)
+        if self.collection is not None:
+            self._set_mongo(key, query, plan)
+
+    def aset(self, query: str, plan_dict: dict):
+        """set() for the async path: the Mongo write is left to the executor."""
+        key, plan = self._set_local(query, plan_dict)
+        if self.collection is not None:
+            # Fire and forget; _set_mongo logs its own failures
+            asyncio.get_running_loop().run_in_executor(None, self._set_mongo, key, query, plan)
+
+    def _set_local(self, query: str, plan_dict: dict) -> tuple[str, dict]:
+        key = self.key(query)
+        plan = copy.deepcopy(plan_dict)
+        self.local.set(key, plan)
+        return key, plan
+
+    def _set_mongo(self, key: str, query: str, plan: dict):
+        try:
+            self.collection.replace_one(
+                {"_id": key},
+                {
+                    "_id": key,
+                    "query": normalize_query(query),
+                    "plan": plan,
+                    "created_at": datetime.now(timezone.utc),
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            print("[PLAN CACHE WRITE FAILED]", e)
+
+    def stats(self) -> dict:
+        return {
+            **self.local.stats(),
+            "mongo_enabled": self.collection is not None,
+            "mongo_hits": self.mongo_hits,
+            "mongo_misses": self.mongo_misses,
+        }
+
+
+def build_plan_cache() -> PlanCache:
+    collection = None
+    if PLAN_CACHE_MONGO:
+        from db.mongodb import get_db
+        collection = get_db().query_plan_cache
+
+    return PlanCache(
+        maxsize=PLAN_CACHE_SIZE,
+        ttl=PLAN_CACHE_TTL_SECONDS,
+        collection=collection,
+    )
+
+
+plan_cache = build_plan_cache()
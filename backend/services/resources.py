@@ -0,0 +1,244 @@
+import os
+import threading
+import time
+
+from utils import metrics
+
+# -------------------------------------------------------------------
+# Shared process resources (Mongo clients, embedding model and its
+# batching service, vector store, LLM), created on first use instead of at import time.
+#
+# Each one is a lazy, thread-safe singleton: concurrent first callers
+# wait on one initialization, and a failed initialization is retried
+# on the next call rather than taking the worker down. warm_up() can
+# build them in the background right after startup.
+# -------------------------------------------------------------------
+
+# Settings are read when a resource is built, since this module can be
+# imported before load_dotenv() has run.
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_ONNX_MODEL_DIR = "./models/all-MiniLM-L6-v2-onnx"
+
+
+class Resource:
+    def __init__(self, name: str, factory, check=None):
+        self.name = name
+        self.factory = factory
+        # Optional liveness probe of the built value, used by /readyz
+        self.check = check
+        self._lock = threading.Lock()
+        self._value = None
+        self._ready = False
+        self.error = None
+        self.init_ms = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def get(self):
+        if self._ready:
+            return self._value
+
+        with self._lock:
+            if not self._ready:
+                start = time.perf_counter()
+                try:
+                    value = self.factory()
+                except Exception as e:
+                    self.error = repr(e)
+                    metrics.incr(f"resources.{self.name}.errors")
+                    raise
+
+                self.init_ms = (time.perf_counter() - start) * 1000
+                metrics.observe(f"resources.{self.name}.init_ms", self.init_ms)
+                self._value = value
+                self.error = None
+                self._ready = True
+
+        return self._value
+
+    def status(self) -> dict:
+        return {
+            "ready": self._ready,
+            "init_ms": round(self.init_ms, 1) if self.init_ms is not None else None,
+            "error": self.error,
+        }
+
+
+_resources: dict[str, Resource] = {}
+
+
+def register(name: str, factory, check=None) -> Resource:
+    resource = Resource(name, factory, check)
+    _resources[name] = resource
+    return resource
+
+
+def get_resource(name: str):
+    return _resources[name].get()
+
+
+def peek_resource(name: str):
+    """The built value, or None; never triggers initialization."""
+    resource = _resources[name]
+    return resource.get() if resource.ready else None
+
+
+def resource_status() -> dict:
+    return {name: r.status() for name, r in _resources.items()}
+
+
+def warm_up(names, background: bool = True):
+    """
+    Builds the named resources ahead of the first request. Failures
+    are recorded on the resource (see resource_status) and retried on
+    first use.
+    """
+    def run():
+        for name in names:
+            try:
+                _resources[name].get()
+                print(f"[RESOURCES] {name} ready in {_resources[name].init_ms:.0f} ms")
+            except Exception as e:
+                print(f"[RESOURCES] {name} warm-up failed:", e)
+
+    if not background:
+        run()
+        return None
+
+    thread = threading.Thread(target=run, name="resource-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def readiness(names) -> tuple[bool, dict]:
+    """
+    (ready, per-resource detail). A required resource is ready once it
+    has been built and, if it has a check, the check passes.
+    """
+    detail = {}
+    for name in names:
+        resource = _resources[name]
+        try:
+            value = resource.get()
+            if resource.check:
+                resource.check(value)
+            detail[name] = "ok"
+        except Exception as e:
+            detail[name] = f"unavailable: {e}"
+    return all(v == "ok" for v in detail.values()), detail
+
+
+# -------------------------------------------------------------------
+# Factories. Heavy imports live inside them so importing the app does
+# not pay for libraries a worker may never touch.
+# -------------------------------------------------------------------
+
+def _mongo():
+    from pymongo import MongoClient
+    return MongoClient(os.getenv("MONGO_URI"))
+
+
+def _async_mongo():
+    from pymongo import AsyncMongoClient
+    # Binds to the serving event loop on first use
+    return AsyncMongoClient(os.getenv("MONGO_URI"))
+
+
+def _ping_mongo(client):
+    import pymongo
+    with pymongo.timeout(float(os.getenv("READY_CHECK_TIMEOUT_S", "2"))):
+        client.admin.command("ping")
+
+
+def _embeddings():
+    # EMBEDDING_BACKEND: torch (sentence-transformers) | onnx (int8, onnxruntime)
+    backend = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+    if backend == "onnx":
+        from services.onnx_embeddings import OnnxEmbeddings
+        return OnnxEmbeddings(
+            model_dir=os.getenv("ONNX_MODEL_DIR", DEFAULT_ONNX_MODEL_DIR),
+            threads=int(os.getenv("ONNX_THREADS", "0")),
+        )
+    if backend != "torch":
+        raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(
+        model_name=os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL),
+        model_kwargs={"device": "cpu"},
+        encode_kwargs={"normalize_embeddings": True},
+    )
+
+
+def embedding_model_id() -> str:
+    """Identifies the vectors a backend produces (embedding cache key)."""
+    backend = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+    model = os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+    return f"onnx-int8:{model}" if backend == "onnx" else f"{backend}:{model}"
+
+
+def _embedding_service():
+    from services.embedding_cache import EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_SIZE, EmbeddingCache
+    from services.embedding_service import (
+        EMBED_BATCH_MAX_SIZE,
+        EMBED_BATCH_MAX_WAIT_MS,
+        EmbeddingService,
+    )
+
+    cache = None
+    if os.getenv("EMBEDDING_CACHE", "true").lower() in ("1", "true", "yes"):
+        cache = EmbeddingCache(embedding_model_id(), EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_PATH or None)
+
+    # The model itself is resolved on the first batch
+    return EmbeddingService(
+        embed_batch=lambda texts: get_resource("embeddings").embed_documents(texts),
+        max_batch_size=EMBED_BATCH_MAX_SIZE,
+        max_wait_ms=EMBED_BATCH_MAX_WAIT_MS,
+        cache=cache,
+    )
+
+
+def _pinecone_index():
+    from pinecone import Pinecone, ServerlessSpec
+
+    name = os.getenv("PINECONE_INDEX_NAME", "bills-rag")
+    client = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+    if name not in client.list_indexes().names():
+        client.create_index(
+            name=name,
+            dimension=384,
+            metric="dotproduct",
+            spec=ServerlessSpec(
+                cloud="aws",
+                region=os.getenv("PINECONE_REGION"),
+            ),
+        )
+    return client.Index(name)
+
+
+def _vector_store():
+    # VECTOR_BACKEND: local (in-process, persisted per user) | pinecone
+    from services.vector_index import LocalVectorStore, PineconeVectorStore
+
+    backend = os.getenv("VECTOR_BACKEND", "local").lower()
+    if backend == "pinecone":
+        return PineconeVectorStore(get_resource("pinecone_index"))
+    if backend != "local":
+        raise ValueError(f"Unknown VECTOR_BACKEND: {backend}")
+    return LocalVectorStore(os.getenv("VECTOR_INDEX_DIR", "./vector_index") or None)
+
+
+def _llm():
+    from services.llm_provider import get_llm
+    return get_llm()
+
+
+register("mongo", _mongo, check=_ping_mongo)
+register("async_mongo", _async_mongo)
+register("embeddings", _embeddings)
+register("embedding_service", _embedding_service)
+register("pinecone_index", _pinecone_index)
+register("vector_store", _vector_store)
+register("llm", _llm)
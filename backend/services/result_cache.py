@@ -0,0 +1,73 @@
+import copy
+import hashlib
+import json
+import os
+import threading
+
+from bson import json_util
+
+from utils import metrics
+from utils.lru_cache import LRUCache
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "4096"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def pipeline_hash(collection: str, pipeline: list) -> str:
+    """
+    Canonical hash of a generated pipeline. Resolved bill_date bounds
+    are concrete datetimes inside it, so relative ranges ("last month")
+    get a new key as soon as they resolve differently.
+    """
+    payload = json_util.dumps([collection, pipeline], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    execute_mongo results keyed on (user_id, pipeline hash, user data
+    version). Every bill write bumps the version, so a user's entries
+    are retired exactly when their data changes. Bounded by entry count
+    and by the serialized size of the results.
+    """
+
+    def __init__(self, maxsize: int, max_bytes: int):
+        self.local = LRUCache(
+            maxsize=maxsize,
+            max_bytes=max_bytes,
+            sizeof=lambda entry: entry[2],
+        )
+        self._lock = threading.Lock()
+        self.saved_ms = 0.0
+
+    def key(self, user_id: str, collection: str, pipeline: list, version: int) -> str:
+        text = json.dumps([user_id, pipeline_hash(collection, pipeline), version])
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> list | None:
+        entry = self.local.get(key)
+        if entry is None:
+            return None
+
+        result, elapsed_ms, _ = entry
+        with self._lock:
+            self.saved_ms += elapsed_ms
+        metrics.observe("result_cache.saved_ms", elapsed_ms)
+        # Callers may mutate rows (e.g. stringify _id)
+        return copy.deepcopy(result)
+
+    def set(self, key: str, result: list, elapsed_ms: float):
+        size = len(json_util.dumps(result).encode("utf-8"))
+        self.local.set(key, (copy.deepcopy(result), elapsed_ms, size))
+
+    def stats(self) -> dict:
+        return {
+            **self.local.stats(),
+            "saved_mongo_ms": round(self.saved_ms, 3),
+        }
+
+
+result_cache = ResultCache(
+    maxsize=RESULT_CACHE_SIZE,
+    max_bytes=RESULT_CACHE_MAX_BYTES,
+)
@@ -0,0 +1,219 @@
+from datetime import datetime, timedelta
+
+from services.group_by import group_key_expr, group_label_expr, group_stages
+from utils.text_utils import filter_keys
+
+# -------------------------------------------------------------------
+# bill_rollups: per-user monthly totals
+#
+# One document per (user_id, month, category_key, vendor_key,
+# payment_method_key) with total_amount, tax_amount and bill count,
+# kept current with $inc upserts on every bill write. Bills without a
+# bill_date roll up under month None.
+# -------------------------------------------------------------------
+
+KEY_FIELDS = ("category_key", "vendor_key", "payment_method_key")
+
+# Match fields a rollup query may carry
+ROLLUP_MATCH_FIELDS = {"user_id", "bill_date", *KEY_FIELDS}
+RANGE_OPS = {"$gte", "$lte", "$lt"}
+
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def month_start(dt: datetime) -> datetime:
+    return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(dt: datetime) -> datetime:
+    dt = month_start(dt)
+    return dt.replace(year=dt.year + 1, month=1) if dt.month == 12 else dt.replace(month=dt.month + 1)
+
+
+def rollup_key(bill: dict) -> dict:
+    keys = {k: bill.get(k) for k in KEY_FIELDS}
+    if not all(k in bill for k in KEY_FIELDS):
+        keys = filter_keys(bill)
+
+    bill_date = bill.get("bill_date")
+    month = (
+        datetime(bill_date.year, bill_date.month, 1)
+        if isinstance(bill_date, datetime) else None
+    )
+    return {"user_id": bill.get("user_id"), "month": month, **keys}
+
+
+def rollup_id(key: dict) -> str:
+    month = key["month"].strftime("%Y-%m") if key["month"] else ""
+    return "|".join([key["user_id"] or "", month, *(key[k] or "" for k in KEY_FIELDS)])
+
+
+def apply_bill(db, bill: dict, sign: int = 1):
+    """Adds (sign=1) or removes (sign=-1) one bill from its rollup."""
+    key = rollup_key(bill)
+    db.bill_rollups.update_one(
+        {"_id": rollup_id(key)},
+        {
+            "$inc": {
+                "total_amount": sign * (bill.get("total_amount") or 0),
+                "tax_amount": sign * (bill.get("tax_amount") or 0),
+                "count": sign,
+            },
+            "$setOnInsert": {
+                **key,
+                "vendor": bill.get("vendor"),
+                "category": bill.get("category"),
+                "payment_method": bill.get("payment_method"),
+            },
+        },
+        upsert=True,
+    )
+
+
+def replace_bill(db, old: dict | None, new: dict):
+    if old:
+        apply_bill(db, old, sign=-1)
+    apply_bill(db, new, sign=1)
+
+
+# -------------------------------------------------------------------
+# Query side
+# -------------------------------------------------------------------
+
+def _exclusive_end(lte: datetime) -> datetime:
+    """
+    Exclusive end for an inclusive $lte. The time resolver closes days
+    and months at 23:59:59, which is taken as the end of that day (bill
+    dates carry no sub-second part), so "last month" ends exactly at the
+    next month's start and is served wholly from rollups.
+    """
+    if (lte.hour, lte.minute, lte.second) == (23, 59, 59):
+        return lte.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return lte + ONE_MICROSECOND
+
+
+def _split_range(date_range: dict):
+    """
+    Splits a bill_date range into (head, full months, tail): the full
+    calendar months inside it are served from rollups, the partial
+    months at either edge from raw bills. Returns None when the range
+    shape is not supported.
+    """
+    if not isinstance(date_range, dict) or not set(date_range) <= RANGE_OPS:
+        return None
+
+    start = date_range.get("$gte")
+    if "$lte" in date_range:
+        end = _exclusive_end(date_range["$lte"])
+    else:
+        end = date_range.get("$lt")
+
+    first = None if start is None else (
+        start if start == month_start(start) else next_month(start)
+    )
+    last = None if end is None else month_start(end)
+
+    if first is not None and last is not None and first >= last:
+        return None
+
+    months = {}
+    if first is not None:
+        months["$gte"] = first
+    if last is not None:
+        months["$lt"] = last
+
+    head = {"$gte": start, "$lt": first} if start is not None and start < first else None
+    tail = {"$gte": last, "$lt": end} if end is not None and last < end else None
+    return head, months, tail
+
+
+def rollup_pipeline(
+    match: dict,
+    operation: str,
+    group_by: str | None = None,
+    limit: int | None = None,
+) -> list[dict] | None:
+    """
+    Pipeline on bill_rollups answering a bill-level sum/count (or a
+    grouped breakdown), with the partial-month edges read from raw bills
+    through $unionWith. Returns None when the query needs raw bills only.
+    """
+    if not (group_by or operation in ("sum", "count")) or not set(match) <= ROLLUP_MATCH_FIELDS:
+        return None
+
+    base = {k: v for k, v in match.items() if k != "bill_date"}
+    rollup_match = base
+    edges = []
+
+    if "bill_date" in match:
+        split = _split_range(match["bill_date"])
+        if split is None:
+            return None
+        head, months, tail = split
+
+        rollup_match = {**base, "month": months}
+        edges = [{**base, "bill_date": edge} for edge in (head, tail) if edge]
+
+    rollup_fields = {"total": "$total_amount", "count": "$count"}
+    bill_fields = {"total": "$total_amount", "count": {"$literal": 1}}
+    if group_by:
+        rollup_fields["g"] = group_key_expr(group_by, "month")
+        rollup_fields["label"] = group_label_expr(group_by, "month")
+        bill_fields["g"] = group_key_expr(group_by)
+        bill_fields["label"] = group_label_expr(group_by)
+
+    pipeline = [
+        {"$match": rollup_match},
+        {"$project": rollup_fields},
+    ]
+    for edge in edges:
+        pipeline.append({
+            "$unionWith": {
+                "coll": "bills",
+                "pipeline": [
+                    {"$match": edge},
+                    {"$project": bill_fields},
+                ],
+            }
+        })
+
+    if group_by:
+        return pipeline + [
+            # Rollups emptied by deletes keep their document at count 0
+            {"$match": {"count": {"$ne": 0}}},
+            *group_stages(group_by, limit, amount="$total", count="$count", key="$g", label="$label"),
+        ]
+
+    pipeline += [
+        {"$group": {"_id": None, "total": {"$sum": "$total"}, "count": {"$sum": "$count"}}},
+        # Same empty result as aggregating raw bills
+        {"$match": {"count": {"$gt": 0}}},
+    ]
+
+    if operation == "sum":
+        pipeline.append({"$project": {"count": 0}})
+    else:
+        pipeline.append({"$project": {"_id": 0, "total": "$count"}})
+
+    return pipeline
+
+
+def compute_rollups(bills) -> dict:
+    """Rollup documents recomputed from raw bills, keyed by _id."""
+    rollups = {}
+    for bill in bills:
+        key = rollup_key(bill)
+        doc = rollups.setdefault(rollup_id(key), {
+            "_id": rollup_id(key),
+            **key,
+            "vendor": bill.get("vendor"),
+            "category": bill.get("category"),
+            "payment_method": bill.get("payment_method"),
+            "total_amount": 0,
+            "tax_amount": 0,
+            "count": 0,
+        })
+        doc["total_amount"] += bill.get("total_amount") or 0
+        doc["tax_amount"] += bill.get("tax_amount") or 0
+        doc["count"] += 1
+    return rollups
@@ -0,0 +1,199 @@
+import re
+
+from services.group_by import group_limit, normalize_group_by
+from templates.time_parser import extract_time_expression, has_time_expression
+
+# -------------------------------------------------------------------
+# Deterministic fast-path planner
+#
+# Recognizes a handful of fixed query shapes and emits the same plan
+# dict the classifier would. Anything it is not sure about returns None
+# so the caller falls back to the LLM.
+# -------------------------------------------------------------------
+
+CATEGORY_WORDS = {
+    "grocery": "Grocery",
+    "groceries": "Grocery",
+    "medical": "Medical",
+    "medicine": "Medical",
+    "medicines": "Medical",
+    "pharmacy": "Medical",
+    "travel": "Travel",
+    "fuel": "Fuel",
+    "petrol": "Fuel",
+    "food": "Food",
+    "restaurant": "Food",
+    "dining": "Food",
+    "electricity": "Electricity",
+    "shopping": "Shopping",
+}
+
+PAYMENT_WORDS = {
+    "upi": "UPI",
+    "gpay": "UPI",
+    "google pay": "UPI",
+    "phonepe": "UPI",
+    "paytm": "UPI",
+    "cash": "CASH",
+    "card": "CARD",
+    "credit card": "CARD",
+    "debit card": "CARD",
+}
+
+_payment_alt = "|".join(
+    re.escape(w) for w in sorted(PAYMENT_WORDS, key=len, reverse=True)
+)
+
+PAYMENT_RE = re.compile(
+    rf"\b(?:(?:that were |were )?paid |payments? )?(?:by|via|using|through|with|in) "
+    rf"(?P<method>{_payment_alt})\b(?: payments?)?"
+)
+
+VENDOR = r"(?:from|at) (?P<vendor>[a-z0-9&' .-]+?)"
+CATEGORY = r"(?:(?P<category>[a-z]+) )?"
+MULTI_VENDOR_RE = re.compile(r"\b(?:and|or)\b")
+
+SHAPES = [
+    # total spent on groceries / how much did i spend at fresh mart
+    (
+        "AGGREGATION", "sum",
+        re.compile(
+            r"^(?:what is |what's |whats )?(?:my |the )?total(?: amount)?"
+            r"(?: (?:spent|spend|spending|expenses?|paid))?"
+            r"(?: (?:on|for) (?P<target>[a-z]+))?"
+            rf"(?: bills?)?(?: {VENDOR})?$"
+        ),
+    ),
+    (
+        "AGGREGATION", "sum",
+        re.compile(
+            r"^how much (?:did i |have i |i )?(?:spend|spent|pay|paid)"
+            r"(?: (?:on|for) (?P<target>[a-z]+))?"
+            rf"(?: {VENDOR})?$"
+        ),
+    ),
+    # count bills from vendor / how many grocery bills
+    (
+        "AGGREGATION", "count",
+        re.compile(
+            r"^(?:count|how many|number of)(?: of)?(?: all)?(?: my| the)? "
+            rf"{CATEGORY}(?:bills?|receipts?|invoices?)"
+            rf"(?: (?:do i have|did i get))?(?: {VENDOR})?$"
+        ),
+    ),
+    # list bills paid by upi last 3 months
+    (
+        "FILTER", "list",
+        re.compile(
+            r"^(?:list|show me|show|get|display|find)(?: all)?(?: my| the| of my)? "
+            rf"{CATEGORY}(?:bills?|receipts?|invoices?)"
+            rf"(?: {VENDOR})?$"
+        ),
+    ),
+]
+
+
+# Breakdown phrases: "by category", "per vendor", "month-wise", "monthly",
+# "top 5 stores". Removed before the time check ("by month" is not a
+# time range) and before shape matching.
+_DIM = r"(?:categor(?:y|ies)|vendors?|stores?|shops?|months?|payment (?:methods?|modes?))"
+
+GROUP_RE = re.compile(
+    # "top 0 vendors" is no breakdown at all; it is left unmatched
+    rf"\btop (?P<n>[1-9]\d*) (?P<top>{_DIM})\b"
+    rf"|\b(?:by|per|for each|across|split by|grouped by) (?P<by>{_DIM})\b"
+    rf"|\b(?P<wise>{_DIM})[ -]?wise\b"
+    r"|\b(?P<monthly>monthly)\b"
+)
+
+# What is left of a breakdown query once the group phrase is removed
+BREAKDOWN_RE = re.compile(
+    r"^(?:(?:show|me|get|give|what|which|are|is|whats|my|the|of|total|totals|"
+    r"spending|spend|spent|expense|expenses|expenditure|breakdown)(?: |$))*"
+    r"(?:(?:on|for) (?P<target>[a-z]+)(?: |$))?"
+    r"(?:i spent(?: the)? most(?: at| on)?|by (?:spend|spending|amount))?$"
+)
+
+
+def extract_group_by(q: str) -> tuple[str | None, int | None, str]:
+    """(group_by, limit, rest of the query) for a breakdown phrase."""
+    m = GROUP_RE.search(q)
+    if not m:
+        return None, None, q
+
+    word = m.group("top") or m.group("by") or m.group("wise") or "month"
+    group_by = normalize_group_by(word)
+    limit = group_limit(int(m.group("n"))) if m.group("n") else None
+    return group_by, limit, _clean(q[:m.start()] + " " + q[m.end():])
+
+
+def _clean(query: str) -> str:
+    q = query.strip().lower()
+    q = re.sub(r"[?!.,]+", " ", q)
+    return re.sub(r"\s+", " ", q).strip()
+
+
+def rule_plan(user_query: str) -> dict | None:
+    """
+    Returns a plan dict for recognised query shapes, None otherwise.
+    """
+    # ---------- time ----------
+    tr, rest = extract_time_expression(user_query)
+    q = _clean(rest)
+    group_by, limit, q = extract_group_by(q)
+
+    # Any time-ish word left after the recognised phrase has been removed
+    # means the query has time semantics we cannot parse with confidence.
+    if has_time_expression(q):
+        return None
+
+    time_range = None
+    if tr is not None and tr.type != "NONE":
+        time_range = tr.model_dump(by_alias=True, exclude_none=True)
+
+    # ---------- payment method ----------
+    filters = {}
+    m = PAYMENT_RE.search(q)
+    if m:
+        filters["payment_method"] = PAYMENT_WORDS[m.group("method")]
+        q = _clean(q[:m.start()] + " " + q[m.end():])
+
+    # ---------- shape ----------
+    shapes = SHAPES
+    if group_by:
+        shapes = [("AGGREGATION", "sum", BREAKDOWN_RE), *SHAPES]
+
+    for plan_type, operation, pattern in shapes:
+        m = pattern.match(q)
+        if not m:
+            continue
+
+        groups = m.groupdict()
+        word = groups.get("target") or groups.get("category")
+        if word:
+            if word not in CATEGORY_WORDS:
+                # "total spent on rice" is an item query; leave it to the LLM
+                return None
+            filters["category"] = CATEGORY_WORDS[word]
+
+        if groups.get("vendor"):
+            vendor = groups["vendor"].strip()
+            # "from dmart and reliance" names several vendors, which an
+            # exact vendor_key match would answer with nothing
+            if MULTI_VENDOR_RE.search(vendor) or "," in user_query:
+                return None
+            filters["vendor"] = vendor.title()
+
+        plan = {
+            "type": plan_type,
+            "operation": operation,
+            "entities": {},
+            "filters": filters or None,
+            "time_range": time_range,
+            "needs_rag": False,
+        }
+        if group_by:
+            plan.update({"type": "AGGREGATION", "operation": "sum", "group_by": group_by, "limit": limit})
+        return plan
+
+    return None
@@ -0,0 +1,155 @@
+import os
+import re
+
+from pymongo import DESCENDING
+
+from utils import metrics
+from utils.text_utils import TERM_RE, category_key, filter_keys
+
+# -------------------------------------------------------------------
+# bill_search_grams: prefix postings for search-as-you-type
+#
+# Every word of a bill's vendor, category and item descriptions is
+# indexed under each of its prefixes (2..MAX_GRAM characters), one
+# posting per (bill, prefix) with the best field weight. A query word
+# then is a single indexed equality lookup, however short it is.
+#
+# Postings carry bill_date and category_key so searches can be
+# combined with those filters without touching `bills`.
+#
+# /bills turns a search into an _id $in filter only while it matches at
+# most SEARCH_MAX_IDS bills; broader searches, and ones with no word of
+# MIN_GRAM characters, filter `bills` by regex as before.
+# -------------------------------------------------------------------
+
+MIN_GRAM = 2
+MAX_GRAM = int(os.getenv("SEARCH_MAX_GRAM", "12"))
+SEARCH_MAX_IDS = int(os.getenv("SEARCH_MAX_IDS", "1000"))
+
+FIELD_WEIGHTS = {"vendor": 3, "category": 2, "items": 1}
+
+
+def search_words(text: str | None) -> list[str]:
+    return TERM_RE.findall((text or "").lower())
+
+
+def prefixes(word: str) -> list[str]:
+    return [word[:n] for n in range(MIN_GRAM, min(len(word), MAX_GRAM) + 1)]
+
+
+def bill_grams(bill: dict) -> dict:
+    """gram → highest field weight it appears under."""
+    texts = [
+        ("vendor", bill.get("vendor")),
+        ("category", bill.get("category")),
+        *(("items", item.get("description")) for item in bill.get("items") or []),
+    ]
+
+    grams = {}
+    for field, text in texts:
+        weight = FIELD_WEIGHTS[field]
+        for word in search_words(text):
+            for gram in prefixes(word):
+                grams[gram] = max(grams.get(gram, 0), weight)
+    return grams
+
+
+def sync_search_postings(db, bill_id, user_id: str, bill: dict) -> int:
+    """Replaces the postings of one bill. `bill_id` is the bills _id as stored."""
+    keys = filter_keys(bill)
+    postings = [
+        {
+            "user_id": user_id,
+            "gram": gram,
+            "bill_id": bill_id,
+            "bill_date": bill.get("bill_date"),
+            "category_key": keys["category_key"],
+            "w": weight,
+        }
+        for gram, weight in bill_grams(bill).items()
+    ]
+
+    db.bill_search_grams.delete_many({"bill_id": bill_id})
+    if postings:
+        db.bill_search_grams.insert_many(postings, ordered=False)
+    return len(postings)
+
+
+def query_grams(q: str) -> list[str]:
+    grams = []
+    for word in search_words(q):
+        gram = word[:MAX_GRAM]
+        if len(gram) >= MIN_GRAM and gram not in grams:
+            grams.append(gram)
+    return grams
+
+
+def search_pipeline(
+    user_id: str,
+    q: str,
+    category: str | None = None,
+    date_range: dict | None = None,
+    limit: int = SEARCH_MAX_IDS,
+) -> list[dict] | None:
+    """
+    Ranked bill ids whose text matches every query word as a prefix.
+    Score is the sum of the best field weight per word; ties go to the
+    newest bill. Returns None when the query has no searchable word.
+    """
+    grams = query_grams(q)
+    if not grams:
+        return None
+
+    match = {"user_id": user_id, "gram": {"$in": grams}}
+    if category:
+        match["category_key"] = category_key(category)
+    if date_range:
+        match["bill_date"] = date_range
+
+    return [
+        {"$match": match},
+        {
+            "$group": {
+                "_id": "$bill_id",
+                "matched": {"$sum": 1},
+                "score": {"$sum": "$w"},
+                "bill_date": {"$first": "$bill_date"},
+            }
+        },
+        {"$match": {"matched": len(grams)}},
+        {"$sort": {"score": DESCENDING, "bill_date": DESCENDING}},
+        {"$limit": limit},
+        {"$project": {"_id": 0, "bill_id": "$_id", "score": 1}},
+    ]
+
+
+def search_bill_ids(db, user_id: str, q: str, **filters) -> list[dict] | None:
+    """[{"bill_id", "score"}] best first, or None for an unsearchable query."""
+    pipeline = search_pipeline(user_id, q, **filters)
+    if pipeline is None:
+        return None
+    return list(db.bill_search_grams.aggregate(pipeline))
+
+
+def regex_filter(q: str) -> dict:
+    """Substring match on vendor, item descriptions or category."""
+    pattern = {"$regex": re.escape(q), "$options": "i"}
+    return {
+        "$or": [
+            {"vendor": pattern},
+            {"items.description": pattern},
+            {"category": pattern},
+        ]
+    }
+
+
+def bills_search_filter(db, user_id: str, q: str, **filters) -> dict:
+    """
+    Filter on `bills` for a /bills search: the matching ids when the
+    postings give a complete answer, the regex filter otherwise.
+    """
+    hits = search_bill_ids(db, user_id, q, limit=SEARCH_MAX_IDS + 1, **filters)
+    if hits is None or len(hits) > SEARCH_MAX_IDS:
+        metrics.incr("search.regex_fallback")
+        return regex_filter(q)
+    return {"_id": {"$in": [h["bill_id"] for h in hits]}}
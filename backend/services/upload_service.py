@@ -4,6 +4,7 @@ from utils.ocr_utils import extract_text, normalize_for_mongo
 from chains.bill_extract_chain import extract_bill_structured
 from services.bill_service import insert_bill
 from services.vector_service import insert_bill_vector
+from services.data_version import bump_data_version
 
 
 async def handle_bill_upload(
@@ -82,10 +83,16 @@ async def save_confirmed_bill(
     )
 
     # 6️⃣ Vector insert
-    insert_bill_vector(
-        bill_id=bill_id,
-        user_id=user_id,
-        text=raw_text
-    )
+    try:
+        insert_bill_vector(
+            bill_id=bill_id,
+            user_id=user_id,
+            text=raw_text,
+            bill=normalized
+        )
+    finally:
+        # 7️⃣ Invalidate this user's cached answers; Mongo already has the
+        # bill even if the vector write failed
+        bump_data_version(db, user_id)
 
     return {"status": "ok", "bill_id": bill_id}
@@ -0,0 +1,515 @@
+import base64
+import contextlib
+import hashlib
+import json
+import operator
+import os
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+from utils import metrics
+from utils.text_utils import category_key
+
+# -------------------------------------------------------------------
+# Vector store used by both ingestion (insert_bill_vector) and query
+# time (app.vector_search). VECTOR_BACKEND selects:
+#
+#   local     in-process, one partition per user, persisted under
+#             VECTOR_INDEX_DIR (default)
+#   pinecone  the remote Pinecone index
+#
+# Records are (id, vector, metadata) with metadata
+#   {"user_id", "bill_id", "category", "category_key", "bill_date", "text"}
+# where bill_date is epoch seconds (or None). Filters use the Mongo
+# shapes the planner already produces: {"category": "Grocery",
+# "bill_date": {"$gte": datetime, "$lt": datetime}}.
+# -------------------------------------------------------------------
+
+# Partitions larger than this are searched through an HNSW graph
+# (hnswlib, if installed); smaller ones by brute-force dot product.
+HNSW_MIN_VECTORS = int(os.getenv("VECTOR_HNSW_MIN_VECTORS", "5000"))
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = int(os.getenv("VECTOR_HNSW_EF_SEARCH", "64"))
+
+# Log records a partition accumulates before compaction is considered
+COMPACT_MIN_OPS = int(os.getenv("VECTOR_COMPACT_MIN_OPS", "1000"))
+
+RANGE_OPS = ("$gte", "$gt", "$lte", "$lt")
+RANGE_COMPARE = {"$gte": operator.ge, "$gt": operator.gt, "$lte": operator.le, "$lt": operator.lt}
+
+
+def to_epoch(value) -> float | None:
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        # Mongo hands back naive UTC datetimes
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def bill_metadata(bill_id: str, user_id: str, text: str, bill: dict | None = None) -> dict:
+    bill = bill or {}
+    return {
+        "user_id": user_id,
+        "bill_id": bill_id,
+        "category": bill.get("category"),
+        "category_key": category_key(bill.get("category")),
+        "bill_date": to_epoch(bill.get("bill_date")),
+        "text": text,
+    }
+
+
+class VectorStore:
+    """Backend interface."""
+
+    def upsert(self, user_id: str, ids: list[str], vectors, metadatas: list[dict]):
+        raise NotImplementedError
+
+    def delete(self, user_id: str, ids: list[str]):
+        raise NotImplementedError
+
+    def query(self, user_id: str, vector, top_k: int = 5, filters: dict | None = None) -> list[dict]:
+        """[{"id", "score", "metadata"}], best first."""
+        raise NotImplementedError
+
+
+# -------------------------------------------------------------------
+# Local backend
+# -------------------------------------------------------------------
+
+class UserPartition:
+    """
+    One user's vectors: a float32 matrix of unit vectors plus parallel
+    ids, metadata, and the filter columns (category code, bill_date) as
+    numpy arrays so filtered queries are vectorized.
+
+    On disk: a snapshot (<dir>/<user hash>.npz + .json) and an append-only
+    <user hash>.log of the writes made since. A write appends one line
+    per record; the log is folded into a new snapshot once it holds more
+    than COMPACT_MIN_OPS records and half the partition size. The HNSW
+    graph (large partitions only) is rebuilt on demand.
+
+    Several worker processes on one host may share a partition: writes
+    and compaction hold an exclusive flock on <user hash>.lock, and every
+    read or write first catches up with the files (new log lines, or a
+    full reload after another worker compacted). Not safe across hosts.
+    """
+
+    def __init__(self, path: str | None):
+        self.path = path
+        self.lock = threading.RLock()
+        self._reset()
+        if path:
+            with self._file_lock(exclusive=False):
+                self._load()
+
+    def _reset(self):
+        self.ids: list[str] = []
+        self.metadatas: list[dict] = []
+        self.vectors = None
+        self.positions: dict[str, int] = {}
+        self.category_codes = np.empty(0, dtype=np.int32)
+        self.bill_dates = np.empty(0, dtype=np.float64)
+        self._category_code: dict[str, int] = {}
+        self._log_ops = 0
+        # Which snapshot is loaded, and how far into the log
+        self._snapshot_stamp = None
+        self._log_offset = 0
+        self._hnsw = None
+        self._hnsw_size = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ---------- filter columns ----------
+
+    def _code(self, key: str | None) -> int:
+        if key is None:
+            return -1
+        return self._category_code.setdefault(key, len(self._category_code))
+
+    def _columns(self, metadatas: list[dict]) -> tuple:
+        codes = np.array([self._code(m.get("category_key")) for m in metadatas], dtype=np.int32)
+        # NaN never satisfies a range comparison, like a missing date
+        dates = np.array(
+            [np.nan if m.get("bill_date") is None else m["bill_date"] for m in metadatas],
+            dtype=np.float64,
+        )
+        return codes, dates
+
+    # ---------- persistence ----------
+
+    @contextlib.contextmanager
+    def _file_lock(self, exclusive: bool):
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    @contextlib.contextmanager
+    def _writing(self):
+        """Exclusive file lock, with the in-memory copy caught up first."""
+        if not self.path:
+            yield
+            return
+        with self._file_lock(exclusive=True):
+            self._refresh()
+            yield
+
+    def _stamp(self):
+        try:
+            st = os.stat(f"{self.path}.npz")
+        except FileNotFoundError:
+            return None
+        # os.replace gives a compacted snapshot a new inode
+        return st.st_ino, st.st_mtime_ns
+
+    def _load(self):
+        self._snapshot_stamp = self._stamp()
+        if self._snapshot_stamp is not None:
+            with np.load(f"{self.path}.npz") as data:
+                vectors = data["vectors"]
+            with open(f"{self.path}.json", encoding="utf-8") as f:
+                saved = json.load(f)
+            self.vectors = vectors
+            self.ids = saved["ids"]
+            self.metadatas = saved["metadatas"]
+            self.positions = {id_: i for i, id_ in enumerate(self.ids)}
+            self.category_codes, self.bill_dates = self._columns(self.metadatas)
+        self._tail_log()
+
+    def _tail_log(self):
+        """Replays log lines appended since the last read."""
+        try:
+            f = open(f"{self.path}.log", "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(self._log_offset)
+            data = f.read()
+
+        # A line without its newline is still being written (or was torn
+        # by a crash); it is picked up, or skipped, later
+        complete = data[:data.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            self._replay(entry)
+            self._log_ops += 1
+        self._log_offset += len(complete)
+
+    def _refresh(self):
+        """Catches up with writes made by other processes."""
+        if not self.path:
+            return
+        if self._stamp() != self._snapshot_stamp:
+            # Another process compacted: the old offset means nothing now
+            self._reset()
+            self._load()
+        else:
+            self._tail_log()
+
+    def _replay(self, entry: dict):
+        if entry["op"] == "delete":
+            self._delete(entry["ids"])
+        else:
+            vector = np.frombuffer(base64.b64decode(entry["vector"]), dtype=np.float32)
+            self._upsert([entry["id"]], vector[None, :], [entry["metadata"]])
+
+    def _append_log(self, entries: list[dict]):
+        if not self.path:
+            return
+        lines = "".join(json.dumps(entry) + "\n" for entry in entries)
+        with open(f"{self.path}.log", "a", encoding="utf-8") as f:
+            if f.tell() > self._log_offset:
+                # Leftover of a torn write; end it so ours parses
+                lines = "\n" + lines
+            f.write(lines)
+            f.flush()
+            self._log_offset = f.tell()
+        self._log_ops += len(entries)
+        if self._log_ops > max(COMPACT_MIN_OPS, len(self.ids) // 2):
+            self._compact()
+
+    def _compact(self):
+        """Folds the log into a new snapshot."""
+        # Called under the exclusive file lock. Written to temp files then
+        # swapped in, so a crash never leaves a half-written snapshot.
+        # Replaying a log already folded in is harmless (upserts and
+        # deletes are idempotent).
+        np.savez(f"{self.path}.tmp.npz", vectors=self.vectors)
+        with open(f"{self.path}.tmp.json", "w", encoding="utf-8") as f:
+            json.dump({"ids": self.ids, "metadatas": self.metadatas}, f)
+        os.replace(f"{self.path}.tmp.npz", f"{self.path}.npz")
+        os.replace(f"{self.path}.tmp.json", f"{self.path}.json")
+        open(f"{self.path}.log", "w").close()
+        self._snapshot_stamp = self._stamp()
+        self._log_offset = 0
+        self._log_ops = 0
+        metrics.incr("vector_index.compactions")
+
+    # ---------- writes ----------
+
+    def upsert(self, ids, vectors, metadatas):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self.lock, self._writing():
+            self._upsert(ids, vectors, metadatas)
+            self._append_log([
+                {
+                    "op": "upsert",
+                    "id": id_,
+                    "vector": base64.b64encode(vector.tobytes()).decode("ascii"),
+                    "metadata": metadata,
+                }
+                for id_, vector, metadata in zip(ids, vectors, metadatas)
+            ])
+
+    def _upsert(self, ids, vectors, metadatas):
+        if self.vectors is None:
+            self.vectors = np.empty((0, vectors.shape[1]), dtype=np.float32)
+
+        codes, dates = self._columns(metadatas)
+        new_rows = []
+        for i, (id_, vector, metadata) in enumerate(zip(ids, vectors, metadatas)):
+            pos = self.positions.get(id_)
+            if pos is None:
+                self.positions[id_] = len(self.ids)
+                self.ids.append(id_)
+                self.metadatas.append(metadata)
+                new_rows.append(i)
+            else:
+                self.vectors[pos] = vector
+                self.metadatas[pos] = metadata
+                self.category_codes[pos] = codes[i]
+                self.bill_dates[pos] = dates[i]
+                # Graph positions can't be updated in place
+                self._hnsw = None
+
+        if new_rows:
+            self.vectors = np.vstack([self.vectors, vectors[new_rows]])
+            self.category_codes = np.concatenate([self.category_codes, codes[new_rows]])
+            self.bill_dates = np.concatenate([self.bill_dates, dates[new_rows]])
+
+    def delete(self, ids):
+        with self.lock, self._writing():
+            if self._delete(ids):
+                self._append_log([{"op": "delete", "ids": list(ids)}])
+
+    def _delete(self, ids) -> bool:
+        drop = set(ids)
+        keep = [i for i, id_ in enumerate(self.ids) if id_ not in drop]
+        if len(keep) == len(self.ids):
+            return False
+        self.ids = [self.ids[i] for i in keep]
+        self.metadatas = [self.metadatas[i] for i in keep]
+        self.vectors = self.vectors[keep]
+        self.category_codes = self.category_codes[keep]
+        self.bill_dates = self.bill_dates[keep]
+        self.positions = {id_: i for i, id_ in enumerate(self.ids)}
+        self._hnsw = None
+        return True
+
+    def _allowed(self, filters: dict):
+        """Row numbers passing the filters, computed over the numpy columns."""
+        mask = np.ones(len(self.ids), dtype=bool)
+        if filters.get("category"):
+            code = self._category_code.get(category_key(filters["category"]))
+            if code is None:
+                return np.empty(0, dtype=np.int64)
+            mask &= self.category_codes == code
+        if filters.get("bill_date"):
+            date_range = filters["bill_date"]
+            for op, compare in RANGE_COMPARE.items():
+                bound = to_epoch(date_range.get(op))
+                if bound is not None:
+                    mask &= compare(self.bill_dates, bound)
+        return np.flatnonzero(mask)
+
+    # ---------- search ----------
+
+    def _graph(self):
+        """HNSW index over all rows, extended with rows added since it was built."""
+        try:
+            import hnswlib
+        except ImportError:
+            return None
+
+        if self._hnsw is None:
+            self._hnsw = hnswlib.Index(space="ip", dim=self.vectors.shape[1])
+            self._hnsw.init_index(
+                max_elements=max(len(self.ids) * 2, 1024),
+                ef_construction=HNSW_EF_CONSTRUCTION,
+                M=HNSW_M,
+            )
+            self._hnsw_size = 0
+
+        if self._hnsw_size < len(self.ids):
+            if len(self.ids) > self._hnsw.get_max_elements():
+                self._hnsw.resize_index(len(self.ids) * 2)
+            rows = np.arange(self._hnsw_size, len(self.ids))
+            self._hnsw.add_items(self.vectors[rows], rows)
+            self._hnsw_size = len(self.ids)
+
+        return self._hnsw
+
+    def _graph_query(self, query, k: int, allowed):
+        graph = self._graph()
+        if graph is None:
+            return None
+
+        graph.set_ef(max(HNSW_EF_SEARCH, k))
+        allowed_set = None if allowed is None else set(allowed.tolist())
+        try:
+            labels, distances = graph.knn_query(
+                query, k=k,
+                filter=None if allowed_set is None else (lambda label: label in allowed_set),
+            )
+        except RuntimeError:
+            # hnswlib could not reach k results (very selective filter)
+            return None
+
+        metrics.incr("vector_index.hnsw_queries")
+        # hnswlib's "ip" distance is 1 - dot
+        return labels[0], 1.0 - distances[0]
+
+    def _brute_force_query(self, query, top_k: int, allowed):
+        metrics.incr("vector_index.brute_force_queries")
+        subset = self.vectors if allowed is None else self.vectors[allowed]
+        sims = subset @ query
+        k = min(top_k, len(sims))
+        best = np.argpartition(-sims, k - 1)[:k]
+        best = best[np.argsort(-sims[best])]
+        return (best if allowed is None else allowed[best]), sims[best]
+
+    def query(self, vector, top_k: int, filters: dict | None):
+        query = np.asarray(vector, dtype=np.float32)
+        with self.lock:
+            if self.path:
+                with self._file_lock(exclusive=False):
+                    self._refresh()
+            if not self.ids:
+                return []
+
+            allowed = None
+            if filters:
+                allowed = self._allowed(filters)
+                if not len(allowed):
+                    return []
+
+            candidates = len(self.ids) if allowed is None else len(allowed)
+            found = None
+            if candidates >= HNSW_MIN_VECTORS:
+                found = self._graph_query(query, min(top_k, candidates), allowed)
+            if found is None:
+                found = self._brute_force_query(query, top_k, allowed)
+            rows, scores = found
+
+            return [
+                {"id": self.ids[row], "score": float(score), "metadata": self.metadatas[row]}
+                for row, score in zip(rows, scores)
+            ]
+
+
+class LocalVectorStore(VectorStore):
+    def __init__(self, directory: str | None):
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._partitions: dict[str, UserPartition] = {}
+
+    def partition(self, user_id: str) -> UserPartition:
+        with self._lock:
+            part = self._partitions.get(user_id)
+            if part is None:
+                path = None
+                if self.directory:
+                    name = hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:32]
+                    path = os.path.join(self.directory, name)
+                part = self._partitions[user_id] = UserPartition(path)
+            return part
+
+    def upsert(self, user_id, ids, vectors, metadatas):
+        self.partition(user_id).upsert(ids, vectors, metadatas)
+
+    def delete(self, user_id, ids):
+        self.partition(user_id).delete(ids)
+
+    def query(self, user_id, vector, top_k=5, filters=None):
+        return self.partition(user_id).query(vector, top_k, filters)
+
+    def stats(self) -> dict:
+        with self._lock:
+            sizes = {uid: len(p) for uid, p in self._partitions.items()}
+        return {"backend": "local", "partitions_loaded": len(sizes), "vectors_loaded": sum(sizes.values())}
+
+
+# -------------------------------------------------------------------
+# Pinecone backend
+# -------------------------------------------------------------------
+
+class PineconeVectorStore(VectorStore):
+    """
+    One shared index; users are separated by a user_id metadata filter.
+
+    Filters need category_key and bill_date metadata, which vectors
+    written before this store existed lack: run reindex_vectors.py once
+    when switching an existing index to it.
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    def upsert(self, user_id, ids, vectors, metadatas):
+        self.index.upsert(vectors=[
+            {
+                "id": id_,
+                "values": list(map(float, vector)),
+                # Pinecone rejects null metadata values
+                "metadata": {k: v for k, v in metadata.items() if v is not None},
+            }
+            for id_, vector, metadata in zip(ids, vectors, metadatas)
+        ])
+
+    def delete(self, user_id, ids):
+        self.index.delete(ids=list(ids))
+
+    def query(self, user_id, vector, top_k=5, filters=None):
+        index_filter = {"user_id": user_id}
+        filters = filters or {}
+        if filters.get("category"):
+            # Same canonical key the local backend matches on
+            index_filter["category_key"] = category_key(filters["category"])
+        if filters.get("bill_date"):
+            index_filter["bill_date"] = {
+                op: to_epoch(value) for op, value in filters["bill_date"].items() if op in RANGE_OPS
+            }
+
+        results = self.index.query(
+            vector=list(map(float, vector)),
+            top_k=top_k,
+            filter=index_filter,
+            include_metadata=True,
+        )
+        return [
+            {"id": m["id"], "score": m["score"], "metadata": m.get("metadata") or {}}
+            for m in results.get("matches", [])
+        ]
+
+    def stats(self) -> dict:
+        return {"backend": "pinecone"}
@@ -1,23 +1,20 @@
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from services.resources import get_resource
+from services.vector_index import bill_metadata
 
-embeddings = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-MiniLM-L6-v2"
-)
+# Bills are embedded through the shared embedding service (batched and
+# cached) and written to the same vector store vector_search reads.
 
-vector_db = Chroma(
-    collection_name="bills",
-    embedding_function=embeddings,
-    persist_directory="./vector_store"
-)
 
-
-def insert_bill_vector(bill_id: str, user_id: str, text: str):
-    vector_db.add_texts(
-        texts=[text],
-        metadatas=[{
-            "bill_id": bill_id,
-            "user_id": user_id
-        }],
-        ids=[bill_id]
+def insert_bill_vector(bill_id: str, user_id: str, text: str, bill: dict | None = None):
+    """`bill` supplies the category and bill_date searches filter on."""
+    vector = get_resource("embedding_service").embed_documents([text])[0]
+    get_resource("vector_store").upsert(
+        user_id,
+        ids=[bill_id],
+        vectors=[vector],
+        metadatas=[bill_metadata(bill_id, user_id, text, bill)],
     )
+
+
+def delete_bill_vector(bill_id: str, user_id: str):
+    get_resource("vector_store").delete(user_id, [bill_id])
@@ -1,11 +1,17 @@
 from datetime import datetime, timedelta, timezone
 import calendar
+import os
 import re
 
 from templates.time_range import TimeRange, DatePart
+from templates.time_parser import parse_time_range, has_time_expression
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from helper import groqllm
+from utils import metrics
+from utils.single_flight import SingleFlight
+
+TIME_LLM_FALLBACK = os.getenv("TIME_LLM_FALLBACK", "false").lower() in ("1", "true", "yes")
 
 # -------------------------------
 # Parser
@@ -104,6 +110,14 @@ For phrases like "last N months":
 # -------------------------------
 time_range_chain = time_prompt | groqllm | parser
 
+# Identical in-flight extractions share one Groq call
+time_flight = SingleFlight("time_range")
+
+
+def _extract_time_range(payload: dict) -> TimeRange:
+    metrics.count_llm_call("time_range")
+    return time_range_chain.invoke(payload)
+
 # -------------------------------
 # Resolver
 # -------------------------------
@@ -212,8 +226,20 @@ def resolve_time_range(tr: TimeRange):
 # SAFE ENTRY
 # -------------------------------
 def extract_time_range_semantic(query: str) -> TimeRange | None:
+    # Local deterministic parser first; no network involved
+    tr = parse_time_range(query)
+    if tr is not None:
+        return None if tr.type == "NONE" else tr
+
+    # The LLM is only consulted (opt-in) for time phrases the parser
+    # could not handle
+    if not TIME_LLM_FALLBACK or not has_time_expression(query):
+        return None
+
     try:
-        tr = time_range_chain.invoke({"query": query})
+        tr = time_flight.do(
+            query.strip().lower(), _extract_time_range, {"query": query}
+        )
         if tr.type == "NONE":
             return None
         return tr
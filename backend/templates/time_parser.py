@@ -0,0 +1,435 @@
+import re
+from datetime import datetime
+
+from templates.time_range import TimeRange
+from templates.time_resolver import FISCAL_YEAR_START_MONTH
+
+# -------------------------------------------------------------------
+# Deterministic time-expression parser
+#
+# Turns phrases like "last 3 months", "between sept 2024 and nov 2024"
+# or "19 jan 2026" into the same semantic TimeRange the LLM chain
+# produces. Nothing is resolved to real dates here; that stays in
+# time_resolver.resolve_time_range.
+# -------------------------------------------------------------------
+
+MONTHS = {
+    "jan": 1, "january": 1,
+    "feb": 2, "february": 2,
+    "mar": 3, "march": 3,
+    "apr": 4, "april": 4,
+    "may": 5,
+    "jun": 6, "june": 6,
+    "jul": 7, "july": 7,
+    "aug": 8, "august": 8,
+    "sep": 9, "sept": 9, "september": 9,
+    "oct": 10, "october": 10,
+    "nov": 11, "november": 11,
+    "dec": 12, "december": 12,
+}
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+    "eleven": 11, "twelve": 12,
+}
+
+ORDINAL_WORDS = {"first": 1, "second": 2, "third": 3, "fourth": 4}
+
+_month_alt = "|".join(sorted(MONTHS, key=len, reverse=True))
+_number_alt = r"\d+|" + "|".join(NUMBER_WORDS)
+
+MONTH = rf"(?:{_month_alt})\b"
+DAY = r"(?:[0-2]?\d|3[01])(?:st|nd|rd|th)?"
+YEAR = r"(?:19|20)\d{2}"
+
+# A single calendar date, most specific form first
+DATE = (
+    rf"(?:{YEAR}-\d{{1,2}}-\d{{1,2}}"
+    rf"|\d{{1,2}}[/-]\d{{1,2}}[/-]{YEAR}"
+    rf"|(?:the )?{DAY}(?: of)? {MONTH},?(?: {YEAR})?"
+    rf"|{MONTH} {DAY}(?:,? {YEAR})?(?!\d)"
+    rf"|{MONTH},?(?: {YEAR})?"
+    rf"|{YEAR})"
+)
+
+_date_re = re.compile(rf"^{DATE}$")
+
+# Words that signal time intent; used to decide whether an unparsed
+# query deserves the (opt-in) LLM fallback.
+TIME_WORDS_RE = re.compile(
+    rf"\b{MONTH}\b|\b{YEAR}\b|\b\d{{1,2}}(?:st|nd|rd|th)\b"
+    r"|\b(?:today|yesterday|week|weeks|day|days|month|months|year|years|"
+    r"quarter|quarters|since|until|till|between|ago|recent|latest|fy|fiscal|q[1-4])\b"
+)
+
+UNITS = {
+    "day": "day", "days": "day",
+    "week": "week", "weeks": "week",
+    "month": "month", "months": "month",
+    "quarter": "quarter", "quarters": "quarter",
+    "year": "year", "years": "year",
+}
+
+
+class TimeParseError(ValueError):
+    """A time phrase was found but cannot be expressed deterministically."""
+
+
+def _number(text: str) -> int:
+    return int(text) if text.isdigit() else NUMBER_WORDS[text]
+
+
+def _rel(unit: str, offset: int, **extra) -> dict:
+    return {"relative": {"unit": unit, "offset": offset}, **extra}
+
+
+def _tr(type_: str, from_, to, granularity: str) -> dict:
+    return {"type": type_, "from": from_, "to": to, "granularity": granularity}
+
+
+def _check_calendar(part: dict, text: str):
+    # A missing year is checked against a leap year, so "29 feb" passes
+    try:
+        datetime(part.get("year", 2000), part.get("month", 1), part.get("day", 1))
+    except ValueError:
+        raise TimeParseError(f"not a calendar date: {text}") from None
+
+
+def parse_date(text: str) -> tuple[dict, str] | None:
+    """
+    Parses one date expression into (DatePart dict, granularity).
+    A missing year becomes a hybrid part relative to the current year.
+    Returns None for impossible dates such as 31/02/2026.
+    """
+    try:
+        return _parse_date(text)
+    except TimeParseError:
+        return None
+
+
+def _parse_date(text: str) -> tuple[dict, str] | None:
+    """
+    parse_date for the rule builders: None when the text is not a date,
+    TimeParseError when it is one that does not exist.
+    """
+    text = text.strip().strip(",")
+    if not _date_re.match(text):
+        return None
+
+    # "may" on its own is far more often the verb than the month
+    if text == "may":
+        return None
+
+    if m := re.fullmatch(rf"({YEAR})-(\d{{1,2}})-(\d{{1,2}})", text):
+        part = {"year": int(m[1]), "month": int(m[2]), "day": int(m[3])}
+        _check_calendar(part, text)
+        return part, "day"
+
+    # Numeric dates are day-first (dd/mm/yyyy), as printed on Indian bills
+    if m := re.fullmatch(rf"(\d{{1,2}})[/-](\d{{1,2}})[/-]({YEAR})", text):
+        part = {"year": int(m[3]), "month": int(m[2]), "day": int(m[1])}
+        _check_calendar(part, text)
+        return part, "day"
+
+    if re.fullmatch(YEAR, text):
+        return {"year": int(text)}, "year"
+
+    year = re.search(rf"\b({YEAR})$", text)
+    rest = text[:year.start()] if year else text
+    month = re.search(rf"\b({_month_alt})\b", rest)
+    day = re.search(r"\b(\d{1,2})(?:st|nd|rd|th)?\b", rest)
+
+    part = {"month": MONTHS[month[1]]}
+    granularity = "month"
+    if day:
+        part["day"] = int(day[1])
+        granularity = "day"
+
+    if year:
+        part["year"] = int(year[1])
+    _check_calendar(part, text)
+    if not year:
+        part = _rel("year", 0, **part)
+
+    return part, granularity
+
+
+def _finer(a: str, b: str) -> str:
+    order = ["day", "month", "year"]
+    return a if order.index(a) < order.index(b) else b
+
+
+# -------------------------------------------------------------------
+# Rule builders: each takes a regex match and returns a TimeRange dict,
+# None when the match is not really a time phrase (keep scanning), or
+# raises TimeParseError when it is one we cannot express (give up).
+# -------------------------------------------------------------------
+
+def _range(m):
+    start, end = _parse_date(m["a"]), _parse_date(m["b"])
+    if not start or not end:
+        return None
+
+    (a, ga), (b, gb) = start, end
+
+    # "between sept and nov 2024" → sept inherits 2024
+    if "year" in b and "relative" in a and "month" in a:
+        a = {k: v for k, v in a.items() if k != "relative"}
+        a["year"] = b["year"]
+        if a["month"] > b["month"]:
+            a["year"] -= 1
+
+    if "relative" in a or "relative" in b:
+        raise TimeParseError(f"range without a year: {m[0]}")
+
+    return _tr("ABSOLUTE", a, b, _finer(ga, gb))
+
+
+def _since(m):
+    parsed = _parse_date(m["a"])
+    if not parsed:
+        return None
+    part, granularity = parsed
+    if "relative" in part:
+        raise TimeParseError(f"open range without a year: {m[0]}")
+    return _tr("ABSOLUTE", part, _rel("day", 0), granularity)
+
+
+def _from(m):
+    # "bills from jan 2026" with no end names that one period, not an
+    # open range up to today ("from X to Y" is matched by _range first)
+    parsed = _parse_date(m["a"])
+    if not parsed:
+        return None
+    part, granularity = parsed
+    if "relative" in part:
+        return _tr("RELATIVE", part, dict(part), granularity)
+    return _tr("ABSOLUTE", part, None, granularity)
+
+
+def _until(m):
+    parsed = _parse_date(m["a"])
+    if not parsed:
+        return None
+    part, granularity = parsed
+    if "relative" in part:
+        raise TimeParseError(f"open range without a year: {m[0]}")
+    return _tr("ABSOLUTE", None, part, granularity)
+
+
+def _count(m) -> int:
+    n = _number(m["n"])
+    if n < 1:
+        raise TimeParseError(f"empty period: {m[0]}")
+    return n
+
+
+def _since_relative(m):
+    n = _count(m) if m["n"] else 1
+    unit = UNITS[m["unit"]]
+    if unit == "week":
+        return _tr("RELATIVE", _rel("day", -7 * n), _rel("day", 0), "day")
+    return _tr("RELATIVE", _rel(unit, -n), _rel(unit, 0), _granularity(unit))
+
+
+def _granularity(unit: str) -> str:
+    return {"day": "day", "week": "day", "year": "year"}.get(unit, "month")
+
+
+def _last_n(m):
+    n = _count(m)
+    unit = UNITS[m["unit"]]
+
+    if unit == "day":
+        return _tr("RELATIVE", _rel("day", -n), _rel("day", 0), "day")
+    if unit == "week":
+        return _tr("RELATIVE", _rel("day", -7 * n), _rel("day", 0), "day")
+
+    # Last N months/quarters/years: N completed periods, current one excluded
+    return _tr("RELATIVE", _rel(unit, -n), _rel(unit, -1), _granularity(unit))
+
+
+def _last_one(m):
+    # "past month" is "last month"
+    unit = UNITS.get(m["unit"], m["unit"])
+    offset = 0 if m["which"] in ("this", "current") else -1
+
+    if unit == "day" or (unit == "week" and offset == 0):
+        raise TimeParseError(f"calendar period not supported: {m[0]}")
+    if unit == "week":
+        return _tr("RELATIVE", _rel("day", -7), _rel("day", 0), "day")
+    if unit in ("fy", "fiscal year", "financial year"):
+        unit = "fiscal_year"
+
+    return _tr("RELATIVE", _rel(unit, offset), _rel(unit, offset), _granularity(unit))
+
+
+def _ago(m):
+    n = _number(m["n"])
+    unit = UNITS[m["unit"]]
+    if unit == "week":
+        return _tr("RELATIVE", _rel("day", -7 * n), _rel("day", -7 * n + 6), "day")
+    return _tr("RELATIVE", _rel(unit, -n), _rel(unit, -n), _granularity(unit))
+
+
+def _day_word(m):
+    offset = 0 if m["word"] == "today" else -1
+    return _tr("RELATIVE", _rel("day", offset), _rel("day", offset), "day")
+
+
+def _period(text: str) -> dict:
+    """TimeRange dict of a named relative period ("yesterday", "last month")."""
+    m = _DAY_WORD_RE.fullmatch(text)
+    if m:
+        return _day_word(m)
+    return _last_one(_LAST_ONE_RE.fullmatch(text))
+
+
+def _since_period(m):
+    # "since yesterday", "after last month": that period up to today
+    tr = _period(m["p"])
+    unit = tr["from"]["relative"]["unit"]
+    # The resolver closes a month range at the 'to' month's end
+    to = _rel("month", 0) if unit == "month" else _rel("day", 0)
+    return _tr("RELATIVE", tr["from"], to, tr["granularity"])
+
+
+def _until_period(m):
+    # "until today", "before last month": open start, through that period
+    tr = _period(m["p"])
+    return _tr("ABSOLUTE", None, tr["to"], tr["granularity"])
+
+
+def _last_month_name(m):
+    month = MONTHS[m["month"]]
+    offset = -1 if m["which"] in ("last", "previous") else 0
+    part = _rel("year", offset, month=month)
+    return _tr("RELATIVE", part, dict(part), "month")
+
+
+def _quarter(m):
+    q = int(m["q"]) if m["q"] else ORDINAL_WORDS[m["qword"]]
+    year = int(m["year"])
+    return _tr(
+        "ABSOLUTE",
+        {"year": year, "month": 3 * q - 2},
+        {"year": year, "month": 3 * q},
+        "month",
+    )
+
+
+def _fiscal_year(m):
+    if m["start"]:
+        start_year = int(m["start"])
+        if start_year < 100:
+            start_year += 2000
+    else:
+        # FY25 / FY 2025 name the year the fiscal year ends in
+        end_year = int(m["end"])
+        if end_year < 100:
+            end_year += 2000
+        start_year = end_year - 1 if FISCAL_YEAR_START_MONTH > 1 else end_year
+
+    end_month = FISCAL_YEAR_START_MONTH - 1 or 12
+    end_year = start_year + 1 if FISCAL_YEAR_START_MONTH > 1 else start_year
+    return _tr(
+        "ABSOLUTE",
+        {"year": start_year, "month": FISCAL_YEAR_START_MONTH},
+        {"year": end_year, "month": end_month},
+        "month",
+    )
+
+
+def _single(m):
+    parsed = _parse_date(m["a"])
+    if not parsed:
+        return None
+    part, granularity = parsed
+
+    # A bare 4-digit number is only a year when introduced as one;
+    # "bills over 2000" is an amount
+    before = m.string[:m.start()]
+    if granularity == "year" and not re.search(r"\b(?:in|for|of|during|year|throughout)\s*$", before):
+        return None
+
+    if "relative" in part:
+        return _tr("RELATIVE", part, dict(part), granularity)
+
+    return _tr("ABSOLUTE", part, None, granularity)
+
+
+def _none(m):
+    return _tr("NONE", None, None, "year")
+
+
+_N = rf"(?P<n>{_number_alt})"
+_UNIT = r"(?P<unit>days?|weeks?|months?|quarters?|years?)"
+_FY = r"(?:fy|fiscal year|financial year)"
+
+_DAY_WORD_RE = re.compile(r"(?P<word>today|yesterday)")
+_LAST_ONE_RE = re.compile(rf"(?P<which>last|previous|past|this|current) (?P<unit>{_FY}|day|week|month|quarter|year)")
+_PERIOD = rf"(?:today|yesterday|(?:last|previous|past|this|current) (?:{_FY}|day|week|month|quarter|year))"
+
+RULES = [
+    (re.compile(r"\b(?:all time|ever|overall|lifetime)\b"), _none),
+    (re.compile(rf"\bbetween (?P<a>{DATE}) and (?P<b>{DATE})\b"), _range),
+    (re.compile(rf"\b(?:from )?(?P<a>{DATE}) (?:to|till|until|upto|up to|through|-) (?P<b>{DATE})(?!\d)"), _range),
+    (re.compile(rf"\bsince (?:the )?(?:last |past )?{_N}? ?{_UNIT}(?: ago)?\b"), _since_relative),
+    (re.compile(rf"\b(?:since|after|starting(?: from)?) (?P<p>{_PERIOD})\b"), _since_period),
+    (re.compile(rf"\b(?:until|till|upto|up to|before) (?P<p>{_PERIOD})\b"), _until_period),
+    (re.compile(rf"\b(?:since|after|starting) (?P<a>{DATE})(?!\d)"), _since),
+    (re.compile(rf"\bfrom (?P<a>{DATE})(?!\d)"), _from),
+    (re.compile(rf"\b(?:until|till|upto|up to|before) (?P<a>{DATE})(?!\d)"), _until),
+    (re.compile(rf"\b{_N} {_UNIT} ago\b"), _ago),
+    (re.compile(rf"\b(?:last|past|previous) {_N} {_UNIT}\b"), _last_n),
+    (re.compile(rf"\b{_LAST_ONE_RE.pattern}\b"), _last_one),
+    (re.compile(rf"\b{_DAY_WORD_RE.pattern}\b"), _day_word),
+    (re.compile(rf"\b(?P<which>last|previous|this) (?P<month>{_month_alt})\b(?! {YEAR})"), _last_month_name),
+    (re.compile(rf"\b(?:q(?P<q>[1-4])|(?P<qword>first|second|third|fourth) quarter)(?: of)? (?P<year>{YEAR})\b"), _quarter),
+    (re.compile(rf"\b{_FY} ?(?:(?P<start>{YEAR}|\d{{2}})[-/](?:{YEAR}|\d{{2}})|(?P<end>{YEAR}|\d{{2}}))\b"), _fiscal_year),
+    (re.compile(rf"(?<![\d/-])\b(?P<a>{DATE})(?![\d/-])"), _single),
+]
+
+
+def _clean(query: str) -> str:
+    q = query.strip().lower()
+    q = re.sub(r"[?!.]+", " ", q)
+    return re.sub(r"\s+", " ", q).strip()
+
+
+def extract_time_expression(query: str) -> tuple[TimeRange | None, str]:
+    """
+    Finds the first time expression in the query.
+
+    Returns (TimeRange, query with that phrase removed), or
+    (None, cleaned query) when no phrase could be parsed.
+    """
+    q = _clean(query)
+
+    for pattern, build in RULES:
+        for m in pattern.finditer(q):
+            try:
+                tr = build(m)
+            except TimeParseError as e:
+                print("[TIME PARSER] unparseable:", e)
+                return None, q
+
+            if tr is None:
+                continue
+
+            # Drop the preposition that introduced the phrase ("spent in jan 2026")
+            before = re.sub(r"(?:\b(?:in|on|for|during|over|of|from|the)\s+)+$", "", q[:m.start()])
+            rest = f"{before} {q[m.end():]}"
+            return TimeRange(**tr), re.sub(r"\s+", " ", rest).strip()
+
+    return None, q
+
+
+def parse_time_range(query: str) -> TimeRange | None:
+    tr, _ = extract_time_expression(query)
+    return tr
+
+
+def has_time_expression(query: str) -> bool:
+    return bool(TIME_WORDS_RE.search(_clean(query)))
@@ -3,7 +3,7 @@ from pydantic import BaseModel, Field, model_validator
 
 
 class Relative(BaseModel):
-    unit: Literal["day", "month", "year"]
+    unit: Literal["day", "month", "quarter", "fiscal_year", "year"]
     offset: int
 
 
@@ -0,0 +1,133 @@
+from pydantic import ValidationError
+
+from templates.time_parser import has_time_expression, parse_date, parse_time_range
+from templates.time_range import TimeRange
+
+# -------------------------------------------------------------------
+# Local repair of the classifier's time_range
+#
+# The 8B classifier often returns time ranges that are close to the
+# TimeRange schema but not quite valid. Instead of a second LLM call,
+# the deterministic parser is tried first and the LLM output is only
+# coerced into shape when the parser has nothing.
+# -------------------------------------------------------------------
+
+TYPES = {"ABSOLUTE", "RELATIVE", "NONE"}
+GRANULARITIES = {"day", "month", "year"}
+UNITS = {
+    "day": "day", "days": "day",
+    "month": "month", "months": "month",
+    "quarter": "quarter", "quarters": "quarter",
+    "year": "year", "years": "year",
+    "fiscal_year": "fiscal_year", "fy": "fiscal_year",
+}
+
+
+def _coerce_part(part):
+    if part is None:
+        return None
+
+    # "2024-01-05", "2024-01-05T00:00:00", "jan 2024"
+    if isinstance(part, str):
+        text = part.strip().lower().split("t")[0] if part[:4].isdigit() else part.strip().lower()
+        parsed = parse_date(text)
+        return parsed[0] if parsed else None
+
+    if not isinstance(part, dict):
+        return None
+
+    out = {}
+    for key in ("year", "month", "day"):
+        value = part.get(key)
+        if value is not None:
+            try:
+                out[key] = int(value)
+            except (TypeError, ValueError):
+                return None
+
+    rel = part.get("relative")
+    if isinstance(rel, dict):
+        unit = UNITS.get(str(rel.get("unit", "")).lower())
+        try:
+            offset = int(rel.get("offset", 0))
+        except (TypeError, ValueError):
+            return None
+
+        if str(rel.get("unit", "")).lower() in ("week", "weeks"):
+            unit, offset = "day", offset * 7
+        if unit is None:
+            return None
+
+        out["relative"] = {"unit": unit, "offset": offset}
+
+    return out or None
+
+
+def _infer_granularity(*parts) -> str:
+    parts = [p for p in parts if p]
+    if any(p.get("day") for p in parts):
+        return "day"
+    if any(p.get("month") for p in parts):
+        return "month"
+    units = [p["relative"]["unit"] for p in parts if p.get("relative")]
+    if "day" in units:
+        return "day"
+    if units and all(u == "year" for u in units):
+        return "year"
+    if units:
+        return "month"
+    return "year"
+
+
+def coerce_time_range(raw) -> TimeRange | None:
+    """Best-effort conversion of an LLM time_range into a valid TimeRange."""
+    if raw is None:
+        return None
+
+    if isinstance(raw, TimeRange):
+        return raw
+
+    if isinstance(raw, str):
+        return parse_time_range(raw)
+
+    if not isinstance(raw, dict):
+        return None
+
+    start = raw.get("from", raw.get("from_", raw.get("start")))
+    end = raw.get("to", raw.get("end"))
+    start, end = _coerce_part(start), _coerce_part(end)
+
+    type_ = str(raw.get("type") or "").upper()
+    if type_ == "NONE" or (start is None and end is None):
+        return TimeRange(type="NONE", granularity="year")
+    if type_ not in TYPES:
+        type_ = "RELATIVE" if any(p and p.get("relative") for p in (start, end)) else "ABSOLUTE"
+
+    granularity = str(raw.get("granularity") or "").lower()
+    if granularity not in GRANULARITIES:
+        granularity = _infer_granularity(start, end)
+
+    try:
+        return TimeRange(**{"type": type_, "from": start, "to": end, "granularity": granularity})
+    except (ValidationError, TypeError, ValueError) as e:
+        print("[TIME REPAIR FAILED]", raw, e)
+        return None
+
+
+def repair_time_range(raw, user_query: str) -> TimeRange | None:
+    """
+    Returns a validated TimeRange for the plan, or None for "no time
+    filter". Never calls the LLM.
+    """
+    parsed = parse_time_range(user_query)
+    if parsed is not None:
+        return None if parsed.type == "NONE" else parsed
+
+    # No time words in the query: whatever the classifier invented is noise
+    if not has_time_expression(user_query):
+        return None
+
+    tr = coerce_time_range(raw)
+    if tr is None or tr.type == "NONE":
+        return None
+    return tr
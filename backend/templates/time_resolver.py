@@ -1,7 +1,11 @@
 from datetime import datetime, timedelta, timezone
 import calendar
+import os
 from templates.time_range import TimeRange, DatePart
 
+# Month the fiscal year starts in (4 = April, Indian FY)
+FISCAL_YEAR_START_MONTH = int(os.getenv("FISCAL_YEAR_START_MONTH", "4"))
+
 def month_start(year: int, month: int):
     return datetime(year, month, 1, 0, 0, 0, tzinfo=timezone.utc)
 
@@ -28,6 +32,12 @@ def resolve_relative(part: DatePart, base: datetime, is_start: bool):
     if unit == "day":
         dt = base + relativedelta(days=offset)
 
+        # Day boundary normalization ("yesterday", "last 7 days")
+        if is_start:
+            dt = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+        else:
+            dt = dt.replace(hour=23, minute=59, second=59, microsecond=0)
+
     elif unit == "month":
         dt = base + relativedelta(months=offset)
 
@@ -36,11 +46,26 @@ def resolve_relative(part: DatePart, base: datetime, is_start: bool):
             dt = dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         else:
             dt = (
-                dt.replace(day=1)
+                dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
                 + relativedelta(months=1)
                 - relativedelta(microseconds=1)
             )
 
+    elif unit == "quarter":
+        dt = base + relativedelta(months=3 * offset)
+        q_month = (dt.month - 1) // 3 * 3 + 1
+        dt = dt.replace(month=q_month, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        if not is_start:
+            dt = dt + relativedelta(months=3) - relativedelta(microseconds=1)
+
+    elif unit == "fiscal_year":
+        fy_year = base.year if base.month >= FISCAL_YEAR_START_MONTH else base.year - 1
+        dt = datetime(fy_year + offset, FISCAL_YEAR_START_MONTH, 1, tzinfo=timezone.utc)
+
+        if not is_start:
+            dt = dt + relativedelta(years=1) - relativedelta(microseconds=1)
+
     elif unit == "year":
         dt = base + relativedelta(years=offset)
 
@@ -48,7 +73,7 @@ def resolve_relative(part: DatePart, base: datetime, is_start: bool):
             dt = dt.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
         else:
             dt = (
-                dt.replace(month=1, day=1)
+                dt.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
                 + relativedelta(years=1)
                 - relativedelta(microseconds=1)
             )
@@ -74,6 +99,12 @@ def resolve_absolute(part: DatePart, is_start: bool):
 
     return datetime(year, month, day, hour, minute, second, tzinfo=timezone.utc)
 
+def resolve_part(part: DatePart, base: datetime, is_start: bool):
+    """Resolves either kind of DatePart (e.g. "since Jan 2025" → to=today)."""
+    if part.relative:
+        return resolve_relative(part, base, is_start)
+    return resolve_absolute(part, is_start)
+
 def resolve_time_range(tr: TimeRange):
     if not isinstance(tr, TimeRange):
         raise TypeError("resolve_time_range expects TimeRange object")
@@ -94,6 +125,15 @@ def resolve_time_range(tr: TimeRange):
             raise ValueError("Unsupported relative unit for hybrid month")
 
         month = tr.from_.month
+
+        # Hybrid day: e.g., "19 Jan" with no year
+        if tr.from_.day:
+            day = tr.from_.day
+            return {
+                "$gte": datetime(year, month, day, 0, 0, 0, tzinfo=timezone.utc),
+                "$lte": datetime(year, month, day, 23, 59, 59, tzinfo=timezone.utc),
+            }
+
         return {"$gte": month_start(year, month), "$lte": month_end(year, month)}
 
     # 3. Handle RELATIVE (Standard Ranges: e.g., "Last 3 months")
@@ -105,6 +145,11 @@ def resolve_time_range(tr: TimeRange):
             
             # If offset is -3, we want from 3 months ago until last month
             end_offset = -1 if offset < -1 else offset
+
+            # An explicit month 'to' wins ("3 months ago", "since last month")
+            if tr.to and tr.to.relative and tr.to.relative.unit == "month":
+                end_offset = tr.to.relative.offset
+
             end_year, end_month = shift_month(now.year, now.month, end_offset)
             end = month_end(end_year, end_month)
             return {"$gte": start, "$lte": end}
@@ -145,9 +190,13 @@ def resolve_time_range(tr: TimeRange):
                 end = resolve_absolute(tr.from_, is_start=False)
             return {"$gte": start, "$lte": end}
 
-        # Handle Explicit Range (e.g., "Jan 2024 to March 2024")
+        # Handle Explicit Range (e.g., "Jan 2024 to March 2024", "since Jan 2024")
         start = resolve_absolute(tr.from_, is_start=True)
-        end = resolve_absolute(tr.to, is_start=False)
+        end = resolve_part(tr.to, now, is_start=False)
         return {"$gte": start, "$lte": end}
 
+    # 6. Handle ABSOLUTE open start (e.g., "until March 2024")
+    if tr.type == "ABSOLUTE" and tr.to:
+        return {"$lte": resolve_part(tr.to, now, is_start=False)}
+
     raise ValueError(f"Unsupported TimeRange type: {tr.type}")
\ No newline at end of file
@@ -0,0 +1,75 @@
+import contextvars
+import threading
+from collections import defaultdict
+
+# Process-wide counters and timings, exposed through GET /metrics.
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_timings = {}
+_histograms = {}
+
+# Per-request LLM call count; the box is shared with tasks spawned by
+# the request since they copy the context on creation.
+_llm_calls = contextvars.ContextVar("llm_calls", default=None)
+
+
+def incr(name: str, value: int = 1):
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, value: float):
+    """
+    Records one sample (e.g. a latency in ms) as count/sum/max.
+    """
+    with _lock:
+        t = _timings.setdefault(name, {"count": 0, "sum": 0.0, "max": 0.0})
+        t["count"] += 1
+        t["sum"] += value
+        t["max"] = max(t["max"], value)
+
+
+def histogram(name: str, value: float, buckets):
+    """
+    Records one sample into its (non-cumulative) bucket: the first bucket
+    whose upper bound is >= value, or "+Inf".
+    """
+    label = next((str(b) for b in buckets if value <= b), "+Inf")
+    with _lock:
+        h = _histograms.setdefault(name, {"count": 0, "sum": 0.0, "buckets": {}})
+        h["count"] += 1
+        h["sum"] += value
+        h["buckets"][label] = h["buckets"].get(label, 0) + 1
+
+
+def snapshot() -> dict:
+    with _lock:
+        timings = {
+            name: {
+                **t,
+                "avg": round(t["sum"] / t["count"], 3) if t["count"] else 0.0,
+            }
+            for name, t in _timings.items()
+        }
+        histograms = {
+            name: {**h, "buckets": dict(h["buckets"])}
+            for name, h in _histograms.items()
+        }
+        return {"counters": dict(_counters), "timings": timings, "histograms": histograms}
+
+
+def begin_llm_count() -> list:
+    box = [0]
+    _llm_calls.set(box)
+    return box
+
+
+def count_llm_call(kind: str):
+    incr(f"llm_calls.{kind}")
+    box = _llm_calls.get()
+    if box is not None:
+        box[0] += 1
+
+
+def end_llm_count(box: list):
+    observe("llm_calls_per_query", box[0])
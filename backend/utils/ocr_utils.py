@@ -75,6 +75,7 @@ def normalize_for_mongo_dynamic(data: dict) -> dict:
 
 from datetime import datetime
 from typing import Dict, Any
+from utils.text_utils import filter_keys, item_terms
 
 def parse_date(value):
     if value is None:
@@ -142,6 +143,9 @@ def normalize_for_mongo(bill: Dict[str, Any]) -> Dict[str, Any]:
     Converts LLM/manual bill output into canonical Mongo format
     """
     print("[RAW BILL]", bill)
+    items = normalize_items(
+        bill.get("items") or bill.get("line_items")
+    )
     normalized = {
         # ---------- Core ----------
         "vendor": bill.get("vendor"),
@@ -168,9 +172,9 @@ def normalize_for_mongo(bill: Dict[str, Any]) -> Dict[str, Any]:
         "payment_method": bill.get("payment_method"),
 
         # ---------- Items ----------
-        "items": normalize_items(
-            bill.get("items") or bill.get("line_items")
-        ),
+        "items": items,
+        # Indexed search terms of the item descriptions
+        "item_terms": item_terms(items),
 
         # ---------- OCR leftovers ----------
         "extra_data": bill.get("extra_data", {}),
@@ -179,6 +183,9 @@ def normalize_for_mongo(bill: Dict[str, Any]) -> Dict[str, Any]:
         "raw": sanitize_raw(bill),  # raw bill
     }
 
+    # Folded vendor/category/payment_method keys for indexed filters
+    normalized.update(filter_keys(normalized))
+
     print("[NORMALIZED BILL]", normalized)
     print("[ORIGINAL BILL]", bill)
 
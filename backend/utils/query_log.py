@@ -0,0 +1,27 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+# Optional JSONL log of every planned query, replayed by index_advisor.py.
+# Plans are logged unresolved (relative time ranges stay relative).
+QUERY_LOG_PATH = os.getenv("QUERY_LOG_PATH")
+
+_lock = threading.Lock()
+
+
+def log_plan(user_query: str, source: str, plan_dict: dict):
+    if not QUERY_LOG_PATH:
+        return
+
+    record = {
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "query": user_query,
+        "source": source,
+        "plan": plan_dict,
+    }
+    try:
+        with _lock, open(QUERY_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+    except OSError as e:
+        print("[QUERY LOG WRITE FAILED]", e)
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+from utils import metrics
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight calls: while a call for `key` is
+    running, later callers with the same key wait for it and share its
+    result (or exception) instead of issuing their own upstream call.
+
+    Callers get the same result object; copy it before mutating.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._ainflight = {}
+
+    def _count(self, coalesced: bool):
+        metrics.incr(f"single_flight.{self.name}.calls")
+        if coalesced:
+            metrics.incr(f"single_flight.{self.name}.coalesced")
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        self._count(coalesced=not leader)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def ado(self, key, fn, *args, **kwargs):
+        task = self._ainflight.get(key)
+        leader = task is None
+
+        if leader:
+            # The upstream call runs as its own task, so one caller
+            # disconnecting does not cancel it for everyone else
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._ainflight[key] = task
+
+            def _done(t, key=key):
+                if self._ainflight.get(key) is t:
+                    del self._ainflight[key]
+
+            task.add_done_callback(_done)
+
+        self._count(coalesced=not leader)
+        return await asyncio.shield(task)
@@ -0,0 +1,119 @@
+import re
+
+TERM_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_term(term: str) -> str:
+    # Cheap plural folding so "eggs" and "egg" share a term
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+
+def tokenize_terms(text: str | None) -> list[str]:
+    """
+    Lower-cased, de-duplicated search terms of a piece of text.
+    Pure numbers (quantities, prices) and single characters are dropped.
+    """
+    terms = []
+    for token in TERM_RE.findall((text or "").lower()):
+        if len(token) < 2 or token.isdigit():
+            continue
+        term = normalize_term(token)
+        if term not in terms:
+            terms.append(term)
+    return terms
+
+
+def item_terms(items) -> list[str]:
+    """Union of the terms of all item descriptions of a bill."""
+    terms = set()
+    for item in items or []:
+        terms.update(tokenize_terms(item.get("description")))
+    return sorted(terms)
+
+
+# -------------------------------------------------------------------
+# Canonical filter keys
+#
+# vendor/category/payment_method are stored a second time as folded
+# keys so filters can be exact (indexed) matches instead of
+# case-insensitive regexes. Keys are computed the same way at ingest
+# and at query time.
+# -------------------------------------------------------------------
+
+KEY_STRIP_RE = re.compile(r"[^a-z0-9]+")
+
+VENDOR_SUFFIXES = ("privatelimited", "pvtltd", "limited", "ltd", "llp")
+
+CATEGORY_SYNONYMS = {
+    "groceries": "grocery",
+    "medicine": "medical",
+    "medicines": "medical",
+    "pharmacy": "medical",
+    "petrol": "fuel",
+    "diesel": "fuel",
+    "restaurant": "food",
+    "dining": "food",
+}
+
+PAYMENT_METHOD_SYNONYMS = {
+    "gpay": "upi",
+    "googlepay": "upi",
+    "phonepe": "upi",
+    "paytm": "upi",
+    "bhim": "upi",
+    "creditcard": "card",
+    "debitcard": "card",
+    "credit": "card",
+    "debit": "card",
+}
+
+
+def canonical_key(value) -> str | None:
+    """Case-folded, with whitespace and punctuation removed: "D-Mart " → "dmart"."""
+    if not isinstance(value, str):
+        return None
+    key = KEY_STRIP_RE.sub("", value.casefold())
+    return key or None
+
+
+def vendor_key(value) -> str | None:
+    key = canonical_key(value)
+    if key:
+        for suffix in VENDOR_SUFFIXES:
+            if key.endswith(suffix) and len(key) > len(suffix):
+                key = key[: -len(suffix)]
+                break
+    return key
+
+
+def category_key(value) -> str | None:
+    key = canonical_key(value)
+    return CATEGORY_SYNONYMS.get(key, key)
+
+
+def payment_method_key(value) -> str | None:
+    key = canonical_key(value)
+    return PAYMENT_METHOD_SYNONYMS.get(key, key)
+
+
+# field → (key field, key function)
+FILTER_KEYS = {
+    "vendor": ("vendor_key", vendor_key),
+    "category": ("category_key", category_key),
+    "payment_method": ("payment_method_key", payment_method_key),
+}
+
+
+def filter_keys(bill: dict) -> dict:
+    return {
+        key_field: fn(bill.get(field))
+        for field, (key_field, fn) in FILTER_KEYS.items()
+    }
+
+
+def product_name(description: str | None) -> str | None:
+    """Normalized product name of a line item: "Basmati  Rice-5KG" → "basmati rice 5kg"."""
+    name = " ".join(TERM_RE.findall((description or "").lower()))
+    return name or None
@@ -8,6 +8,7 @@ export async function GET(req: NextRequest) {
   const sortBy = searchParams.get('sort_by') || 'bill_date';
   const sortOrder = searchParams.get('sort_order') || 'desc';
   const search = searchParams.get('search') || '';
+  const cursor = searchParams.get('cursor') || '';
 
   const userId = "u1"; // hardcoded for now, ideal: get from session
 
@@ -18,6 +19,7 @@ export async function GET(req: NextRequest) {
   backendUrl.searchParams.append("sort_by", sortBy);
   backendUrl.searchParams.append("sort_order", sortOrder);
   if (search) backendUrl.searchParams.append("search", search);
+  if (cursor) backendUrl.searchParams.append("cursor", cursor);
 
   try {
     const response = await fetch(backendUrl.toString());
@@ -0,0 +1,27 @@
+import { NextResponse } from "next/server";
+
+export async function POST(req: Request) {
+  const body = await req.json();
+
+  if (body.userId !== "u1") {
+    return NextResponse.json({ error: "Unauthorized" }, { status: 401 });
+  }
+
+  const response = await fetch("http://localhost:8000/query/stream", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      user_id: body.userId,
+      query: body.query
+    })
+  });
+
+  // Pass the NDJSON event stream through without buffering it
+  return new Response(response.body, {
+    status: response.status,
+    headers: {
+      "Content-Type": "application/x-ndjson",
+      "Cache-Control": "no-cache"
+    }
+  });
+}
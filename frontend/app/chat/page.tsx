@@ -15,7 +15,7 @@ export default function ChatPage() {
     setResponse(null);
 
     try {
-      const res = await fetch("/api/query", {
+      const res = await fetch("/api/query/stream", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({
@@ -24,8 +24,36 @@ export default function ChatPage() {
         })
       });
 
-      const data = await res.json();
-      setResponse(data.result);
+      if (!res.body) throw new Error("Empty response");
+
+      // NDJSON events: plan → facts → token* → done
+      const reader = res.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let answer = "";
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split("\n");
+        buffer = lines.pop() || "";
+
+        for (const line of lines) {
+          if (!line.trim()) continue;
+          const event = JSON.parse(line);
+
+          if (event.event === "facts" && !answer) {
+            setResponse(event.data);
+          } else if (event.event === "token") {
+            answer += event.text;
+            setResponse(answer);
+          } else if (event.event === "error") {
+            setResponse({ error: event.message });
+          }
+        }
+      }
     } catch (err) {
       setResponse({ error: "Failed to fetch response" });
     } finally {